@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import statistics
+import time
+
+from .config import (
+    CALIBRATION_RUNS,
+    SPEED_FACTOR_MAX,
+    SPEED_FACTOR_MIN,
+)
+
+__all__ = ["SpeedCalibrator"]
+
+logger = logging.getLogger(__name__)
+
+
+def _benchmark() -> int:
+    """Детерминированная CPU-нагрузка: решето, хеширование и сортировка."""
+    n = 1_000_000
+    sieve = bytearray([1]) * (n + 1)
+    sieve[0:2] = b"\x00\x00"
+    for i in range(2, int(n**0.5) + 1):
+        if sieve[i]:
+            sieve[i * i :: i] = bytes(len(range(i * i, n + 1, i)))
+    acc = 0
+    for p, is_prime in enumerate(sieve):
+        if is_prime:
+            acc = (acc * 31 + p) % 1_000_000_007
+    data = sorted((x * 2654435761) % 1_000_003 for x in range(300_000))
+    return acc + data[len(data) // 2]
+
+
+class SpeedCalibrator:
+    """Измеряет скорость узла относительно эталонного железа.
+
+    ``speed_factor`` > 1 означает, что узел медленнее эталона: лимиты
+    времени умножаются на него, а измеренное время делится на него.
+    """
+
+    def __init__(
+        self, *, reference_seconds: float, runs: int = CALIBRATION_RUNS
+    ):
+        self.reference_seconds = reference_seconds
+        self.runs = runs
+        self.speed_factor = 1.0
+        self.measured_seconds: float | None = None
+
+    def calibrate(self) -> float:
+        timings = []
+        for _ in range(self.runs):
+            # CPU-время потока не зависит от соседних потоков конвейера
+            start = time.thread_time()
+            _benchmark()
+            timings.append(time.thread_time() - start)
+
+        self.measured_seconds = statistics.median(timings)
+        factor = self.measured_seconds / self.reference_seconds
+        self.speed_factor = round(
+            min(max(factor, SPEED_FACTOR_MIN), SPEED_FACTOR_MAX), 3
+        )
+        logger.info(
+            "Speed calibration: benchmark %.3fs, reference %.3fs, factor %.3f",
+            self.measured_seconds,
+            self.reference_seconds,
+            self.speed_factor,
+        )
+        return self.speed_factor
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.calibrate)
+            except Exception:
+                logger.exception("Speed calibration failed")
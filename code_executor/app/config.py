@@ -9,6 +9,25 @@ COMPILATION_TIME_LIMIT_SECONDS: Final[int] = 60
 COMPILATION_MEMORY_LIMIT_MB: Final[int] = 2048
 COMPILATION_OUTPUT_LIMIT_MB: Final[int] = 64
 
+# Сколько байт вывода/трейсбека попадает в результат (начало + конец);
+# переопределяется переменными окружения
+DIAGNOSTIC_HEAD_BYTES: Final[int] = 8 * 1024
+DIAGNOSTIC_TAIL_BYTES: Final[int] = 4 * 1024
+
+# Параллелизм стадий конвейера (переопределяется переменными окружения)
+COMPILE_CONCURRENCY: Final[int] = 2
+RUN_CONCURRENCY: Final[int] = 2
+
+# Калибровка скорости узла: эталонное время бенчмарка на референсном железе
+CALIBRATION_REFERENCE_SECONDS: Final[float] = 0.25
+CALIBRATION_INTERVAL_SECONDS: Final[int] = 15 * 60
+CALIBRATION_RUNS: Final[int] = 5
+SPEED_FACTOR_MIN: Final[float] = 0.5
+SPEED_FACTOR_MAX: Final[float] = 3.0
+
+# Прогресс по тестам публикуется не чаще, чем раз в столько секунд
+PROGRESS_INTERVAL_SECONDS: Final[float] = 0.5
+
 LANG_CONFIG: Final[dict[ProgrammingLanguage, dict[str, str | Command]]] = {
     ProgrammingLanguage.PYTHON: {
         "ext": ".py",
@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import IO
+
+from .config import DIAGNOSTIC_HEAD_BYTES, DIAGNOSTIC_TAIL_BYTES
+
+__all__ = [
+    "DEFAULT_DIAGNOSTIC_LIMITS",
+    "DiagnosticLimits",
+    "OutputCapture",
+    "excerpt",
+    "excerpt_text",
+]
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class DiagnosticLimits:
+    """Сколько байт вывода попадает в результат: начало и конец."""
+
+    head: int = DIAGNOSTIC_HEAD_BYTES
+    tail: int = DIAGNOSTIC_TAIL_BYTES
+
+
+DEFAULT_DIAGNOSTIC_LIMITS = DiagnosticLimits()
+
+
+def _marker(omitted: int, total: int) -> str:
+    return f"\n... [{omitted} bytes omitted, {total} bytes total] ...\n"
+
+
+def excerpt(
+    data: bytes,
+    *,
+    head: int = DIAGNOSTIC_HEAD_BYTES,
+    tail: int = DIAGNOSTIC_TAIL_BYTES,
+) -> str:
+    """Декодирует вывод, оставляя только начало и конец.
+
+    Если данные не влезают в ``head + tail`` байт, середина заменяется
+    маркером с количеством пропущенных байт и общим размером.
+    """
+    total = len(data)
+    if total <= head + tail:
+        return data.decode(errors="ignore")
+
+    return (
+        data[:head].decode(errors="ignore")
+        + _marker(total - head - tail, total)
+        + (data[-tail:].decode(errors="ignore") if tail else "")
+    )
+
+
+def excerpt_text(
+    text: str, limits: DiagnosticLimits = DEFAULT_DIAGNOSTIC_LIMITS
+) -> str:
+    """То же, что :func:`excerpt`, для уже декодированной строки."""
+    if len(text) <= limits.head + limits.tail:
+        return text
+    return excerpt(text.encode(), head=limits.head, tail=limits.tail)
+
+
+class OutputCapture:
+    """Читает поток процесса кусками, не держа его в памяти целиком.
+
+    Первые ``keep`` байт (не меньше ``head + tail``) хранятся как есть;
+    дальше в памяти остаются только последние ``limits.tail`` байт,
+    а остальное лишь считается. Так отрывок для результата строится
+    без буферизации всего вывода.
+    """
+
+    def __init__(self, *, keep: int, limits: DiagnosticLimits) -> None:
+        self.keep = max(keep, limits.head + limits.tail)
+        self.limits = limits
+        self.total = 0
+        self._start = bytearray()
+        self._tail = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        room = self.keep - len(self._start)
+        if room > 0:
+            self._start += chunk[:room]
+            chunk = chunk[room:]
+        if chunk and self.limits.tail:
+            self._tail += chunk
+            del self._tail[: -self.limits.tail]
+
+    def drain(self, stream: IO[bytes]) -> None:
+        """Читает ``stream`` до конца; вызывается в отдельном потоке."""
+        while chunk := stream.read(READ_CHUNK_BYTES):
+            self.feed(chunk)
+
+    @property
+    def exceeded(self) -> bool:
+        """Вывод длиннее ``keep`` байт и сохранён только отрывком."""
+        return self.total > self.keep
+
+    def data(self) -> bytes:
+        """Сохранённые байты; весь вывод, если он не превысил ``keep``."""
+        return bytes(self._start)
+
+    def excerpt(self) -> str:
+        """Вывод целиком или его начало и конец с маркером пропуска."""
+        head, tail = self.limits.head, self.limits.tail
+        if self.total <= head + tail:
+            return bytes(self._start).decode(errors="ignore")
+
+        if tail:
+            # конец потока: хвостовой буфер, дополненный концом начала
+            missing = tail - len(self._tail)
+            end = (
+                bytes(self._start[-missing:]) if missing > 0 else b""
+            ) + bytes(self._tail)
+        else:
+            end = b""
+        return (
+            bytes(self._start[:head]).decode(errors="ignore")
+            + _marker(self.total - head - tail, self.total)
+            + end.decode(errors="ignore")
+        )
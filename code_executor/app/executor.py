@@ -1,6 +1,6 @@
 import signal
 import tempfile
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from pathlib import Path
 
 from .config import (
@@ -8,11 +8,19 @@ from .config import (
     COMPILATION_TIME_LIMIT_SECONDS,
     LANG_CONFIG,
 )
+from .diagnostics import (
+    DEFAULT_DIAGNOSTIC_LIMITS,
+    DiagnosticLimits,
+    excerpt_text,
+)
 from .enums import ExecutionStatus, ProgrammingLanguage
 from .models import Attempt, AttemptExecutionResult
 from .runner import CommandRunner, RunResult
 
-__all__ = ["AttemptExecutor"]
+__all__ = ["AttemptExecutor", "TestObserver"]
+
+# (номер пройденного теста, всего тестов); вызывается из потока стадии
+TestObserver = Callable[[int, int], None]
 
 
 class AttemptExecutor:
@@ -20,49 +28,76 @@ class AttemptExecutor:
 
     _SIG_TLE = {signal.SIGXCPU, signal.SIGTRAP, signal.SIGKILL, signal.SIGFPE}
 
-    def __init__(self, attempt: Attempt):
+    def __init__(
+        self,
+        attempt: Attempt,
+        *,
+        speed_factor: float = 1.0,
+        on_test: TestObserver | None = None,
+        diagnostics: DiagnosticLimits = DEFAULT_DIAGNOSTIC_LIMITS,
+    ):
         self.attempt = attempt
+        self.on_test = on_test
+        self.diagnostics = diagnostics
         self.cfg = LANG_CONFIG[attempt.programming_language]
+        # лимит времени на этом узле с поправкой на его скорость
+        self.speed_factor = speed_factor
+        self.time_limit = attempt.time_limit_seconds * speed_factor
 
     def execute(self) -> AttemptExecutionResult:
         with tempfile.TemporaryDirectory() as workdir:
             work = Path(workdir)
+            return self.compile(work) or self.run_tests(work)
 
-            filename = (
-                f"Main{self.cfg['ext']}"
-                if self.attempt.programming_language == ProgrammingLanguage.JAVA
-                else f"main{self.cfg['ext']}"
-            )
-            src = work / filename
-            exe = work / "prog"
-
-            src.write_text(self.attempt.source_code)
-
-            # 1) компиляция (если требуется)
-            comp_err = self._handle_compile(src, exe)
-            if comp_err:
-                return comp_err
-
-            # 2) последовательный прогон тестов
-            max_t, max_m = 0.0, 0.0
-            for idx, (inp, expected_out) in enumerate(
-                self.attempt.tests, start=1
-            ):
-                res_or_metrics = self._run_single_test(
-                    idx, inp, expected_out, src, exe
-                )
-                if isinstance(res_or_metrics, AttemptExecutionResult):
-                    return res_or_metrics
-                elap, mem = res_or_metrics
-                max_t, max_m = max(max_t, elap), max(max_m, mem)
-
-            # 3) все тесты пройдены
-            return AttemptExecutionResult(
-                id=self.attempt.id,
-                status=ExecutionStatus.OK,
-                time_used_ms=int(max_t * 1000),
-                memory_used_bytes=int(max_m * 1024 * 1024),
+    def compile(self, work: Path) -> AttemptExecutionResult | None:
+        """Стадия компиляции: пишет исходник в ``work`` и собирает его.
+
+        Возвращает результат попытки, если компиляция провалилась.
+        """
+        src, exe = self._paths(work)
+        src.write_text(self.attempt.source_code)
+        return self._handle_compile(src, exe)
+
+    def run_tests(self, work: Path) -> AttemptExecutionResult:
+        """Стадия запуска: последовательно прогоняет тесты в ``work``."""
+        src, exe = self._paths(work)
+
+        max_t, max_m = 0.0, 0.0
+        for idx, (inp, expected_out) in enumerate(self.attempt.tests, start=1):
+            res_or_metrics = self._run_single_test(
+                idx, inp, expected_out, src, exe
             )
+            if isinstance(res_or_metrics, AttemptExecutionResult):
+                return res_or_metrics
+            elap, mem = res_or_metrics
+            max_t, max_m = max(max_t, elap), max(max_m, mem)
+            if self.on_test is not None:
+                self.on_test(idx, len(self.attempt.tests))
+
+        # все тесты пройдены
+        result = AttemptExecutionResult(
+            id=self.attempt.id,
+            status=ExecutionStatus.OK,
+            memory_used_bytes=int(max_m * 1024 * 1024),
+        )
+        return self._with_time(result, max_t)
+
+    def _with_time(
+        self, result: AttemptExecutionResult, elapsed: float
+    ) -> AttemptExecutionResult:
+        """Проставляет нормализованное (к эталонному железу) и сырое время."""
+        result.time_used_ms = int(elapsed / self.speed_factor * 1000)
+        result.raw_time_used_ms = int(elapsed * 1000)
+        result.speed_factor = self.speed_factor
+        return result
+
+    def _paths(self, work: Path) -> tuple[Path, Path]:
+        filename = (
+            f"Main{self.cfg['ext']}"
+            if self.attempt.programming_language == ProgrammingLanguage.JAVA
+            else f"main{self.cfg['ext']}"
+        )
+        return work / filename, work / "prog"
 
     def _compile(self, src: Path, exe: Path) -> RunResult | None:
         if "compile" not in self.cfg:  # интерпретируемый язык
@@ -83,6 +118,7 @@ class AttemptExecutor:
             mem=COMPILATION_MEMORY_LIMIT_MB,
             plang=self.attempt.programming_language,
             is_compilation=True,
+            diagnostics=self.diagnostics,
         ).run()
 
     def _handle_compile(
@@ -134,9 +170,10 @@ class AttemptExecutor:
         res = CommandRunner(
             cmd,
             stdin=("\n".join(inp) + "\n").encode(),
-            sec=self.attempt.time_limit_seconds,
+            sec=self.time_limit,
             mem=self.attempt.memory_limit_megabytes,
             plang=self.attempt.programming_language,
+            diagnostics=self.diagnostics,
         ).run()
 
         # ---------- анализ флагов ----------
@@ -180,8 +217,10 @@ class AttemptExecutor:
                 id=self.attempt.id,
                 status=ExecutionStatus.WRONG_ANSWER,
                 failed_test_number=idx,
-                source_code_output=res.stdout,
-                expected_output="\n".join(list(expected_out)),
+                source_code_output=excerpt_text(res.stdout, self.diagnostics),
+                expected_output=excerpt_text(
+                    "\n".join(list(expected_out)), self.diagnostics
+                ),
             )
 
         return res.elapsed, res.peak_mb  # успешный тест
@@ -197,15 +236,15 @@ class AttemptExecutor:
         time: float | None = None,
         code: int | None = None,
     ) -> AttemptExecutionResult:
-        return AttemptExecutionResult(
+        result = AttemptExecutionResult(
             id=self.attempt.id,
             status=status,
             failed_test_number=idx,
             error_traceback=err,
             source_code_output=output,
             memory_used_bytes=int(mem * 1024 * 1024) if mem else None,
-            time_used_ms=int(time * 1000) if time else None,
         )
+        return self._with_time(result, time) if time else result
 
     def _signal_failure(
         self, idx: int, res: RunResult
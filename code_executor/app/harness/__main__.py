@@ -0,0 +1,65 @@
+"""Нагрузочный прогон воркера без RabbitMQ.
+
+    python -m app.harness --attempts 200 --mix python:ok=6,python:wa=2,cpp:ok=2
+
+Печатает пропускную способность, p50/p99 задержки и разбивку по фазам
+(ожидание в очереди, ожидание слота и работа компиляции/прогона).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from ..config import COMPILE_CONCURRENCY, RUN_CONCURRENCY
+from .bench import run_benchmark
+from .workload import generate_workload, parse_mix
+
+DEFAULT_MIX = "python:ok=6,python:wa=1,python:re=1,cpp:ok=1,cpp:ce=1"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.harness")
+    parser.add_argument("--attempts", type=int, default=100)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--tests", type=int, default=10)
+    parser.add_argument("--time-limit", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--compile-concurrency", type=int, default=COMPILE_CONCURRENCY
+    )
+    parser.add_argument("--run-concurrency", type=int, default=RUN_CONCURRENCY)
+    parser.add_argument(
+        "--json", action="store_true", help="вывести отчёт в JSON"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    items = generate_workload(
+        args.attempts,
+        parse_mix(args.mix),
+        tests=args.tests,
+        time_limit_seconds=args.time_limit,
+        seed=args.seed,
+    )
+    report = asyncio.run(
+        run_benchmark(
+            items,
+            compile_concurrency=args.compile_concurrency,
+            run_concurrency=args.run_concurrency,
+        )
+    )
+    sys.stdout.write(
+        (
+            json.dumps(report.summary(), indent=2)
+            if args.json
+            else report.format()
+        )
+        + "\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+from aio_pika import Message
+
+from ..pipeline import ExecutionPipeline
+from ..rabbitmq_consumer import (
+    TASK_EXCHANGE,
+    TASK_ROUTING_KEY,
+    CodeExecutionWorker,
+)
+from .broker import InMemoryBroker, InMemoryExchange, InMemoryMessage
+from .workload import WorkItem
+
+__all__ = ["BenchmarkReport", "run_benchmark"]
+
+PHASES = ("broker_wait", "compile_wait", "compile", "run_wait", "run")
+# сколько секунд ждать очередного результата, прежде чем считать его потерянным
+RESULT_IDLE_SECONDS = 120.0
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class BenchmarkReport:
+    attempts: int
+    elapsed_seconds: float
+    latencies: list[float]
+    phases: dict[str, list[float]]
+    statuses: Counter[str]
+    mismatches: list[tuple[int, str, str]]
+    results: dict[int, dict[str, Any]] = field(repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return (
+            self.attempts / self.elapsed_seconds
+            if self.elapsed_seconds
+            else 0.0
+        )
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "attempts_per_second": round(self.throughput, 3),
+            "latency_ms": _quantiles_ms(self.latencies),
+            "phases_ms": {
+                phase: _quantiles_ms(self.phases.get(phase, []))
+                for phase in PHASES
+            },
+            "statuses": dict(self.statuses),
+            "mismatches": len(self.mismatches),
+        }
+
+    def format(self) -> str:
+        s = self.summary()
+        lines = [
+            f"attempts: {s['attempts']} in {s['elapsed_seconds']}s "
+            f"({s['attempts_per_second']} attempts/s)",
+            "latency ms: p50={p50} p99={p99} max={max}".format(
+                **s["latency_ms"]
+            ),
+        ]
+        for phase, q in s["phases_ms"].items():
+            lines.append(
+                f"  {phase:<12} p50={q['p50']} p99={q['p99']} max={q['max']}"
+            )
+        lines.append(f"statuses: {s['statuses']}")
+        lines.append(f"verdict mismatches: {s['mismatches']}")
+        for attempt_id, expected, actual in self.mismatches[:10]:
+            lines.append(f"  #{attempt_id}: expected {expected}, got {actual}")
+        return "\n".join(lines)
+
+
+def _quantiles_ms(values: list[float]) -> dict[str, float]:
+    return {
+        "p50": round(percentile(values, 0.5) * 1000, 1),
+        "p99": round(percentile(values, 0.99) * 1000, 1),
+        "max": round(max(values, default=0.0) * 1000, 1),
+        "mean": round(statistics.fmean(values) * 1000, 1) if values else 0.0,
+    }
+
+
+class _BenchmarkRun:
+    """Отправки, результаты и замеры одного прогона."""
+
+    def __init__(self, expected: int) -> None:
+        self.expected = expected
+        self.phases: dict[str, list[float]] = defaultdict(list)
+        self.sent: dict[int, float] = {}
+        self.latencies: list[float] = []
+        self.results: dict[int, dict[str, Any]] = {}
+        self._progress = asyncio.Event()
+
+    def on_phase(self, attempt_id: int, phase: str, seconds: float) -> None:
+        self.phases[phase].append(seconds)
+
+    def on_deliver(self, queue: str, body: bytes) -> None:
+        # сколько сообщение простояло в очереди до выдачи воркеру
+        if queue == TASK_ROUTING_KEY:
+            attempt_id = json.loads(body)["id"]
+            self.phases["broker_wait"].append(
+                time.perf_counter() - self.sent[attempt_id]
+            )
+
+    async def collect(self, message: InMemoryMessage) -> None:
+        async with message.process():
+            result = json.loads(message.body)
+            self.latencies.append(time.perf_counter() - self.sent[result["id"]])
+            self.results[result["id"]] = result
+            self._progress.set()
+
+    async def wait(self, idle_seconds: float) -> None:
+        """Ждёт все результаты; падает, если очередного нет дольше
+        ``idle_seconds`` — потерянный результат не вешает прогон.
+        """
+        while len(self.results) < self.expected:
+            self._progress.clear()
+            try:
+                await asyncio.wait_for(self._progress.wait(), idle_seconds)
+            except TimeoutError as e:
+                pending = self.expected - len(self.results)
+                raise TimeoutError(
+                    f"no result for {idle_seconds}s, "
+                    f"{pending} attempts still pending"
+                ) from e
+
+
+async def _start_worker(
+    broker: InMemoryBroker, pipeline: ExecutionPipeline
+) -> CodeExecutionWorker:
+    worker = CodeExecutionWorker("memory://", pipeline, connect=broker.connect)
+    await worker.connect()
+    await worker.consume()
+    return worker
+
+
+async def _subscribe(
+    broker: InMemoryBroker, run: _BenchmarkRun
+) -> InMemoryExchange:
+    """Подписывает прогон на результаты; возвращает exchange задач."""
+    channel = await (await broker.connect()).channel()
+    await channel.set_qos(prefetch_count=run.expected or 1)
+    queue = await channel.declare_queue()
+    await queue.bind("execution_results")
+    await queue.consume(run.collect)
+    return await channel.declare_exchange(TASK_EXCHANGE)
+
+
+async def run_benchmark(
+    items: list[WorkItem],
+    *,
+    compile_concurrency: int,
+    run_concurrency: int,
+    speed: float = 1.0,
+    idle_seconds: float = RESULT_IDLE_SECONDS,
+) -> BenchmarkReport:
+    """Прогоняет попытки через настоящий ``CodeExecutionWorker`` и
+    ``ExecutionPipeline``, подменив RabbitMQ брокером в памяти.
+
+    Сообщения отправляются по ``offset_seconds`` (делённому на ``speed``);
+    задержка считается от отправки до получения результата. Если
+    очередной результат не пришёл за ``idle_seconds``, прогон падает
+    с ``TimeoutError``.
+    """
+    run = _BenchmarkRun(len(items))
+    broker = InMemoryBroker(on_deliver=run.on_deliver)
+    pipeline = ExecutionPipeline(
+        compile_concurrency=compile_concurrency,
+        run_concurrency=run_concurrency,
+        on_phase=run.on_phase,
+    )
+    worker = await _start_worker(broker, pipeline)
+    exchange = await _subscribe(broker, run)
+
+    started = time.perf_counter()
+    try:
+        for item in sorted(items, key=lambda i: i.offset_seconds):
+            delay = started + item.offset_seconds / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            run.sent[item.payload["id"]] = time.perf_counter()
+            await exchange.publish(
+                Message(json.dumps(item.payload).encode()),
+                routing_key=TASK_ROUTING_KEY,
+            )
+        await run.wait(idle_seconds)
+        elapsed = time.perf_counter() - started
+    finally:
+        await worker.connection.close()
+        pipeline.shutdown()
+
+    expected = {i.payload["id"]: i.expected_status for i in items}
+    mismatches = [
+        (attempt_id, status, result["status"])
+        for attempt_id, result in sorted(run.results.items())
+        if (status := expected[attempt_id]) and status != result["status"]
+    ]
+    return BenchmarkReport(
+        attempts=len(items),
+        elapsed_seconds=elapsed,
+        latencies=run.latencies,
+        phases=dict(run.phases),
+        statuses=Counter(r["status"] for r in run.results.values()),
+        mismatches=mismatches,
+        results=run.results,
+    )
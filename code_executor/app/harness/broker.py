@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from aio_pika import ExchangeType
+
+__all__ = ["InMemoryBroker"]
+
+Callback = Callable[["InMemoryMessage"], Awaitable[Any]]
+
+
+class InMemoryMessage:
+    def __init__(self, body: bytes, on_settle: Callable[[], None]):
+        self.body = body
+        self._on_settle = on_settle
+
+    @asynccontextmanager
+    async def process(self) -> AsyncGenerator["InMemoryMessage", None]:
+        try:
+            yield self
+        finally:
+            self._on_settle()
+
+
+class InMemoryExchange:
+    def __init__(self, name: str, type_: ExchangeType):
+        self.name = name
+        self.type = type_
+        self.bindings: list[tuple[InMemoryQueue, str]] = []
+
+    async def publish(self, message: Any, routing_key: str) -> None:
+        for queue, key in self.bindings:
+            if self.type == ExchangeType.FANOUT or key == routing_key:
+                queue.put(message.body)
+
+
+class InMemoryQueue:
+    def __init__(self, name: str, channel: "InMemoryChannel"):
+        self.name = name
+        self._channel = channel
+        self._messages: asyncio.Queue[bytes] = asyncio.Queue()
+        self._tasks: set[asyncio.Future[Any]] = set()
+
+    def put(self, body: bytes) -> None:
+        self._messages.put_nowait(body)
+
+    async def bind(
+        self, exchange: "InMemoryExchange | str", routing_key: str = ""
+    ) -> None:
+        if isinstance(exchange, str):
+            exchange = self._channel.broker.exchanges[exchange]
+        exchange.bindings.append((self, routing_key))
+
+    async def consume(self, callback: Callback) -> None:
+        task = asyncio.create_task(self._dispatch(callback))
+        self._tasks.add(task)
+
+    async def _dispatch(self, callback: Callback) -> None:
+        # как и RabbitMQ, не выдаём больше prefetch_count неподтверждённых
+        in_flight = asyncio.Semaphore(self._channel.prefetch_count)
+        while True:
+            await in_flight.acquire()
+            body = await self._messages.get()
+            if self._channel.broker.on_deliver is not None:
+                self._channel.broker.on_deliver(self.name, body)
+            message = InMemoryMessage(body, in_flight.release)
+            task = asyncio.ensure_future(callback(message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class InMemoryChannel:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+        self.prefetch_count = 1
+
+    async def set_qos(self, prefetch_count: int) -> None:
+        self.prefetch_count = prefetch_count
+
+    async def declare_exchange(
+        self,
+        name: str,
+        type: ExchangeType = ExchangeType.DIRECT,
+        **_: Any,
+    ) -> InMemoryExchange:
+        return self.broker.exchanges.setdefault(
+            name, InMemoryExchange(name, type)
+        )
+
+    async def declare_queue(self, name: str = "", **_: Any) -> InMemoryQueue:
+        name = name or f"amq.gen-{next(self.broker.queue_ids)}"
+        return self.broker.queues.setdefault(name, InMemoryQueue(name, self))
+
+
+class InMemoryConnection:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+
+    async def channel(self) -> InMemoryChannel:
+        return InMemoryChannel(self.broker)
+
+    async def close(self) -> None:
+        await self.broker.close()
+
+
+class InMemoryBroker:
+    """Заменитель RabbitMQ в памяти процесса для нагрузочных прогонов.
+
+    Реализует ровно то подмножество aio-pika, которым пользуется
+    ``CodeExecutionWorker``: exchange'и direct/fanout, очереди с
+    ``prefetch_count`` и подтверждение через ``message.process()``.
+    """
+
+    def __init__(
+        self, *, on_deliver: Callable[[str, bytes], None] | None = None
+    ) -> None:
+        # вызывается при выдаче сообщения потребителю: (очередь, тело)
+        self.on_deliver = on_deliver
+        self.exchanges: dict[str, InMemoryExchange] = {}
+        self.queues: dict[str, InMemoryQueue] = {}
+        self.queue_ids = itertools.count(1)
+
+    async def connect(self, url: str = "memory://") -> InMemoryConnection:
+        return InMemoryConnection(self)
+
+    async def close(self) -> None:
+        for queue in self.queues.values():
+            await queue.close()
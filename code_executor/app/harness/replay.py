@@ -0,0 +1,173 @@
+r"""Воспроизведение записанного трафика проверки.
+
+    python -m app.harness.replay traffic.jsonl.gz --speed 10 \\
+        --results new.jsonl.gz --baseline old.jsonl.gz
+
+Лог пишет ``TrafficRecorder`` веб-сервера. Попытки отправляются в воркер
+с исходными интервалами, ускоренными в ``--speed`` раз (``0`` — без пауз).
+Результаты можно сохранить и сравнить с прогоном другой версии
+исполнителя: расхождения вердиктов и изменение времени по попыткам.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import statistics
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ..config import COMPILE_CONCURRENCY, RUN_CONCURRENCY
+from .bench import run_benchmark
+from .workload import WorkItem
+
+__all__ = ["ReplayComparison", "compare", "load_results", "load_traffic"]
+
+# поля результата, которые сохраняются для сравнения прогонов
+RESULT_FIELDS = (
+    "id",
+    "status",
+    "time_used_ms",
+    "raw_time_used_ms",
+    "memory_used_bytes",
+    "failed_test_number",
+)
+
+
+def load_traffic(path: Path) -> list[WorkItem]:
+    items = []
+    base = last = 0.0
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in filter(str.strip, f):
+            entry = json.loads(line)
+            # каждый запуск веб-сервера начинает смещения с нуля
+            if entry["offset"] < last - base:
+                base = last
+            last = base + entry["offset"]
+            # id повторяются между запусками, а результаты сводятся по id
+            items.append(
+                WorkItem(
+                    payload={**entry["task"], "id": len(items) + 1},
+                    offset_seconds=last,
+                )
+            )
+    return items
+
+
+def save_results(path: Path, results: dict[int, dict[str, Any]]) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for attempt_id in sorted(results):
+            result = results[attempt_id]
+            f.write(
+                json.dumps({k: result.get(k) for k in RESULT_FIELDS}) + "\n"
+            )
+
+
+def load_results(path: Path) -> dict[int, dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return {r["id"]: r for r in map(json.loads, filter(str.strip, f))}
+
+
+@dataclass
+class ReplayComparison:
+    compared: int
+    verdict_changes: list[tuple[int, str, str]]
+    # отношение time_used_ms нового прогона к базовому по попыткам
+    time_ratios: dict[int, float]
+
+    def format(self, *, slowdown: float = 1.5) -> str:
+        ratios = sorted(self.time_ratios.values())
+        lines = [
+            f"compared: {self.compared}",
+            f"verdict changes: {len(self.verdict_changes)}",
+        ]
+        for attempt_id, before, after in self.verdict_changes[:10]:
+            lines.append(f"  #{attempt_id}: {before} -> {after}")
+        if ratios:
+            lines.append(
+                f"time ratio: median={statistics.median(ratios):.3f} "
+                f"min={ratios[0]:.3f} max={ratios[-1]:.3f}"
+            )
+            slower = [
+                (attempt_id, ratio)
+                for attempt_id, ratio in self.time_ratios.items()
+                if ratio >= slowdown
+            ]
+            lines.append(f"slower by >= {slowdown}x: {len(slower)}")
+            lines.extend(
+                f"  #{attempt_id}: x{ratio:.2f}"
+                for attempt_id, ratio in sorted(slower, key=lambda s: -s[1])[
+                    :10
+                ]
+            )
+        return "\n".join(lines)
+
+
+def compare(
+    results: dict[int, dict[str, Any]], baseline: dict[int, dict[str, Any]]
+) -> ReplayComparison:
+    common = sorted(results.keys() & baseline.keys())
+    verdict_changes = [
+        (i, baseline[i]["status"], results[i]["status"])
+        for i in common
+        if baseline[i]["status"] != results[i]["status"]
+    ]
+    time_ratios = {
+        i: results[i]["time_used_ms"] / baseline[i]["time_used_ms"]
+        for i in common
+        if results[i].get("time_used_ms") and baseline[i].get("time_used_ms")
+    }
+    return ReplayComparison(len(common), verdict_changes, time_ratios)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.harness.replay")
+    parser.add_argument("traffic", type=Path)
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="ускорение относительно записи; 0 — отправить всё сразу",
+    )
+    parser.add_argument("--limit", type=int, help="взять первые N попыток")
+    parser.add_argument(
+        "--results", type=Path, help="куда сохранить результаты"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, help="результаты для сравнения"
+    )
+    parser.add_argument(
+        "--compile-concurrency", type=int, default=COMPILE_CONCURRENCY
+    )
+    parser.add_argument("--run-concurrency", type=int, default=RUN_CONCURRENCY)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    items = load_traffic(args.traffic)[: args.limit]
+    if args.speed == 0:
+        for item in items:
+            item.offset_seconds = 0.0
+
+    report = asyncio.run(
+        run_benchmark(
+            items,
+            compile_concurrency=args.compile_concurrency,
+            run_concurrency=args.run_concurrency,
+            speed=args.speed or 1.0,
+        )
+    )
+    sys.stdout.write(report.format() + "\n")
+
+    if args.results:
+        save_results(args.results, report.results)
+    if args.baseline:
+        comparison = compare(report.results, load_results(args.baseline))
+        sys.stdout.write(comparison.format() + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from ..enums import ExecutionStatus, ProgrammingLanguage
+
+__all__ = ["WorkItem", "generate_workload", "parse_mix"]
+
+LANGUAGES: dict[str, ProgrammingLanguage] = {
+    "python": ProgrammingLanguage.PYTHON,
+    "javascript": ProgrammingLanguage.JAVASCRIPT,
+    "cpp": ProgrammingLanguage.CPP,
+    "c": ProgrammingLanguage.C,
+    "go": ProgrammingLanguage.GO,
+    "rust": ProgrammingLanguage.RUST,
+}
+
+VERDICTS: dict[str, ExecutionStatus] = {
+    "ok": ExecutionStatus.OK,
+    "wa": ExecutionStatus.WRONG_ANSWER,
+    "tle": ExecutionStatus.TIME_LIMIT_EXCEEDED,
+    "re": ExecutionStatus.RUNTIME_ERROR,
+    "ce": ExecutionStatus.COMPILATION_ERROR,
+}
+
+_CPP_IO = "#include <iostream>\nint main(){long long n;std::cin>>n;"
+_C_IO = '#include <stdio.h>\nint main(){long long n;scanf("%lld",&n);'
+_GO_IO = 'package main\nimport "fmt"\nfunc main(){var n int64;fmt.Scan(&n);'
+_RUST_IO = (
+    "fn main(){let mut s=String::new();"
+    "std::io::stdin().read_line(&mut s).unwrap();"
+    "let n:i64=s.trim().parse().unwrap();"
+)
+
+# задача у всех шаблонов одна: прочитать n и вывести n*n
+TEMPLATES: dict[tuple[str, str], str] = {
+    ("python", "ok"): "n=int(input());print(n*n)\n",
+    ("python", "wa"): "n=int(input());print(n+1)\n",
+    ("python", "tle"): "while True:\n    pass\n",
+    ("python", "re"): "n=int(input());print(n//0)\n",
+    ("javascript", "ok"): (
+        "const n=BigInt(require('fs').readFileSync(0,'utf8').trim());"
+        "console.log((n*n).toString());\n"
+    ),
+    ("javascript", "wa"): (
+        "const n=Number(require('fs').readFileSync(0,'utf8').trim());"
+        "console.log(n+1);\n"
+    ),
+    ("javascript", "tle"): "while(true){}\n",
+    ("javascript", "re"): "throw new Error('boom');\n",
+    ("cpp", "ok"): _CPP_IO + "std::cout<<n*n<<'\\n';}\n",
+    ("cpp", "wa"): _CPP_IO + "std::cout<<n+1<<'\\n';}\n",
+    ("cpp", "tle"): "int main(){volatile long long x=0;while(true){x++;}}\n",
+    ("cpp", "re"): "#include <cstdlib>\nint main(){std::abort();}\n",
+    ("cpp", "ce"): "int main( {\n",
+    ("c", "ok"): _C_IO + 'printf("%lld\\n",n*n);}\n',
+    ("c", "wa"): _C_IO + 'printf("%lld\\n",n+1);}\n',
+    ("c", "tle"): "int main(){volatile long long x=0;for(;;){x++;}}\n",
+    ("c", "re"): "#include <stdlib.h>\nint main(){abort();}\n",
+    ("c", "ce"): "int main( {\n",
+    ("go", "ok"): _GO_IO + "fmt.Println(n*n)}\n",
+    ("go", "wa"): _GO_IO + "fmt.Println(n+1)}\n",
+    ("go", "tle"): "package main\nfunc main(){for{}}\n",
+    ("go", "re"): 'package main\nfunc main(){panic("boom")}\n',
+    ("go", "ce"): "package main\nfunc main( {\n",
+    ("rust", "ok"): _RUST_IO + 'println!("{}",n*n);}\n',
+    ("rust", "wa"): _RUST_IO + 'println!("{}",n+1);}\n',
+    ("rust", "tle"): "fn main(){loop{std::hint::black_box(0);}}\n",
+    ("rust", "re"): 'fn main(){panic!("boom");}\n',
+    ("rust", "ce"): "fn main( {\n",
+}
+
+
+@dataclass
+class WorkItem:
+    """Одна попытка для прогона через харнесс.
+
+    ``payload`` — тело сообщения, как его шлёт веб-сервер;
+    ``expected_status`` — вердикт, который должен вернуть воркер;
+    ``offset_seconds`` — когда отправить сообщение от начала прогона.
+    """
+
+    payload: dict[str, Any]
+    expected_status: str | None = None
+    offset_seconds: float = 0.0
+
+
+def parse_mix(spec: str) -> dict[tuple[str, str], int]:
+    """Разбирает смесь вида ``python:ok=6,cpp:wa=1`` в веса шаблонов."""
+    mix: dict[tuple[str, str], int] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        key, _, weight = part.partition("=")
+        language, _, verdict = key.partition(":")
+        if (language, verdict) not in TEMPLATES:
+            raise ValueError(f"Unknown workload template: {key!r}")
+        mix[language, verdict] = int(weight or 1)
+    if not mix:
+        raise ValueError("Workload mix is empty")
+    return mix
+
+
+def generate_workload(
+    count: int,
+    mix: dict[tuple[str, str], int],
+    *,
+    tests: int = 10,
+    time_limit_seconds: int = 1,
+    memory_limit_megabytes: int = 64,
+    seed: int = 0,
+) -> list[WorkItem]:
+    """Синтетический поток попыток с заданным распределением языков
+    и вердиктов. При одинаковом ``seed`` поток воспроизводим.
+    """
+    rng = random.Random(seed)
+    keys = list(mix)
+    weights = [mix[key] for key in keys]
+    items = []
+    for attempt_id in range(1, count + 1):
+        language, verdict = rng.choices(keys, weights)[0]
+        numbers = [rng.randint(1, 10**6) for _ in range(tests)]
+        items.append(
+            WorkItem(
+                payload={
+                    "id": attempt_id,
+                    "programming_language": LANGUAGES[language].value,
+                    "source_code": TEMPLATES[language, verdict],
+                    "time_limit_seconds": time_limit_seconds,
+                    "memory_limit_megabytes": memory_limit_megabytes,
+                    "tests": [[[str(n)], [str(n * n)]] for n in numbers],
+                },
+                expected_status=VERDICTS[verdict].value,
+            )
+        )
+    return items
@@ -1,6 +1,18 @@
 import asyncio
 import os
 
+from app.calibration import SpeedCalibrator
+from app.config import (
+    CALIBRATION_INTERVAL_SECONDS,
+    CALIBRATION_REFERENCE_SECONDS,
+    COMPILE_CONCURRENCY,
+    DIAGNOSTIC_HEAD_BYTES,
+    DIAGNOSTIC_TAIL_BYTES,
+    PROGRESS_INTERVAL_SECONDS,
+    RUN_CONCURRENCY,
+)
+from app.diagnostics import DiagnosticLimits
+from app.pipeline import ExecutionPipeline
 from app.rabbitmq_consumer import CodeExecutionWorker
 
 
@@ -12,10 +24,49 @@ async def main():
 
     rabbitmq_url = f"amqp://{rabbitmq_default_user}:{rabbitmq_default_pass}@{rabbitmq_host}:{rabbitmq_port}/"
 
-    worker = CodeExecutionWorker(rabbitmq_url)
+    calibrator = SpeedCalibrator(
+        reference_seconds=float(
+            os.getenv(
+                "CALIBRATION_REFERENCE_SECONDS", CALIBRATION_REFERENCE_SECONDS
+            )
+        )
+    )
+    calibrator.calibrate()
+    calibration_task = asyncio.create_task(
+        calibrator.run_periodically(
+            float(
+                os.getenv(
+                    "CALIBRATION_INTERVAL_SECONDS", CALIBRATION_INTERVAL_SECONDS
+                )
+            )
+        )
+    )
+
+    pipeline = ExecutionPipeline(
+        compile_concurrency=int(
+            os.getenv("COMPILE_CONCURRENCY", COMPILE_CONCURRENCY)
+        ),
+        run_concurrency=int(os.getenv("RUN_CONCURRENCY", RUN_CONCURRENCY)),
+        calibrator=calibrator,
+        diagnostics=DiagnosticLimits(
+            head=int(os.getenv("DIAGNOSTIC_HEAD_BYTES", DIAGNOSTIC_HEAD_BYTES)),
+            tail=int(os.getenv("DIAGNOSTIC_TAIL_BYTES", DIAGNOSTIC_TAIL_BYTES)),
+        ),
+    )
+
+    progress_interval = float(
+        os.getenv("PROGRESS_INTERVAL_SECONDS", PROGRESS_INTERVAL_SECONDS)
+    )
+    worker = CodeExecutionWorker(
+        rabbitmq_url,
+        pipeline,
+        # отрицательное значение отключает события прогресса
+        progress_interval=progress_interval if progress_interval >= 0 else None,
+    )
     await worker.connect()
     await worker.consume()
-    await asyncio.Future()
+    # калибровка повторяется по расписанию, пока жив воркер
+    await calibration_task
 
 
 if __name__ == "__main__":
@@ -19,6 +19,9 @@ class AttemptExecutionResult:
     status: ExecutionStatus
     time_used_ms: int | None = None
     memory_used_bytes: int | None = None
+    # время без нормализации и коэффициент скорости узла, см. calibration.py
+    raw_time_used_ms: int | None = None
+    speed_factor: float | None = None
 
     error_traceback: str | None = None
 
@@ -0,0 +1,123 @@
+import asyncio
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TypeVar
+
+from .calibration import SpeedCalibrator
+from .diagnostics import DEFAULT_DIAGNOSTIC_LIMITS, DiagnosticLimits
+from .executor import AttemptExecutor, TestObserver
+from .models import Attempt, AttemptExecutionResult
+
+__all__ = ["ExecutionPipeline", "PhaseObserver"]
+
+T = TypeVar("T")
+
+# (id попытки, фаза, длительность в секундах); фазы: compile_wait, compile,
+# run_wait, run — ожидание слота в пуле и собственно работа стадии
+PhaseObserver = Callable[[int, str, float], None]
+
+
+class ExecutionPipeline:
+    """Конвейер проверки: компиляция и прогон тестов в разных пулах.
+
+    Пока одна попытка компилируется, тесты уже собранных попыток
+    выполняются в пуле запуска. У каждой стадии свой лимит параллелизма.
+    """
+
+    def __init__(
+        self,
+        *,
+        compile_concurrency: int,
+        run_concurrency: int,
+        calibrator: SpeedCalibrator | None = None,
+        on_phase: PhaseObserver | None = None,
+        diagnostics: DiagnosticLimits = DEFAULT_DIAGNOSTIC_LIMITS,
+    ):
+        self.compile_concurrency = compile_concurrency
+        self.run_concurrency = run_concurrency
+        self.calibrator = calibrator
+        self.on_phase = on_phase
+        self.diagnostics = diagnostics
+        self._compile_pool = ThreadPoolExecutor(
+            max_workers=compile_concurrency, thread_name_prefix="compile"
+        )
+        self._run_pool = ThreadPoolExecutor(
+            max_workers=run_concurrency, thread_name_prefix="run"
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Сколько попыток конвейер может держать в работе одновременно."""
+        return self.compile_concurrency + self.run_concurrency
+
+    async def execute(
+        self, attempt: Attempt, *, on_test: TestObserver | None = None
+    ) -> AttemptExecutionResult:
+        """``on_test`` вызывается в цикле событий после каждого пройденного
+        теста — тесты же гоняются в потоке пула запуска.
+        """
+        if on_test is not None:
+            loop = asyncio.get_running_loop()
+            callback = on_test
+
+            def on_test_threadsafe(passed: int, total: int) -> None:
+                loop.call_soon_threadsafe(callback, passed, total)
+
+            on_test = on_test_threadsafe
+
+        executor = AttemptExecutor(
+            attempt,
+            speed_factor=(
+                self.calibrator.speed_factor if self.calibrator else 1.0
+            ),
+            on_test=on_test,
+            diagnostics=self.diagnostics,
+        )
+        work = Path(tempfile.mkdtemp())
+        try:
+            failed = await self._stage(
+                attempt.id,
+                "compile",
+                self._compile_pool,
+                executor.compile,
+                work,
+            )
+            if failed:
+                return failed
+            return await self._stage(
+                attempt.id, "run", self._run_pool, executor.run_tests, work
+            )
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    async def _stage(
+        self,
+        attempt_id: int,
+        phase: str,
+        pool: ThreadPoolExecutor,
+        func: Callable[[Path], T],
+        work: Path,
+    ) -> T:
+        submitted = time.perf_counter()
+        started = submitted
+
+        def timed() -> T:
+            nonlocal started
+            started = time.perf_counter()
+            return func(work)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, timed)
+        finally:
+            if self.on_phase is not None:
+                finished = time.perf_counter()
+                self.on_phase(attempt_id, f"{phase}_wait", started - submitted)
+                self.on_phase(attempt_id, phase, finished - started)
+
+    def shutdown(self) -> None:
+        self._compile_pool.shutdown(wait=True)
+        self._run_pool.shutdown(wait=True)
@@ -1,38 +1,95 @@
+import asyncio
 import json
 import logging
-from typing import Any
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Protocol
 
 import aio_pika
 from aio_pika import ExchangeType, Message
-from aio_pika.abc import (
-    AbstractChannel,
-    AbstractConnection,
-    AbstractExchange,
-    AbstractIncomingMessage,
-)
 
+from .config import PROGRESS_INTERVAL_SECONDS
 from .enums import ExecutionStatus, ProgrammingLanguage
-from .executor import AttemptExecutor
+from .executor import TestObserver
 from .models import Attempt
+from .pipeline import ExecutionPipeline
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 TASK_EXCHANGE = "code_execution"
 TASK_ROUTING_KEY = "execute_code"
+# fanout веб-сервера, через который клиентам доходят события попыток
+NOTIFICATION_EXCHANGE = "attempt_notifications"
+
+
+# Подмножество aio-pika, которым пользуется воркер: ему удовлетворяют
+# и настоящее подключение, и брокер в памяти харнесса
+class BrokerMessage(Protocol):
+    body: bytes
+
+    def process(self) -> AbstractAsyncContextManager[Any]: ...
+
+
+class BrokerExchange(Protocol):
+    def publish(self, message: Message, routing_key: str) -> Awaitable[Any]: ...
+
+
+class BrokerQueue(Protocol):
+    def bind(self, exchange: str, routing_key: str) -> Awaitable[Any]: ...
+
+    def consume(
+        self, callback: Callable[[BrokerMessage], Awaitable[Any]]
+    ) -> Awaitable[Any]: ...
+
+
+class BrokerChannel(Protocol):
+    def set_qos(self, prefetch_count: int) -> Awaitable[Any]: ...
+
+    def declare_exchange(
+        self, name: str, type: ExchangeType, *, durable: bool
+    ) -> Awaitable[BrokerExchange]: ...
+
+    def declare_queue(
+        self, name: str, *, durable: bool
+    ) -> Awaitable[BrokerQueue]: ...
+
+
+class BrokerConnection(Protocol):
+    def channel(self) -> Awaitable[BrokerChannel]: ...
+
+    def close(self) -> Awaitable[Any]: ...
 
 
 class CodeExecutionWorker:
-    def __init__(self, rabbit_url: str):
+    def __init__(
+        self,
+        rabbit_url: str,
+        pipeline: ExecutionPipeline,
+        *,
+        connect: Callable[
+            [str], Awaitable[BrokerConnection]
+        ] = aio_pika.connect_robust,
+        progress_interval: float | None = PROGRESS_INTERVAL_SECONDS,
+    ):
         self.rabbit_url = rabbit_url
-        self.connection: AbstractConnection
-        self.channel: AbstractChannel
-        self.result_exchange: AbstractExchange
+        self.pipeline = pipeline
+        # фабрика подключения; харнесс подменяет её брокером в памяти
+        self._connect = connect
+        # None — не публиковать прогресс по тестам
+        self.progress_interval = progress_interval
+        self._progress_tasks: set[asyncio.Task[None]] = set()
+        self.connection: BrokerConnection
+        self.channel: BrokerChannel
+        self.result_exchange: BrokerExchange
+        self.notification_exchange: BrokerExchange
 
     async def connect(self) -> None:
-        self.connection = await aio_pika.connect_robust(self.rabbit_url)
+        self.connection = await self._connect(self.rabbit_url)
         self.channel = await self.connection.channel()
-        await self.channel.set_qos(prefetch_count=1)
+        # держим в работе столько попыток, сколько вмещают обе стадии
+        await self.channel.set_qos(prefetch_count=self.pipeline.capacity)
 
         await self.channel.declare_exchange(
             TASK_EXCHANGE, ExchangeType.DIRECT, durable=True
@@ -42,6 +99,10 @@ class CodeExecutionWorker:
             "execution_results", ExchangeType.FANOUT, durable=True
         )
 
+        self.notification_exchange = await self.channel.declare_exchange(
+            NOTIFICATION_EXCHANGE, ExchangeType.FANOUT, durable=True
+        )
+
         logger.info("RabbitMQ connected")
 
     async def consume(self) -> None:
@@ -49,7 +110,7 @@ class CodeExecutionWorker:
         await queue.bind(exchange=TASK_EXCHANGE, routing_key=TASK_ROUTING_KEY)
         await queue.consume(self._process_message)
 
-    async def _process_message(self, message: AbstractIncomingMessage):
+    async def _process_message(self, message: BrokerMessage) -> None:
         async with message.process():
             data: dict[str, Any] = json.loads(message.body.decode())
             attempt = Attempt(
@@ -64,7 +125,9 @@ class CodeExecutionWorker:
             )
 
             try:
-                result = AttemptExecutor(attempt).execute()
+                result = await self.pipeline.execute(
+                    attempt, on_test=self._progress_observer(attempt.id)
+                )
             except Exception:
                 payload = {
                     "id": attempt.id,
@@ -78,6 +141,48 @@ class CodeExecutionWorker:
 
             await self._publish_result(payload)
 
+    def _progress_observer(self, attempt_id: int) -> TestObserver | None:
+        if self.progress_interval is None:
+            return None
+        interval = self.progress_interval
+        last_sent = float("-inf")
+
+        def on_test(passed: int, total: int) -> None:
+            nonlocal last_sent
+            now = time.monotonic()
+            if now - last_sent < interval:
+                return
+            last_sent = now
+            task = asyncio.create_task(
+                self._publish_progress(attempt_id, passed, total)
+            )
+            self._progress_tasks.add(task)
+            task.add_done_callback(self._progress_tasks.discard)
+
+        return on_test
+
+    async def _publish_progress(
+        self, attempt_id: int, passed: int, total: int
+    ) -> None:
+        msg = Message(
+            json.dumps(
+                {
+                    "event": "progress",
+                    "id": attempt_id,
+                    "passed_tests": passed,
+                    "total_tests": total,
+                }
+            ).encode(),
+            delivery_mode=aio_pika.DeliveryMode.NOT_PERSISTENT,
+        )
+        try:
+            await self.notification_exchange.publish(msg, routing_key="")
+        except Exception:
+            # прогресс необязателен, вердикт уйдёт своим путём
+            logger.warning(
+                "Failed to publish progress of attempt %s", attempt_id
+            )
+
     async def _publish_result(self, result: dict[str, Any]) -> None:
         msg = Message(
             json.dumps(result).encode(),
@@ -1,14 +1,22 @@
+import math
 import os
 import pathlib
 import resource
 import shutil
 import subprocess
 import sys
+import threading
 import time
 from dataclasses import dataclass
 from multiprocessing import Manager, Process
+from typing import IO
 
 from .config import COMPILATION_OUTPUT_LIMIT_MB, OUTPUT_LIMIT_MB
+from .diagnostics import (
+    DEFAULT_DIAGNOSTIC_LIMITS,
+    DiagnosticLimits,
+    OutputCapture,
+)
 from .enums import ExecutionStatus, ProgrammingLanguage
 from .process_monitor import ProcessMonitor
 
@@ -37,10 +45,11 @@ class CommandRunner:
         cmd: list[str],
         *,
         stdin: bytes,
-        sec: int,
+        sec: float,
         mem: int,
         plang: ProgrammingLanguage,
         is_compilation: bool = False,
+        diagnostics: DiagnosticLimits = DEFAULT_DIAGNOSTIC_LIMITS,
     ):
         self.cmd = cmd
         self.stdin = stdin
@@ -48,6 +57,7 @@ class CommandRunner:
         self.mem = mem
         self.plang = plang
         self.is_compilation = is_compilation
+        self.diagnostics = diagnostics
         self._prepare_env()
 
     def run(self) -> RunResult:
@@ -93,21 +103,52 @@ class CommandRunner:
         monitor = ProcessMonitor(proc.pid, self.sec, self.mem)
         monitor.start()
 
+        # stdout целиком нужен только для сравнения с ответом и только в
+        # пределах лимита, stderr идёт в результат лишь отрывком: потоки
+        # читаются по мере записи, и в памяти остаётся не больше этого
+        stdout = OutputCapture(
+            keep=OUTPUT_LIMIT_MB * 1024 * 1024, limits=self.diagnostics
+        )
+        stderr = OutputCapture(keep=0, limits=self.diagnostics)
+        streams = [
+            threading.Thread(target=capture.drain, args=(stream,), daemon=True)
+            for capture, stream in (
+                (stdout, proc.stdout),
+                (stderr, proc.stderr),
+            )
+        ]
+        streams.append(
+            threading.Thread(
+                target=self._feed_stdin, args=(proc.stdin,), daemon=True
+            )
+        )
+        for thread in streams:
+            thread.start()
+
         try:
-            out, err = proc.communicate(self.stdin, timeout=self.sec + 1)
+            proc.wait(timeout=self.sec + 1)
         except subprocess.TimeoutExpired:
             proc.kill()
             shared["timeout"] = True
-            out, err = b"", b""
+            out, err, output_exceeded = "", "", False
+        else:
+            for thread in streams:
+                thread.join()
+            output_exceeded = stdout.exceeded
+            out = (
+                stdout.excerpt()
+                if output_exceeded
+                else stdout.data().decode(errors="ignore")
+            )
+            err = stderr.excerpt()
         finally:
             elapsed = time.perf_counter() - start
             monitor.stop()
             peak_mb = max(monitor.peak_mb, self._self_peak())
 
-        # результаты
         shared.update(
-            stdout=out.decode(errors="ignore").rstrip(),
-            stderr=err.decode(errors="ignore").rstrip(),
+            stdout=out.rstrip(),
+            stderr=err.rstrip(),
             elapsed=elapsed,
             returncode=proc.returncode,
             peak_mb=peak_mb,
@@ -115,13 +156,21 @@ class CommandRunner:
             kill_reason=monitor.reason,
         )
         # флаги-нарушители
-        if len(out) > OUTPUT_LIMIT_MB * 1024 * 1024:
+        if output_exceeded:
             shared["output_exceeded"] = True
         if elapsed > self.sec:
             shared["time_exceeded"] = True
         if peak_mb > self.mem:
             shared["memory_exceeded"] = True
 
+    def _feed_stdin(self, stream: IO[bytes]) -> None:
+        try:
+            stream.write(self.stdin)
+            stream.close()
+        except BrokenPipeError:
+            # процесс завершился, не дочитав ввод
+            pass
+
     @staticmethod
     def _self_peak() -> float:
         """Возвращает пиковое использование памяти в мегабайтах"""
@@ -134,10 +183,11 @@ class CommandRunner:
         return usage / 1024
 
     @staticmethod
-    def _set_limits(sec: int, mem_mb: int, is_compilation: bool) -> None:
+    def _set_limits(sec: float, mem_mb: int, is_compilation: bool) -> None:
         """Выставить CPU-, память- и output-лимиты для текущего процесса."""
         # mem_bytes = mem_mb * 1024 * 1024
-        resource.setrlimit(resource.RLIMIT_CPU, (sec, sec))
+        cpu_sec = math.ceil(sec)
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_sec, cpu_sec))
 
         # if sys.platform == "darwin":  # RLIMIT_AS менее стабилен на macOS
         #     target = resource.RLIMIT_DATA
@@ -0,0 +1,15 @@
+from app.calibration import SpeedCalibrator
+from app.config import SPEED_FACTOR_MAX, SPEED_FACTOR_MIN
+
+
+class TestSpeedCalibrator:
+    def test_factor_is_relative_to_reference(self):
+        calibrator = SpeedCalibrator(reference_seconds=1.0, runs=1)
+        factor = calibrator.calibrate()
+        assert calibrator.measured_seconds is not None
+        assert factor == calibrator.speed_factor
+        assert SPEED_FACTOR_MIN <= factor <= SPEED_FACTOR_MAX
+
+    def test_factor_is_clamped(self):
+        calibrator = SpeedCalibrator(reference_seconds=1e-9, runs=1)
+        assert calibrator.calibrate() == SPEED_FACTOR_MAX
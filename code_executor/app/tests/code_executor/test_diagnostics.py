@@ -0,0 +1,84 @@
+import io
+
+from app.config import DIAGNOSTIC_HEAD_BYTES, DIAGNOSTIC_TAIL_BYTES
+from app.diagnostics import DiagnosticLimits, OutputCapture, excerpt
+from app.enums import ExecutionStatus, ProgrammingLanguage
+from app.executor import AttemptExecutor
+from app.models import Attempt
+
+LIMIT = DIAGNOSTIC_HEAD_BYTES + DIAGNOSTIC_TAIL_BYTES
+
+
+class TestExcerpt:
+    def test_short_output_is_kept(self):
+        assert excerpt(b"hello\n") == "hello\n"
+
+    def test_long_output_is_cut(self):
+        data = b"a" * 10 + b"b" * 100 + b"c" * 5
+        text = excerpt(data, head=10, tail=5)
+        assert text.startswith("a" * 10)
+        assert text.endswith("c" * 5)
+        assert "[100 bytes omitted, 115 bytes total]" in text
+
+
+class TestOutputCapture:
+    def test_matches_excerpt(self):
+        data = bytes(range(256)) * 40
+        capture = OutputCapture(
+            keep=0, limits=DiagnosticLimits(head=100, tail=50)
+        )
+        capture.drain(io.BytesIO(data))
+        assert capture.exceeded
+        assert capture.excerpt() == excerpt(data, head=100, tail=50)
+
+    def test_memory_is_bounded(self):
+        capture = OutputCapture(
+            keep=0, limits=DiagnosticLimits(head=10, tail=5)
+        )
+        for _ in range(1000):
+            capture.feed(b"x" * 1000)
+        capture.feed(b"end")
+        assert capture.total == 1_000_003
+        assert len(capture.data()) == 15
+        assert capture.excerpt().endswith("xxend")
+
+    def test_output_within_keep_is_whole(self):
+        capture = OutputCapture(
+            keep=1000, limits=DiagnosticLimits(head=10, tail=5)
+        )
+        capture.feed(b"a" * 500)
+        assert not capture.exceeded
+        assert capture.data() == b"a" * 500
+
+
+class TestPython:
+    def test_wrong_answer_huge_output(self):
+        attempt = Attempt(
+            id=41,
+            programming_language=ProgrammingLanguage.PYTHON,
+            source_code="print('x' * 1024 * 1024)\n",
+            time_limit_seconds=5,
+            memory_limit_megabytes=64,
+            tests=[[[], ["y"]]],
+        )
+        result = AttemptExecutor(attempt).execute()
+        assert result.status == ExecutionStatus.WRONG_ANSWER
+        assert result.source_code_output is not None
+        assert len(result.source_code_output) < LIMIT + 100
+        assert f"{1024 * 1024} bytes total" in result.source_code_output
+
+    def test_runtime_error_huge_traceback(self):
+        attempt = Attempt(
+            id=42,
+            programming_language=ProgrammingLanguage.PYTHON,
+            source_code=(
+                "import sys\nsys.stderr.write('e' * 1024 * 1024)\nsys.exit(1)\n"
+            ),
+            time_limit_seconds=5,
+            memory_limit_megabytes=64,
+            tests=[[[], [""]]],
+        )
+        result = AttemptExecutor(attempt).execute()
+        assert result.status == ExecutionStatus.RUNTIME_ERROR
+        assert result.error_traceback is not None
+        assert len(result.error_traceback) < LIMIT + 100
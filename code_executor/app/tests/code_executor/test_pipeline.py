@@ -0,0 +1,87 @@
+import asyncio
+
+from app.enums import ExecutionStatus, ProgrammingLanguage
+from app.models import Attempt
+from app.pipeline import ExecutionPipeline
+
+
+def _python_attempt(attempt_id: int, source_code: str) -> Attempt:
+    return Attempt(
+        id=attempt_id,
+        programming_language=ProgrammingLanguage.PYTHON,
+        source_code=source_code,
+        time_limit_seconds=5,
+        memory_limit_megabytes=64,
+        tests=[[["5"], ["25"]], [["3"], ["9"]]],
+    )
+
+
+class TestPipeline:
+    def test_mixed_attempts(self):
+        attempts = [
+            _python_attempt(1, "n=int(input());print(n*n)\n"),
+            _python_attempt(2, "n=int(input());print(n+n)\n"),
+            Attempt(
+                id=3,
+                programming_language=ProgrammingLanguage.CPP,
+                source_code=(
+                    "#include <iostream>\n"
+                    "int main(){int n;std::cin>>n;std::cout<<n*n<<'\\n';}\n"
+                ),
+                time_limit_seconds=5,
+                memory_limit_megabytes=64,
+                tests=[[["5"], ["25"]], [["3"], ["9"]]],
+            ),
+            Attempt(
+                id=4,
+                programming_language=ProgrammingLanguage.CPP,
+                source_code="int main( {\n",
+                time_limit_seconds=5,
+                memory_limit_megabytes=64,
+                tests=[[["5"], ["25"]]],
+            ),
+        ]
+        pipeline = ExecutionPipeline(compile_concurrency=2, run_concurrency=2)
+
+        async def run_all():
+            return await asyncio.gather(
+                *(pipeline.execute(attempt) for attempt in attempts)
+            )
+
+        try:
+            results = asyncio.run(run_all())
+        finally:
+            pipeline.shutdown()
+
+        assert [result.id for result in results] == [1, 2, 3, 4]
+        assert [result.status for result in results] == [
+            ExecutionStatus.OK,
+            ExecutionStatus.WRONG_ANSWER,
+            ExecutionStatus.OK,
+            ExecutionStatus.COMPILATION_ERROR,
+        ]
+
+    def test_test_progress(self):
+        pipeline = ExecutionPipeline(compile_concurrency=1, run_concurrency=1)
+        progress: list[tuple[int, int]] = []
+
+        async def run(attempt: Attempt):
+            return await pipeline.execute(
+                attempt,
+                on_test=lambda passed, total: progress.append((passed, total)),
+            )
+
+        try:
+            ok = asyncio.run(
+                run(_python_attempt(1, "n=int(input());print(n*n)\n"))
+            )
+            wa = asyncio.run(
+                run(_python_attempt(2, "n=int(input());print(25)\n"))
+            )
+        finally:
+            pipeline.shutdown()
+
+        assert ok.status == ExecutionStatus.OK
+        assert wa.status == ExecutionStatus.WRONG_ANSWER
+        # вторая попытка падает на втором тесте: прогресс только за первый
+        assert progress == [(1, 2), (2, 2), (1, 2)]
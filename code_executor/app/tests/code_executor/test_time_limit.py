@@ -1,3 +1,5 @@
+import pytest
+
 from app.enums import ExecutionStatus, ProgrammingLanguage
 from app.executor import AttemptExecutor
 from app.models import Attempt
@@ -159,3 +161,34 @@ class TestCSharp:
         )
         result = AttemptExecutor(attempt).execute()
         assert result.status == ExecutionStatus.TIME_LIMIT_EXCEEDED
+
+
+class TestSpeedFactor:
+    def test_slow_node_scales_limit(self):
+        attempt = Attempt(
+            id=39,
+            programming_language=ProgrammingLanguage.PYTHON,
+            source_code="import time\ntime.sleep(1.2)\nprint(1)\n",
+            time_limit_seconds=1,
+            memory_limit_megabytes=64,
+            tests=[[[], ["1"]]],
+        )
+        result = AttemptExecutor(attempt, speed_factor=3.0).execute()
+        assert result.status == ExecutionStatus.OK
+        assert result.speed_factor == pytest.approx(3.0)
+        assert result.raw_time_used_ms >= 1200
+        assert result.time_used_ms == pytest.approx(
+            result.raw_time_used_ms / 3, abs=1
+        )
+
+    def test_fast_node_scales_limit(self):
+        attempt = Attempt(
+            id=40,
+            programming_language=ProgrammingLanguage.PYTHON,
+            source_code="import time\ntime.sleep(1.3)\nprint(1)\n",
+            time_limit_seconds=2,
+            memory_limit_megabytes=64,
+            tests=[[[], ["1"]]],
+        )
+        result = AttemptExecutor(attempt, speed_factor=0.5).execute()
+        assert result.status == ExecutionStatus.TIME_LIMIT_EXCEEDED
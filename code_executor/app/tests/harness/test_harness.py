@@ -0,0 +1,151 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from app.enums import ExecutionStatus
+from app.harness.bench import run_benchmark
+from app.harness.replay import compare, load_results, load_traffic, save_results
+from app.harness.workload import WorkItem, generate_workload, parse_mix
+
+
+class TestWorkload:
+    def test_parse_mix(self):
+        assert parse_mix("python:ok=3, cpp:ce") == {
+            ("python", "ok"): 3,
+            ("cpp", "ce"): 1,
+        }
+
+    def test_parse_mix_unknown_template(self):
+        with pytest.raises(ValueError, match="Unknown workload template"):
+            parse_mix("python:ce=1")
+
+    def test_generate_is_reproducible(self):
+        mix = parse_mix("python:ok=1,python:wa=1")
+        first = generate_workload(20, mix, tests=3, seed=7)
+        second = generate_workload(20, mix, tests=3, seed=7)
+        assert [i.payload for i in first] == [i.payload for i in second]
+        assert all(len(i.payload["tests"]) == 3 for i in first)
+
+
+class TestBenchmark:
+    def test_python_mix(self):
+        items = generate_workload(
+            8,
+            parse_mix("python:ok=2,python:wa=1,python:re=1"),
+            tests=3,
+            time_limit_seconds=5,
+        )
+        report = asyncio.run(
+            run_benchmark(items, compile_concurrency=1, run_concurrency=2)
+        )
+
+        assert report.attempts == 8
+        assert len(report.latencies) == 8
+        assert not report.mismatches
+        assert sum(report.statuses.values()) == 8
+        assert set(report.statuses) <= {
+            ExecutionStatus.OK.value,
+            ExecutionStatus.WRONG_ANSWER.value,
+            ExecutionStatus.RUNTIME_ERROR.value,
+        }
+        for phase in (
+            "broker_wait",
+            "compile_wait",
+            "compile",
+            "run_wait",
+            "run",
+        ):
+            assert len(report.phases[phase]) == 8
+        assert report.throughput > 0
+
+    def test_lost_result_fails_the_run(self):
+        # воркер падает на неполном сообщении и не публикует результат
+        items = [WorkItem(payload={"id": 1})]
+        with pytest.raises(TimeoutError, match="1 attempts still pending"):
+            asyncio.run(
+                run_benchmark(
+                    items,
+                    compile_concurrency=1,
+                    run_concurrency=1,
+                    idle_seconds=0.2,
+                )
+            )
+
+
+def _write_traffic(path, entries):
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        for offset, task in entries:
+            f.write(json.dumps({"offset": offset, "task": task}) + "\n")
+
+
+class TestReplay:
+    def test_load_traffic_across_restarts(self, tmp_path):
+        path = tmp_path / "traffic.jsonl.gz"
+        items = generate_workload(4, parse_mix("python:ok"), tests=2)
+        _write_traffic(path, [(0.0, items[0].payload), (1.5, items[1].payload)])
+        _write_traffic(path, [(0.5, items[2].payload), (2.0, items[3].payload)])
+
+        loaded = load_traffic(path)
+
+        assert [i.offset_seconds for i in loaded] == [0.0, 1.5, 2.0, 3.5]
+        assert loaded[2].payload == items[2].payload
+
+    def test_load_traffic_renumbers_repeated_ids(self, tmp_path):
+        path = tmp_path / "traffic.jsonl.gz"
+        items = generate_workload(2, parse_mix("python:ok"), tests=2)
+        # каждый запуск записывающего сервера нумерует попытки с единицы
+        for _ in range(2):
+            _write_traffic(
+                path, [(i * 0.1, item.payload) for i, item in enumerate(items)]
+            )
+
+        loaded = load_traffic(path)
+
+        assert [i.payload["id"] for i in loaded] == [1, 2, 3, 4]
+        report = asyncio.run(
+            run_benchmark(
+                loaded,
+                compile_concurrency=1,
+                run_concurrency=2,
+                speed=10,
+                idle_seconds=30,
+            )
+        )
+        assert sorted(report.results) == [1, 2, 3, 4]
+
+    def test_replay_and_compare(self, tmp_path):
+        path = tmp_path / "traffic.jsonl.gz"
+        items = generate_workload(
+            4,
+            parse_mix("python:ok=1,python:wa=1"),
+            tests=2,
+            time_limit_seconds=5,
+        )
+        _write_traffic(
+            path, [(i * 0.5, item.payload) for i, item in enumerate(items)]
+        )
+
+        report = asyncio.run(
+            run_benchmark(
+                load_traffic(path),
+                compile_concurrency=1,
+                run_concurrency=2,
+                speed=10,
+            )
+        )
+        results_path = tmp_path / "results.jsonl.gz"
+        save_results(results_path, report.results)
+        baseline = load_results(results_path)
+        baseline[1] = {**baseline[1], "status": "Run-time error"}
+
+        comparison = compare(report.results, baseline)
+
+        assert comparison.compared == 4
+        assert comparison.verdict_changes == [
+            (1, "Run-time error", report.results[1]["status"])
+        ]
+        assert set(comparison.time_ratios) == {
+            i for i, r in report.results.items() if r["time_used_ms"]
+        }
@@ -15,6 +15,7 @@ export interface AdminStats {
   most_used_tags: Array<{ name: string; usage_count: number }>;
   registrations_last_30_days: number;
   attempts_last_30_days: number;
+  generated_at: string;
 }
 
 export interface UserForAdmin {
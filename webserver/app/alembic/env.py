@@ -27,6 +27,7 @@ from sqlmodel import SQLModel
 from app.user.models import *
 from app.task.models import *
 from app.attempt.models import *
+from app.statistics.models import *
 
 
 target_metadata = SQLModel.metadata
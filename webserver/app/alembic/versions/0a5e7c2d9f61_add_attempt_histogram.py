@@ -0,0 +1,57 @@
+"""Add attempt_histogram
+
+Revision ID: 0a5e7c2d9f61
+Revises: f8d4b1c0e526
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a5e7c2d9f61'
+down_revision: Union[str, None] = 'f8d4b1c0e526'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app.attempt.sketch.BUCKETS_PER_OCTAVE
+BUCKETS_PER_OCTAVE = 4
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attempt_histogram',
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('programming_language', postgresql.ENUM(name='programming_language_enum', create_type=False), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('bucket', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('task_id', 'programming_language', 'metric', 'bucket')
+    )
+    # заполняем по уже принятым попыткам
+    for metric in ('time_used_ms', 'memory_used_bytes'):
+        op.execute(
+            f"""
+            INSERT INTO attempt_histogram
+                (task_id, programming_language, metric, bucket, count)
+            SELECT task_id,
+                   programming_language,
+                   '{metric}',
+                   floor(log(2, greatest({metric}, 0)::numeric + 1)
+                         * {BUCKETS_PER_OCTAVE}),
+                   count(*)
+            FROM attempt
+            WHERE status = 'OK' AND task_id IS NOT NULL
+            GROUP BY task_id, programming_language, 4
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('attempt_histogram')
@@ -0,0 +1,142 @@
+"""Add HyperLogLog user sketches
+
+Revision ID: 1b6f8d3e0a72
+Revises: 0a5e7c2d9f61
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+from uuid import UUID
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b6f8d3e0a72'
+down_revision: Union[str, None] = '0a5e7c2d9f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# копия app.statistics.hll на момент миграции: регистры, записанные
+# заполнением, должны совпадать с hll_add и hll_merge ниже
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+REST_BITS = 64 - PRECISION
+
+
+def _register_of(user_id: UUID) -> tuple[int, int]:
+    """Номер регистра и значение, которое пользователь в него пишет."""
+    digest = hashlib.blake2b(user_id.bytes, digest_size=8).digest()
+    value = int.from_bytes(digest, 'big')
+    index = value >> REST_BITS
+    rest = value & ((1 << REST_BITS) - 1)
+    return index, REST_BITS - rest.bit_length() + 1
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_user_sketch',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('event', sa.String(), nullable=False),
+    sa.Column('registers', postgresql.ARRAY(sa.SmallInteger()), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'event')
+    )
+    op.create_table('task_user_sketch',
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('event', sa.String(), nullable=False),
+    sa.Column('registers', postgresql.ARRAY(sa.SmallInteger()), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('task_id', 'event')
+    )
+    # регистры поднимаются до переданных значений; NULL — пустой скетч
+    op.execute(
+        f"""
+        CREATE FUNCTION hll_add(
+            registers smallint[], indices integer[], ranks smallint[]
+        ) RETURNS smallint[] LANGUAGE sql IMMUTABLE AS $$
+            SELECT array_agg(greatest(r.value, n.rank) ORDER BY r.i)
+            FROM unnest(
+                coalesce(registers, array_fill(0::smallint, ARRAY[{REGISTERS}]))
+            ) WITH ORDINALITY AS r(value, i)
+            LEFT JOIN (
+                SELECT u.i, max(u.rank) AS rank
+                FROM unnest(indices, ranks) AS u(i, rank)
+                GROUP BY u.i
+            ) n ON n.i = r.i
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION hll_merge(a smallint[], b smallint[])
+        RETURNS smallint[] LANGUAGE sql IMMUTABLE STRICT AS $$
+            SELECT array_agg(greatest(u.x, u.y) ORDER BY u.i)
+            FROM unnest(a, b) WITH ORDINALITY AS u(x, y, i)
+        $$
+        """
+    )
+    op.execute(
+        "CREATE AGGREGATE hll_union(smallint[]) "
+        "(SFUNC = hll_merge, STYPE = smallint[])"
+    )
+    # заполняем по уже существующим попыткам
+    day = "(created_at AT TIME ZONE 'UTC')::date"
+    for event, condition in (("submitted", "TRUE"), ("solved", "status = 'OK'")):
+        _backfill('daily_user_sketch', 'day', day, event, condition)
+        _backfill('task_user_sketch', 'task_id', 'task_id', event, condition)
+
+
+def _backfill(
+    table: str, key_column: str, key_sql: str, event: str, condition: str
+) -> None:
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            f"""
+            SELECT DISTINCT {key_sql} AS key, user_id
+            FROM attempt
+            WHERE user_id IS NOT NULL AND task_id IS NOT NULL AND {condition}
+            """
+        )
+    )
+    sketches: dict = {}
+    for key, user_id in rows:
+        index, rank = _register_of(user_id)
+        registers = sketches.setdefault(key, {})
+        registers[index + 1] = max(registers.get(index + 1, 0), rank)
+
+    for key, registers in sketches.items():
+        bind.execute(
+            sa.text(
+                f"""
+                INSERT INTO {table} ({key_column}, event, registers)
+                VALUES (
+                    :key,
+                    :event,
+                    hll_add(
+                        NULL,
+                        CAST(:indices AS integer[]),
+                        CAST(:ranks AS smallint[])
+                    )
+                )
+                """
+            ),
+            {
+                "key": key,
+                "event": event,
+                "indices": list(registers),
+                "ranks": list(registers.values()),
+            },
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP AGGREGATE hll_union(smallint[])")
+    op.execute("DROP FUNCTION hll_merge(smallint[], smallint[])")
+    op.execute("DROP FUNCTION hll_add(smallint[], integer[], smallint[])")
+    op.drop_table('task_user_sketch')
+    op.drop_table('daily_user_sketch')
@@ -0,0 +1,153 @@
+"""Partition attempt by month and add attempt_archive
+
+Revision ID: 2c7a9e4f1b83
+Revises: 1b6f8d3e0a72
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c7a9e4f1b83'
+down_revision: Union[str, None] = '1b6f8d3e0a72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    'user_id, task_id, programming_language, source_code, id, status, '
+    'failed_test_number, source_code_output, expected_output, created_at, '
+    'time_used_ms, memory_used_bytes, error_traceback'
+)
+INDEXES = (
+    ('ix_attempt_user_id_created_at_id', ['user_id', 'created_at', 'id']),
+    ('ix_attempt_task_id_created_at_id', ['task_id', 'created_at', 'id']),
+    ('ix_attempt_created_at_id', ['created_at', 'id']),
+    ('ix_attempt_user_id_status_created_at', ['user_id', 'status', 'created_at']),
+)
+# секции создаются и дальше фоновой задачей app.attempt.archive
+MONTHS_AHEAD = 2
+
+
+def _attempt_columns() -> list[sa.Column]:
+    return [
+        sa.Column('user_id', sa.Uuid(), nullable=True),
+        sa.Column('task_id', sa.Integer(), nullable=True),
+        sa.Column('programming_language', postgresql.ENUM(name='programming_language_enum', create_type=False), nullable=True),
+        sa.Column('source_code', sa.String(), nullable=False),
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('attempt_id_seq')"), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='attempt_status_enum', create_type=False), nullable=True),
+        sa.Column('failed_test_number', sa.Integer(), nullable=True),
+        sa.Column('source_code_output', sa.String(), nullable=True),
+        sa.Column('expected_output', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('time_used_ms', sa.Integer(), nullable=False),
+        sa.Column('memory_used_bytes', sa.Integer(), nullable=False),
+        sa.Column('error_traceback', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['task.id'], name='attempt_task_id_fkey', ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='attempt_user_id_fkey', ondelete='CASCADE'),
+    ]
+
+
+def _swap_tables(old: str) -> None:
+    """Подменяет attempt таблицей attempt_new, сохраняя последовательность id."""
+    op.execute('ALTER SEQUENCE attempt_id_seq OWNED BY NONE')
+    op.drop_table(old)
+    op.rename_table('attempt_new', 'attempt')
+    op.execute('ALTER SEQUENCE attempt_id_seq OWNED BY attempt.id')
+    for name, columns in INDEXES:
+        op.create_index(name, 'attempt', columns, unique=False)
+
+
+def _restore_archived() -> None:
+    """Возвращает архивированные поля обратно в попытки."""
+    bind = op.get_bind()
+    rows = bind.execute(sa.text('SELECT attempt_id, payload FROM attempt_archive'))
+    for attempt_id, payload in rows.all():
+        fields = json.loads(zlib.decompress(payload))
+        bind.execute(
+            sa.text(
+                'UPDATE attempt SET source_code = :source_code, '
+                'source_code_output = :source_code_output, '
+                'expected_output = :expected_output, '
+                'error_traceback = :error_traceback '
+                'WHERE id = :id'
+            ),
+            {**fields, 'id': attempt_id},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='attempt')
+    op.execute('ALTER TABLE attempt RENAME CONSTRAINT attempt_pkey TO attempt_old_pkey')
+    op.rename_table('attempt', 'attempt_old')
+
+    op.create_table(
+        'attempt_new',
+        *_attempt_columns(),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at', name='attempt_pkey'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    # помесячные секции от самой старой попытки до MONTHS_AHEAD месяцев
+    # вперёд; границы — по UTC
+    op.execute(f"""
+        DO $$
+        DECLARE month timestamp;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce(min(created_at), now()) AT TIME ZONE 'UTC'),
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )
+                FROM attempt_old
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF attempt_new FOR VALUES FROM (%L) TO (%L)',
+                    'attempt_' || to_char(month, 'YYYY_MM'),
+                    month AT TIME ZONE 'UTC',
+                    (month + interval '1 month') AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END
+        $$
+    """)
+    op.execute('CREATE TABLE attempt_default PARTITION OF attempt_new DEFAULT')
+    op.execute(f'INSERT INTO attempt_new ({COLUMNS}) SELECT {COLUMNS} FROM attempt_old')
+    _swap_tables('attempt_old')
+
+    op.create_table(
+        'attempt_archive',
+        sa.Column('attempt_id', sa.Integer(), nullable=False),
+        sa.Column('attempt_created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['attempt_id', 'attempt_created_at'], ['attempt.id', 'attempt.created_at'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('attempt_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _restore_archived()
+    op.drop_table('attempt_archive')
+
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='attempt')
+    op.rename_table('attempt', 'attempt_old')
+    op.create_table(
+        'attempt_new',
+        *_attempt_columns(),
+        sa.PrimaryKeyConstraint('id', name='attempt_new_pkey'),
+    )
+    op.execute(f'INSERT INTO attempt_new ({COLUMNS}) SELECT {COLUMNS} FROM attempt_old')
+    _swap_tables('attempt_old')
+    op.execute('ALTER TABLE attempt RENAME CONSTRAINT attempt_new_pkey TO attempt_pkey')
@@ -0,0 +1,55 @@
+"""Add user_task_status
+
+Revision ID: 3c1f7a9e2b54
+Revises: 712c2e77a6d6
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9e2b54'
+down_revision: Union[str, None] = '712c2e77a6d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_task_status',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('attempts_count', sa.Integer(), nullable=False),
+    sa.Column('solved_count', sa.Integer(), nullable=False),
+    sa.Column('first_solved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('status', sa.String(), sa.Computed("CASE WHEN solved_count > 0 THEN 'solved' ELSE 'attempted' END", persisted=True), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'task_id')
+    )
+    op.create_index(op.f('ix_user_task_status_task_id'), 'user_task_status', ['task_id'], unique=False)
+    # заполняем по уже существующим попыткам
+    op.execute(
+        """
+        INSERT INTO user_task_status
+            (user_id, task_id, attempts_count, solved_count, first_solved_at)
+        SELECT user_id,
+               task_id,
+               count(*),
+               count(*) FILTER (WHERE status = 'OK'),
+               min(created_at) FILTER (WHERE status = 'OK')
+        FROM attempt
+        WHERE user_id IS NOT NULL AND task_id IS NOT NULL
+        GROUP BY user_id, task_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_task_status_task_id'), table_name='user_task_status')
+    op.drop_table('user_task_status')
@@ -0,0 +1,33 @@
+"""Add keyset pagination indexes
+
+Revision ID: 8d2e4b6a1f03
+Revises: 3c1f7a9e2b54
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6a1f03'
+down_revision: Union[str, None] = '3c1f7a9e2b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_attempt_user_id_created_at_id', 'attempt', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_attempt_task_id_created_at_id', 'attempt', ['task_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_attempt_created_at_id', 'attempt', ['created_at', 'id'], unique=False)
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_created_at_id', table_name='user')
+    op.drop_index('ix_attempt_created_at_id', table_name='attempt')
+    op.drop_index('ix_attempt_task_id_created_at_id', table_name='attempt')
+    op.drop_index('ix_attempt_user_id_created_at_id', table_name='attempt')
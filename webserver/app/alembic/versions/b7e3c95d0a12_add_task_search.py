@@ -0,0 +1,33 @@
+"""Add task search vector and title prefix index
+
+Revision ID: b7e3c95d0a12
+Revises: 8d2e4b6a1f03
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c95d0a12'
+down_revision: Union[str, None] = '8d2e4b6a1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', description), 'B')", persisted=True), nullable=True))
+    op.create_index('ix_task_search_vector', 'task', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_task_title_prefix', 'task', [sa.text('lower(title) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_title_prefix', table_name='task')
+    op.drop_index('ix_task_search_vector', table_name='task', postgresql_using='gin')
+    op.drop_column('task', 'search_vector')
@@ -0,0 +1,51 @@
+"""Add stored task sort keys and tag id array
+
+Revision ID: c4a8f1e6d237
+Revises: b7e3c95d0a12
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8f1e6d237'
+down_revision: Union[str, None] = 'b7e3c95d0a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task', sa.Column('difficulty_rank', sa.Integer(), sa.Computed("CASE difficulty WHEN 'easy' THEN 1 WHEN 'medium' THEN 2 WHEN 'hard' THEN 3 END", persisted=True), nullable=True))
+    op.add_column('task', sa.Column('acceptance_rate', sa.Numeric(), sa.Computed("CASE WHEN total_attempts > 0 THEN correct_attempts::numeric / total_attempts ELSE 0 END", persisted=True), nullable=True))
+    op.add_column('task', sa.Column('tag_ids', postgresql.ARRAY(sa.Integer()), server_default=sa.text("'{}'"), nullable=False))
+    op.execute(
+        """
+        UPDATE task
+        SET tag_ids = links.tag_ids
+        FROM (
+            SELECT task_id, array_agg(tag_id ORDER BY tag_id) AS tag_ids
+            FROM tasktaglink
+            GROUP BY task_id
+        ) AS links
+        WHERE links.task_id = task.id
+        """
+    )
+    op.create_index('ix_task_difficulty_rank_id', 'task', ['difficulty_rank', 'id'], unique=False)
+    op.create_index('ix_task_acceptance_rate_id', 'task', ['acceptance_rate', 'id'], unique=False)
+    op.create_index('ix_task_tag_ids', 'task', ['tag_ids'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_tag_ids', table_name='task', postgresql_using='gin')
+    op.drop_index('ix_task_acceptance_rate_id', table_name='task')
+    op.drop_index('ix_task_difficulty_rank_id', table_name='task')
+    op.drop_column('task', 'tag_ids')
+    op.drop_column('task', 'acceptance_rate')
+    op.drop_column('task', 'difficulty_rank')
@@ -0,0 +1,54 @@
+"""Add user_score
+
+Revision ID: d5b9e2f7a348
+Revises: c4a8f1e6d237
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b9e2f7a348'
+down_revision: Union[str, None] = 'c4a8f1e6d237'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_score',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('total_score', sa.Integer(), nullable=False),
+    sa.Column('solved_tasks_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_user_score_total_score_user_id', 'user_score', [sa.text('total_score DESC'), 'user_id'], unique=False)
+    # заполняем по уже решённым задачам
+    op.execute(
+        """
+        INSERT INTO user_score (user_id, total_score, solved_tasks_count)
+        SELECT s.user_id,
+               sum(CASE t.difficulty
+                       WHEN 'easy' THEN 3
+                       WHEN 'medium' THEN 5
+                       WHEN 'hard' THEN 10
+                       ELSE 0
+                   END),
+               count(*)
+        FROM user_task_status s
+        JOIN task t ON t.id = s.task_id
+        WHERE s.solved_count > 0
+        GROUP BY s.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_score_total_score_user_id', table_name='user_score')
+    op.drop_table('user_score')
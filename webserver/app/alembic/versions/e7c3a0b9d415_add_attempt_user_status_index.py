@@ -0,0 +1,27 @@
+"""Add attempt (user_id, status, created_at) index
+
+Revision ID: e7c3a0b9d415
+Revises: d5b9e2f7a348
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c3a0b9d415'
+down_revision: Union[str, None] = 'd5b9e2f7a348'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_attempt_user_id_status_created_at', 'attempt', ['user_id', 'status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attempt_user_id_status_created_at', table_name='attempt')
@@ -0,0 +1,55 @@
+"""Add attempt_rollup
+
+Revision ID: f8d4b1c0e526
+Revises: e7c3a0b9d415
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8d4b1c0e526'
+down_revision: Union[str, None] = 'e7c3a0b9d415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attempt_rollup',
+    sa.Column('granularity', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('programming_language', postgresql.ENUM(name='programming_language_enum', create_type=False), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='attempt_status_enum', create_type=False), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('granularity', 'bucket_start', 'programming_language', 'status', 'task_id')
+    )
+    # заполняем по уже проверенным попыткам
+    for granularity in ('hour', 'day'):
+        op.execute(
+            f"""
+            INSERT INTO attempt_rollup
+                (granularity, bucket_start, programming_language, status,
+                 task_id, count)
+            SELECT '{granularity}',
+                   date_trunc('{granularity}', created_at, 'UTC'),
+                   programming_language,
+                   status,
+                   task_id,
+                   count(*)
+            FROM attempt
+            WHERE status != 'RUNNING' AND task_id IS NOT NULL
+            GROUP BY 2, programming_language, status, task_id
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('attempt_rollup')
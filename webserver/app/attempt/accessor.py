@@ -1,19 +1,59 @@
-from typing import TypedDict
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, TypedDict
 from uuid import UUID
 
-from sqlalchemy import and_, func
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Integer,
+    SmallInteger,
+    Text,
+    and_,
+    case as sql_case,
+    cast,
+    delete,
+    func,
+    literal,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import col, select
 
 from app.core.accessor import BaseAccessor
-from app.core.exceptions import InternalException
+from app.core.exceptions import InternalException, InvalidCursorException
 from app.core.logger import create_log
-from app.task.models import Task
+from app.core.pagination import decode_cursor, page_query, split_page
+from app.statistics import hll
+from app.statistics.models import (
+    DailyUserSketch,
+    TaskUserSketch,
+    UserSketchEventEnum,
+)
+from app.task.models import Task, UserTaskStatus
+from app.user.models import UserScore
 
 from .exceptions import (
     AttemptNotFoundException,
 )
-from .models import Attempt, AttemptCreate, AttemptStatusEnum, AttemptUpdate
+from .models import (
+    Attempt,
+    AttemptArchive,
+    AttemptCreate,
+    AttemptForListPublic,
+    AttemptHistogram,
+    AttemptMetricEnum,
+    AttemptRollup,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+    RollupGranularityEnum,
+)
+from .sketch import bucket_of
 
 log = create_log(
     __name__,
@@ -24,14 +64,17 @@ log = create_log(
 
 
 class AttemptsDict(TypedDict):
-    attempts: list[Attempt]
-    count: int
+    attempts: list[AttemptForListPublic]
+    count: int | None
+    next_cursor: str | None
 
 
 class AttemptAccessor(BaseAccessor):
     async def get_attempt_by_id(self, *, attempt_id: int) -> Attempt | None:
         try:
             result = await self.session.get(Attempt, attempt_id)
+            if result is not None:
+                await self._restore_archived([result])
 
         except Exception as e:
             log(e)
@@ -39,6 +82,22 @@ class AttemptAccessor(BaseAccessor):
         else:
             return result
 
+    async def get_attempts_by_ids(
+        self, *, attempt_ids: list[int]
+    ) -> list[Attempt]:
+        try:
+            result = await self.session.execute(
+                select(Attempt).where(col(Attempt.id).in_(attempt_ids))
+            )
+            attempts = list(result.scalars().all())
+            await self._restore_archived(attempts)
+
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return attempts
+
     async def get_attempts(
         self,
         *,
@@ -46,6 +105,8 @@ class AttemptAccessor(BaseAccessor):
         task_id: int | None = None,
         skip: int = 0,
         limit: int = 30,
+        cursor: str | None = None,
+        with_count: bool = True,
     ) -> AttemptsDict:
         try:
             conditions = []
@@ -54,52 +115,71 @@ class AttemptAccessor(BaseAccessor):
             if task_id is not None:
                 conditions.append(col(Attempt.task_id) == task_id)
 
-            count_stmt = select(func.count()).select_from(Attempt)
-            if conditions:
-                count_stmt = count_stmt.where(and_(*conditions))
-
-            data_stmt = (
-                select(Attempt)
-                .offset(skip)
-                .limit(limit)
-                .order_by(col(Attempt.created_at).desc())
+            count = None
+            if with_count:
+                count_stmt = select(func.count()).select_from(Attempt)
+                if conditions:
+                    count_stmt = count_stmt.where(and_(*conditions))
+                count_res = await self.session.execute(count_stmt)
+                count = count_res.scalar_one()
+
+            sort_key = [col(Attempt.created_at), col(Attempt.id)]
+            # только колонки списка: код, вывод и traceback остаются в БД
+            # до запроса конкретной попытки
+            data_stmt = select(*AttemptForListPublic.columns()).order_by(
+                *(column.desc() for column in sort_key)
             )
             if conditions:
                 data_stmt = data_stmt.where(and_(*conditions))
 
-            count_res = await self.session.execute(count_stmt)
-            count = count_res.scalar_one()
-
-            attempts_res = await self.session.execute(data_stmt)
-            attempts = list(attempts_res.scalars().all())
+            attempts_res = await self.session.execute(
+                page_query(
+                    data_stmt,
+                    sort_key=sort_key,
+                    after=decode_cursor(cursor, datetime, int)
+                    if cursor is not None
+                    else None,
+                    skip=skip,
+                    limit=limit,
+                    descending=True,
+                )
+            )
+            attempts, next_cursor = split_page(
+                [
+                    AttemptForListPublic.model_validate(row._mapping)
+                    for row in attempts_res.all()
+                ],
+                limit,
+                lambda attempt: (attempt.created_at, attempt.id),
+            )
 
+        except InvalidCursorException:
+            raise
         except Exception as exc:
             log(exc)
             raise InternalException from exc
         else:
-            return {"attempts": attempts, "count": count}
+            return {
+                "attempts": attempts,
+                "count": count,
+                "next_cursor": next_cursor,
+            }
 
     async def create_attempt(self, *, attempt_create: AttemptCreate) -> Attempt:
         try:
             attempt = Attempt(**attempt_create.model_dump())
             self.session.add(attempt)
+            await self.session.flush()
 
-            if not self.session.in_transaction():
-                async with self.session.begin():
-                    await self.session.flush()
-
-                    task = await self.session.get(Task, attempt.task_id)
-                    if task:
-                        task.total_attempts += 1
-                        await self.commit()
-            else:
-                await self.session.commit()
-
-                task = await self.session.get(Task, attempt.task_id)
-                if task:
-                    task.total_attempts += 1
-                    await self.commit()
-
+            # счётчик увеличивается в БД одним UPDATE: без чтения строки
+            # задачи и без потерянных обновлений при параллельных отправках
+            await self._increment_task_counters(
+                attempt.task_id, total_attempts=1
+            )
+            await self._adjust_user_task_status(
+                attempt.user_id, attempt.task_id, attempts=1
+            )
+            await self.commit()
             await self.session.refresh(attempt)
 
         except IntegrityError as e:
@@ -128,6 +208,7 @@ class AttemptAccessor(BaseAccessor):
                 raise AttemptNotFoundException
 
             old_status = attempt.status
+            old_metrics = (attempt.time_used_ms, attempt.memory_used_bytes)
             update_data = attempt_update.model_dump(
                 exclude_unset=True, exclude_none=True
             )
@@ -135,23 +216,45 @@ class AttemptAccessor(BaseAccessor):
             for field, value in update_data.items():
                 setattr(attempt, field, value)
 
-            if (
-                attempt_update.status == AttemptStatusEnum.OK
-                and old_status != AttemptStatusEnum.OK
-            ):
-                existing_success = await self.session.execute(
-                    select(Attempt).where(
-                        Attempt.user_id == attempt.user_id,
-                        Attempt.task_id == attempt.task_id,
-                        Attempt.status == AttemptStatusEnum.OK,
-                        Attempt.id != attempt.id,
-                    )
+            if solved := _solved_delta(old_status, attempt_update.status):
+                await self._adjust_user_task_status(
+                    attempt.user_id,
+                    attempt.task_id,
+                    solved=solved,
+                    solved_at=attempt.created_at,
                 )
-
-                if not existing_success.first():
-                    task = await self.session.get(Task, attempt.task_id)
-                    if task:
-                        task.correct_attempts += 1
+                time_used_ms, memory_used_bytes = (
+                    (attempt.time_used_ms, attempt.memory_used_bytes)
+                    if solved > 0
+                    else old_metrics
+                )
+                await self._adjust_histograms(
+                    [
+                        (
+                            attempt.task_id,
+                            attempt.programming_language,
+                            solved,
+                            time_used_ms,
+                            memory_used_bytes,
+                        )
+                    ]
+                )
+            await self._add_to_user_sketches(
+                [
+                    (
+                        attempt.user_id,
+                        attempt.task_id,
+                        _utc_date(attempt.created_at),
+                        event,
+                    )
+                    for event in _sketch_events(
+                        old_status, attempt_update.status
+                    )
+                ]
+            )
+            await self._adjust_rollups(
+                [(attempt, old_status, attempt_update.status or old_status)]
+            )
 
             await self.commit()
             await self.refresh(attempt)
@@ -166,6 +269,140 @@ class AttemptAccessor(BaseAccessor):
         else:
             return attempt
 
+    async def apply_results(
+        self, *, updates: dict[int, AttemptUpdate]
+    ) -> list[Attempt]:
+        """Применяет пачку результатов проверки в одной транзакции.
+
+        Статусы обновляются одним bulk UPDATE; сводка user_task_status
+        и счётчики решений — по запросу на пару пользователь–задача,
+        у которой сменилось число зачтённых попыток, а почасовые и
+        дневные сводки вердиктов и гистограммы замеров — одним upsert'ом
+        на пачку.
+        Несуществующие попытки пропускаются.
+        """
+        try:
+            previous = {
+                row.id: row
+                for row in await self.session.execute(
+                    select(
+                        col(Attempt.id),
+                        col(Attempt.user_id),
+                        col(Attempt.task_id),
+                        col(Attempt.status),
+                        col(Attempt.programming_language),
+                        col(Attempt.created_at),
+                        col(Attempt.time_used_ms),
+                        col(Attempt.memory_used_bytes),
+                    ).where(col(Attempt.id).in_(list(updates)))
+                )
+            }
+            if missing := updates.keys() - previous.keys():
+                log(
+                    AttemptNotFoundException(),
+                    level="warning",
+                    additional_info=f"attempt_ids: {sorted(missing)}",
+                )
+            if not previous:
+                return []
+
+            await self.session.execute(
+                update(Attempt),
+                [
+                    {
+                        "id": attempt_id,
+                        # ключ секции: UPDATE идёт только в её секцию
+                        "created_at": row.created_at,
+                        **updates[attempt_id].model_dump(
+                            exclude_unset=True, exclude_none=True
+                        ),
+                    }
+                    for attempt_id, row in sorted(previous.items())
+                ],
+            )
+
+            solved_per_pair: Counter[tuple[int, UUID]] = Counter()
+            solved_at: dict[tuple[int, UUID], datetime] = {}
+            histogram_samples = []
+            for attempt_id, row in previous.items():
+                attempt_update = updates[attempt_id]
+                solved = _solved_delta(row.status, attempt_update.status)
+                if not solved:
+                    continue
+                pair = (row.task_id, row.user_id)
+                solved_per_pair[pair] += solved
+                if solved > 0:
+                    solved_at[pair] = min(
+                        solved_at.get(pair, row.created_at), row.created_at
+                    )
+                # принятая попытка добавляется с новыми замерами,
+                # отозванная — убирается со старыми
+                source = attempt_update if solved > 0 else row
+                histogram_samples.append(
+                    (
+                        row.task_id,
+                        row.programming_language,
+                        solved,
+                        _coalesce(source.time_used_ms, row.time_used_ms),
+                        _coalesce(
+                            source.memory_used_bytes, row.memory_used_bytes
+                        ),
+                    )
+                )
+            # строки сводок и счётчики задач блокируются в порядке
+            # ключей, чтобы параллельные пачки не взаимоблокировались
+            for pair, solved in sorted(solved_per_pair.items()):
+                if solved:
+                    task_id, user_id = pair
+                    await self._adjust_user_task_status(
+                        user_id,
+                        task_id,
+                        solved=solved,
+                        solved_at=solved_at.get(pair),
+                    )
+
+            await self._adjust_rollups(
+                [
+                    (row, row.status, updates[attempt_id].status or row.status)
+                    for attempt_id, row in previous.items()
+                ]
+            )
+            await self._adjust_histograms(histogram_samples)
+            await self._add_to_user_sketches(
+                [
+                    (
+                        row.user_id,
+                        row.task_id,
+                        _utc_date(row.created_at),
+                        event,
+                    )
+                    for attempt_id, row in previous.items()
+                    for event in _sketch_events(
+                        row.status, updates[attempt_id].status
+                    )
+                ]
+            )
+
+            result = await self.session.execute(
+                select(Attempt)
+                .where(
+                    tuple_(col(Attempt.id), col(Attempt.created_at)).in_(
+                        [(row.id, row.created_at) for row in previous.values()]
+                    )
+                )
+                .execution_options(populate_existing=True)
+            )
+            attempts = list(result.scalars().all())
+
+            await self.commit()
+
+        except Exception as e:
+            await self.rollback()
+            log(e)
+            raise InternalException from e
+        else:
+            return attempts
+
     async def delete_attempt(self, *, attempt_id: int) -> None:
         try:
             attempt = await self.session.get(Attempt, attempt_id)
@@ -173,27 +410,33 @@ class AttemptAccessor(BaseAccessor):
             if not attempt:
                 raise AttemptNotFoundException
 
-            user_id = attempt.user_id
-            task_id = attempt.task_id
             was_successful = attempt.status == AttemptStatusEnum.OK
 
             await self.session.delete(attempt)
+            await self.session.flush()
 
-            task = await self.session.get(Task, task_id)
-            if task:
-                task.total_attempts -= 1
-
-                if was_successful:
-                    remaining_success = await self.session.execute(
-                        select(Attempt).where(
-                            Attempt.user_id == user_id,
-                            Attempt.task_id == task_id,
-                            Attempt.status == AttemptStatusEnum.OK,
+            await self._increment_task_counters(
+                attempt.task_id, total_attempts=-1
+            )
+            await self._adjust_rollups([(attempt, attempt.status, None)])
+            if was_successful:
+                await self._adjust_histograms(
+                    [
+                        (
+                            attempt.task_id,
+                            attempt.programming_language,
+                            -1,
+                            attempt.time_used_ms,
+                            attempt.memory_used_bytes,
                         )
-                    )
-
-                    if not remaining_success.first():
-                        task.correct_attempts -= 1
+                    ]
+                )
+            await self._adjust_user_task_status(
+                attempt.user_id,
+                attempt.task_id,
+                attempts=-1,
+                solved=-1 if was_successful else 0,
+            )
 
             await self.commit()
 
@@ -204,3 +447,512 @@ class AttemptAccessor(BaseAccessor):
             await self.rollback()
             log(e)
             raise InternalException from e
+
+    async def archive_attempts(
+        self, *, created_before: datetime, limit: int
+    ) -> int:
+        """Переносит тяжёлые поля старых попыток в attempt_archive.
+
+        Берёт до ``limit`` завершённых неархивированных попыток старше
+        ``created_before``; поля сжимаются в attempt_archive, а в самой
+        попытке обнуляются. Строки блокируются с SKIP LOCKED, поэтому
+        архивация из нескольких процессов не пересекается. Возвращает
+        число заархивированных попыток.
+        """
+        try:
+            result = await self.session.execute(
+                select(Attempt)
+                .where(
+                    col(Attempt.created_at) < created_before,
+                    col(Attempt.archived_at).is_(None),
+                    col(Attempt.status) != AttemptStatusEnum.RUNNING,
+                )
+                .order_by(col(Attempt.created_at))
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            attempts = list(result.scalars().all())
+            if not attempts:
+                return 0
+
+            self.session.add_all(
+                AttemptArchive.pack(attempt) for attempt in attempts
+            )
+            await self.session.flush()
+            await self.session.execute(
+                update(Attempt)
+                .where(
+                    # с ключом секции UPDATE идёт только в секции пачки
+                    tuple_(col(Attempt.id), col(Attempt.created_at)).in_(
+                        [
+                            (attempt.id, attempt.created_at)
+                            for attempt in attempts
+                        ]
+                    )
+                )
+                .values(
+                    source_code="",
+                    source_code_output=None,
+                    expected_output=None,
+                    error_traceback=None,
+                    archived_at=func.now(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await self.commit()
+            # в сессии остались прежние значения полей
+            for attempt in attempts:
+                self.session.expire(attempt)
+
+        except Exception as e:
+            await self.rollback()
+            log(e)
+            raise InternalException from e
+        else:
+            return len(attempts)
+
+    async def ensure_partitions(self, *, until: date) -> list[str]:
+        """Создаёт недостающие помесячные секции attempt до ``until``.
+
+        Секции начинаются с текущего месяца (по UTC). Месяц, попытки
+        которого уже лежат в секции по умолчанию, пропускается.
+        Возвращает имена созданных секций.
+        """
+        try:
+            existing = set(
+                await self.session.scalars(
+                    text(
+                        "SELECT inhrelid::regclass::text FROM pg_inherits "
+                        "WHERE inhparent = 'attempt'::regclass"
+                    )
+                )
+            )
+            created = []
+            month = datetime.now(timezone.utc).date().replace(day=1)  # noqa: UP017
+            while month <= until:
+                next_month = (month + timedelta(days=32)).replace(day=1)
+                name = f"attempt_{month:%Y_%m}"
+                if name not in existing:
+                    try:
+                        async with self.session.begin_nested():
+                            await self._create_partition(
+                                name, month, next_month
+                            )
+                    except DBAPIError as e:
+                        log(e, level="warning", additional_info=name)
+                    else:
+                        created.append(name)
+                month = next_month
+            await self.commit()
+
+        except Exception as e:
+            await self.rollback()
+            log(e)
+            raise InternalException from e
+        else:
+            return created
+
+    async def _create_partition(
+        self, name: str, start: date, end: date
+    ) -> None:
+        """Создаёт секцию; имя и границы экранирует format(), как в миграции."""
+        statement = await self.session.scalar(
+            select(
+                func.format(
+                    "CREATE TABLE %I PARTITION OF attempt "
+                    "FOR VALUES FROM (%L) TO (%L)",
+                    cast(name, Text),
+                    cast(_utc_midnight(start), DateTime(timezone=True)),
+                    cast(_utc_midnight(end), DateTime(timezone=True)),
+                )
+            )
+        )
+        connection = await self.session.connection()
+        await connection.exec_driver_sql(statement)
+
+    async def _restore_archived(self, attempts: list[Attempt]) -> None:
+        """Подставляет в архивированные попытки поля из attempt_archive.
+
+        Значения записываются как загруженные из БД, так что сессия не
+        считает попытку изменённой.
+        """
+        archived = {
+            attempt.id: attempt
+            for attempt in attempts
+            if attempt.archived_at is not None
+        }
+        if not archived:
+            return
+
+        result = await self.session.scalars(
+            select(AttemptArchive).where(
+                col(AttemptArchive.attempt_id).in_(list(archived))
+            )
+        )
+        for archive in result.all():
+            attempt = archived[archive.attempt_id]
+            for field, value in archive.unpack().items():
+                set_committed_value(attempt, field, value)
+
+    async def _adjust_user_task_status(
+        self,
+        user_id: UUID,
+        task_id: int,
+        *,
+        attempts: int = 0,
+        solved: int = 0,
+        solved_at: datetime | None = None,
+    ) -> None:
+        """Сдвигает счётчики в user_task_status одним upsert'ом.
+
+        Когда задача становится решённой (или перестаёт ею быть), меняются
+        ``Task.correct_attempts`` — число решивших её пользователей — и очки
+        пользователя в рейтинге.
+
+        ``first_solved_at`` — created_at самой ранней зачтённой попытки,
+        как при заполнении в миграции: ``solved_at`` — created_at новых
+        зачтённых попыток, а при отзыве минимум пересчитывается по
+        оставшимся.
+        """
+        table = UserTaskStatus.__table__
+        solved_count = table.c.solved_count + solved
+        insert_query = pg_insert(UserTaskStatus).values(
+            user_id=user_id,
+            task_id=task_id,
+            attempts_count=attempts,
+            solved_count=solved,
+            first_solved_at=solved_at if solved > 0 else None,
+        )
+        first_solved_at: ColumnElement[Any]
+        if solved > 0:
+            # least() пропускает NULL
+            first_solved_at = func.least(
+                table.c.first_solved_at, insert_query.excluded.first_solved_at
+            )
+        elif solved < 0:
+            first_solved_at = (
+                select(func.min(col(Attempt.created_at)))
+                .where(
+                    col(Attempt.user_id) == user_id,
+                    col(Attempt.task_id) == task_id,
+                    col(Attempt.status) == AttemptStatusEnum.OK,
+                )
+                .scalar_subquery()
+            )
+        else:
+            first_solved_at = table.c.first_solved_at
+        result = await self.session.execute(
+            insert_query.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.task_id],
+                set_={
+                    "attempts_count": table.c.attempts_count + attempts,
+                    "solved_count": solved_count,
+                    "first_solved_at": sql_case(
+                        (solved_count > 0, first_solved_at), else_=None
+                    ),
+                },
+            ).returning(table.c.attempts_count, table.c.solved_count)
+        )
+        row = result.one()
+
+        was_solved = row.solved_count - solved > 0
+        if was_solved != (row.solved_count > 0):
+            sign = 1 if row.solved_count > 0 else -1
+            await self._increment_task_counters(task_id, correct_attempts=sign)
+            await self._adjust_user_score(user_id, task_id, sign=sign)
+        if row.attempts_count <= 0:
+            await self.session.execute(
+                delete(UserTaskStatus).where(
+                    col(UserTaskStatus.user_id) == user_id,
+                    col(UserTaskStatus.task_id) == task_id,
+                )
+            )
+
+    async def _adjust_user_score(
+        self, user_id: UUID, task_id: int, *, sign: int
+    ) -> None:
+        """Начисляет (или снимает) очки за задачу одним upsert'ом."""
+        table = UserScore.__table__
+        points = (
+            select(Task.score_column() * sign)
+            .where(col(Task.id) == task_id)
+            .scalar_subquery()
+        )
+        insert_query = pg_insert(UserScore).values(
+            user_id=user_id, total_score=points, solved_tasks_count=sign
+        )
+        await self.session.execute(
+            insert_query.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={
+                    "total_score": table.c.total_score
+                    + insert_query.excluded.total_score,
+                    "solved_tasks_count": table.c.solved_tasks_count
+                    + insert_query.excluded.solved_tasks_count,
+                },
+            )
+        )
+
+    async def _adjust_rollups(
+        self,
+        changes: list[tuple[Any, AttemptStatusEnum, AttemptStatusEnum | None]],
+    ) -> None:
+        """Переносит попытки из корзин старого вердикта в корзины нового.
+
+        ``changes`` — тройки (строка попытки с programming_language,
+        task_id и created_at, старый статус, новый статус). Новый статус
+        None означает, что попытка удалена. Running в сводки не попадает.
+        """
+        deltas: Counter[tuple] = Counter()
+        for row, old_status, new_status in changes:
+            if new_status == old_status or row.task_id is None:
+                continue
+            for granularity in RollupGranularityEnum:
+                key = (
+                    granularity,
+                    granularity.truncate(row.created_at),
+                    row.programming_language,
+                    row.task_id,
+                )
+                if old_status != AttemptStatusEnum.RUNNING:
+                    deltas[*key, old_status] -= 1
+                if new_status not in (None, AttemptStatusEnum.RUNNING):
+                    deltas[*key, new_status] += 1
+
+        values = [
+            {
+                "granularity": granularity,
+                "bucket_start": bucket_start,
+                "programming_language": programming_language,
+                "task_id": task_id,
+                "status": status,
+                "count": delta,
+            }
+            for (
+                granularity,
+                bucket_start,
+                programming_language,
+                task_id,
+                status,
+            ), delta in sorted(deltas.items())
+            if delta
+        ]
+        if not values:
+            return
+
+        table = AttemptRollup.__table__
+        insert_query = pg_insert(AttemptRollup).values(values)
+        await self.session.execute(
+            insert_query.on_conflict_do_update(
+                index_elements=list(table.primary_key.columns),
+                set_={"count": table.c.count + insert_query.excluded.count},
+            )
+        )
+
+    async def _adjust_histograms(
+        self,
+        samples: list[tuple[int, ProgrammingLanguageEnum, int, int, int]],
+    ) -> None:
+        """Добавляет (+1) или убирает (-1) замеры принятых попыток.
+
+        ``samples`` — пятёрки (task_id, язык, знак, time_used_ms,
+        memory_used_bytes).
+        """
+        deltas: Counter[tuple] = Counter()
+        for task_id, language, sign, time_used_ms, memory_used_bytes in samples:
+            if task_id is None:
+                continue
+            for metric, value in (
+                (AttemptMetricEnum.time_used_ms, time_used_ms),
+                (AttemptMetricEnum.memory_used_bytes, memory_used_bytes),
+            ):
+                deltas[task_id, language, metric, bucket_of(value)] += sign
+
+        values = [
+            {
+                "task_id": task_id,
+                "programming_language": language,
+                "metric": metric,
+                "bucket": bucket,
+                "count": delta,
+            }
+            for (task_id, language, metric, bucket), delta in sorted(
+                deltas.items()
+            )
+            if delta
+        ]
+        if not values:
+            return
+
+        table = AttemptHistogram.__table__
+        insert_query = pg_insert(AttemptHistogram).values(values)
+        await self.session.execute(
+            insert_query.on_conflict_do_update(
+                index_elements=list(table.primary_key.columns),
+                set_={"count": table.c.count + insert_query.excluded.count},
+            )
+        )
+
+    async def _add_to_user_sketches(
+        self, samples: list[tuple[UUID, int, date, UserSketchEventEnum]]
+    ) -> None:
+        """Добавляет пользователей в дневные скетчи и скетчи задач.
+
+        ``samples`` — четвёрки (user_id, task_id, день, событие). На каждый
+        скетч уходит один upsert: SQL-функция ``hll_add`` поднимает
+        регистры пользователей, не пересылая сами регистры.
+
+        Дневной скетч один на всех, поэтому вызывается только из пакетной
+        записи вердиктов, а не в транзакции отправки: отправки не ждут
+        друг друга на его строке.
+        """
+        daily: dict[tuple, list[tuple[int, int]]] = {}
+        per_task: dict[tuple, list[tuple[int, int]]] = {}
+        for user_id, task_id, day, event in samples:
+            if user_id is None:
+                continue
+            index, rank = hll.register_of(user_id)
+            daily.setdefault((day, event), []).append((index, rank))
+            if task_id is not None:
+                per_task.setdefault((task_id, event), []).append((index, rank))
+
+        for model, keys, sketches in (
+            (DailyUserSketch, ("day", "event"), daily),
+            (TaskUserSketch, ("task_id", "event"), per_task),
+        ):
+            if not sketches:
+                continue
+            table = model.__table__
+            insert_query = pg_insert(model).values(
+                [
+                    {
+                        **dict(zip(keys, key, strict=True)),
+                        "registers": _hll_add(None, registers),
+                    }
+                    for key, registers in sorted(sketches.items())
+                ]
+            )
+            await self.session.execute(
+                insert_query.on_conflict_do_update(
+                    index_elements=list(table.primary_key.columns),
+                    set_={
+                        "registers": func.hll_merge(
+                            table.c.registers,
+                            insert_query.excluded.registers,
+                        )
+                    },
+                )
+            )
+
+    async def get_histograms(
+        self,
+        *,
+        task_id: int,
+        programming_language: ProgrammingLanguageEnum | None = None,
+    ) -> dict[AttemptMetricEnum, dict[int, int]]:
+        """Гистограммы замеров принятых попыток задачи.
+
+        Без языка корзины всех языков складываются.
+        """
+        try:
+            query = (
+                select(
+                    col(AttemptHistogram.metric),
+                    col(AttemptHistogram.bucket),
+                    func.sum(col(AttemptHistogram.count)).label("total"),
+                )
+                .where(col(AttemptHistogram.task_id) == task_id)
+                .group_by(
+                    col(AttemptHistogram.metric), col(AttemptHistogram.bucket)
+                )
+            )
+            if programming_language is not None:
+                query = query.where(
+                    col(AttemptHistogram.programming_language)
+                    == programming_language
+                )
+
+            result = await self.session.execute(query)
+            histograms: dict[AttemptMetricEnum, dict[int, int]] = {
+                metric: {} for metric in AttemptMetricEnum
+            }
+            for row in result.all():
+                if row.total > 0:
+                    histograms[AttemptMetricEnum(row.metric)][row.bucket] = (
+                        row.total
+                    )
+
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return histograms
+
+    async def _increment_task_counters(
+        self,
+        task_id: int,
+        *,
+        total_attempts: int = 0,
+        correct_attempts: int = 0,
+    ) -> None:
+        values = {}
+        if total_attempts:
+            values["total_attempts"] = Task.total_attempts + total_attempts
+        if correct_attempts:
+            values["correct_attempts"] = (
+                Task.correct_attempts + correct_attempts
+            )
+        if values:
+            await self.session.execute(
+                update(Task).where(col(Task.id) == task_id).values(values)
+            )
+
+
+def _hll_add(registers, updates: list[tuple[int, int]]) -> ColumnElement:
+    """Вызов ``hll_add``: регистры в SQL нумеруются с единицы."""
+    return func.hll_add(
+        registers,
+        literal([index + 1 for index, _ in updates], ARRAY(Integer)),
+        literal([rank for _, rank in updates], ARRAY(SmallInteger)),
+    )
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)  # noqa: UP017
+
+
+def _utc_date(moment: datetime) -> date:
+    return moment.astimezone(timezone.utc).date()  # noqa: UP017
+
+
+def _coalesce(value: int | None, default: int) -> int:
+    return value if value is not None else default
+
+
+def _sketch_events(
+    old_status: AttemptStatusEnum, new_status: AttemptStatusEnum | None
+) -> list[UserSketchEventEnum]:
+    """События скетчей пользователей при смене вердикта.
+
+    Отправившим пользователь считается с первого вердикта попытки.
+    """
+    events = []
+    if old_status == AttemptStatusEnum.RUNNING and new_status not in (
+        None,
+        AttemptStatusEnum.RUNNING,
+    ):
+        events.append(UserSketchEventEnum.submitted)
+    if _solved_delta(old_status, new_status) > 0:
+        events.append(UserSketchEventEnum.solved)
+    return events
+
+
+def _solved_delta(
+    old_status: AttemptStatusEnum, new_status: AttemptStatusEnum | None
+) -> int:
+    """+1, если попытка стала зачтённой, -1 — если перестала."""
+    if new_status is None or (old_status == AttemptStatusEnum.OK) == (
+        new_status == AttemptStatusEnum.OK
+    ):
+        return 0
+    return 1 if new_status == AttemptStatusEnum.OK else -1
@@ -1,7 +1,8 @@
 import asyncio
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.attempt.code_execution_service import (
     CodeExecutionServiceDep,
@@ -11,47 +12,107 @@ from app.auth.deps import (
     get_current_active_superuser,
 )
 from app.auth.models import Message
+from app.core.config import settings
+from app.core.etag import PRIVATE_IMMUTABLE, conditional_response, make_etag
+from app.core.pagination import with_count_default
 from app.store import StoreDep
 
+from .events import attempt_events
 from .exceptions import (
     AttemptAccessDeniedException,
     AttemptNotFoundException,
     AttemptUserMismatch,
 )
-from .execution_result_handler import ExecutionResultHandlerDep
 from .models import (
     AttemptCreate,
+    AttemptMetricEnum,
+    AttemptPercentiles,
     AttemptPublic,
+    AttemptsPublic,
     AttemptStatusEnum,
     AttemptUpdate,
 )
+from .notifier import RESULT_FIELDS, AttemptNotifierDep, attempt_result
+from .sketch import percentile_rank
 
 router = APIRouter(prefix="/attempts", tags=["attempts"])
 
 
 @router.get(
     "",
-    response_model=dict[str, Any],
+    response_model=AttemptsPublic,
 )
 async def get_attempts(
     store: StoreDep,
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    with_count: bool | None = None,
 ) -> Any:
     if not current_user.is_superuser:
         attempts_data = await store.attempt.get_attempts(
             user_id=current_user.id,
             skip=skip,
             limit=limit,
+            cursor=cursor,
+            with_count=with_count_default(with_count, cursor),
         )
     else:
         attempts_data = await store.attempt.get_attempts(
             skip=skip,
             limit=limit,
+            cursor=cursor,
+            with_count=with_count_default(with_count, cursor),
         )
 
-    return {"data": attempts_data["attempts"], "count": attempts_data["count"]}
+    return AttemptsPublic(
+        data=attempts_data["attempts"],
+        count=attempts_data["count"],
+        next_cursor=attempts_data["next_cursor"],
+    )
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_attempts(
+    store: StoreDep,
+    notifier: AttemptNotifierDep,
+    current_user: CurrentUser,
+    ids: Annotated[
+        list[int],
+        Query(min_length=1, max_length=settings.ATTEMPT_STREAM_MAX_IDS),
+    ],
+    progress: Annotated[bool, Query()] = True,
+) -> StreamingResponse:
+    """Server-Sent Events с вердиктами (и прогрессом по тестам) попыток"""
+    # как и в long polling, подписка раньше чтения статусов
+    subscription = notifier.subscribe(ids)
+    try:
+        attempts = await store.attempt.get_attempts_by_ids(attempt_ids=ids)
+        if len(attempts) != len(subscription.attempt_ids):
+            raise AttemptNotFoundException
+
+        if not current_user.is_superuser and any(
+            attempt.user_id != current_user.id for attempt in attempts
+        ):
+            raise AttemptAccessDeniedException
+    except Exception:
+        subscription.close()
+        raise
+
+    finished = [
+        attempt_result(attempt)
+        for attempt in attempts
+        if attempt.status != AttemptStatusEnum.RUNNING
+    ]
+    # дальше всё приходит уведомлениями, соединение с БД не нужно
+    await store.release()
+
+    return StreamingResponse(
+        attempt_events(subscription, finished, progress=progress),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get(
@@ -59,6 +120,8 @@ async def get_attempts(
     response_model=AttemptPublic,
 )
 async def get_attempt(
+    request: Request,
+    response: Response,
     store: StoreDep,
     current_user: CurrentUser,
     attempt_id: int,
@@ -70,12 +133,73 @@ async def get_attempt(
     if not (current_user.is_superuser or current_user.id == attempt.user_id):
         raise AttemptAccessDeniedException
 
+    if attempt.status == AttemptStatusEnum.RUNNING:
+        # вердикт ещё придёт, промежуточное состояние не кэшируется
+        response.headers["Cache-Control"] = "no-store"
+        return attempt
+
+    # завершённая попытка больше не меняется
+    etag = make_etag(
+        "attempt",
+        attempt.id,
+        attempt.status,
+        attempt.time_used_ms,
+        attempt.memory_used_bytes,
+    )
+    if not_modified := conditional_response(
+        request, response, etag, PRIVATE_IMMUTABLE
+    ):
+        return not_modified
+
     return attempt
 
 
+@router.get(
+    "/{attempt_id}/percentiles",
+    response_model=AttemptPercentiles,
+)
+async def get_attempt_percentiles(
+    store: StoreDep,
+    current_user: CurrentUser,
+    attempt_id: int,
+) -> Any:
+    """Место принятой попытки среди принятых попыток задачи на том же языке.
+
+    Отдельно от самой попытки: она кэшируется навсегда, а проценты
+    меняются с каждой новой принятой попыткой.
+    """
+    attempt = await store.attempt.get_attempt_by_id(attempt_id=attempt_id)
+    if not attempt:
+        raise AttemptNotFoundException
+
+    if not (current_user.is_superuser or current_user.id == attempt.user_id):
+        raise AttemptAccessDeniedException
+
+    histograms = await store.attempt.get_histograms(
+        task_id=attempt.task_id,
+        programming_language=attempt.programming_language,
+    )
+    percentiles = AttemptPercentiles(
+        attempt_id=attempt.id,
+        programming_language=attempt.programming_language,
+        accepted_attempts=sum(
+            histograms[AttemptMetricEnum.time_used_ms].values()
+        ),
+    )
+    if attempt.status == AttemptStatusEnum.OK:
+        percentiles.faster_than = percentile_rank(
+            histograms[AttemptMetricEnum.time_used_ms], attempt.time_used_ms
+        )
+        percentiles.less_memory_than = percentile_rank(
+            histograms[AttemptMetricEnum.memory_used_bytes],
+            attempt.memory_used_bytes,
+        )
+    return percentiles
+
+
 @router.get(
     "/task/{task_id}",
-    response_model=dict[str, Any],
+    response_model=AttemptsPublic,
 )
 async def get_attempts_by_task(
     store: StoreDep,
@@ -83,6 +207,8 @@ async def get_attempts_by_task(
     task_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    with_count: bool | None = None,
 ) -> Any:
     if not current_user.is_superuser:
         attempts_data = await store.attempt.get_attempts(
@@ -90,15 +216,23 @@ async def get_attempts_by_task(
             task_id=task_id,
             skip=skip,
             limit=limit,
+            cursor=cursor,
+            with_count=with_count_default(with_count, cursor),
         )
     else:
         attempts_data = await store.attempt.get_attempts(
             task_id=task_id,
             skip=skip,
             limit=limit,
+            cursor=cursor,
+            with_count=with_count_default(with_count, cursor),
         )
 
-    return {"data": attempts_data["attempts"], "count": attempts_data["count"]}
+    return AttemptsPublic(
+        data=attempts_data["attempts"],
+        count=attempts_data["count"],
+        next_cursor=attempts_data["next_cursor"],
+    )
 
 
 @router.post(
@@ -127,60 +261,40 @@ async def create_attempt(
 )
 async def get_attempt_status(
     store: StoreDep,
-    execution_result_handler: ExecutionResultHandlerDep,
+    notifier: AttemptNotifierDep,
     current_user: CurrentUser,
     attempt_id: int,
     timeout_seconds: int = Query(30, ge=1, le=60),
 ) -> Any:
     """Long polling для получения статуса попытки"""
-    attempt = await store.attempt.get_attempt_by_id(attempt_id=attempt_id)
-    if not attempt:
-        raise AttemptNotFoundException
-
-    if not (current_user.is_superuser or current_user.id == attempt.user_id):
-        raise AttemptAccessDeniedException
-
-    if attempt.status != AttemptStatusEnum.RUNNING:
-        return {
-            "id": attempt.id,
-            "status": attempt.status,
-            "time_used_ms": attempt.time_used_ms,
-            "memory_used_bytes": attempt.memory_used_bytes,
-            "error_traceback": attempt.error_traceback,
-            "failed_test_number": attempt.failed_test_number,
-            "source_code_output": attempt.source_code_output,
-            "expected_output": attempt.expected_output,
-        }
+    # подписка до чтения статуса: результат, записанный после чтения,
+    # придёт уведомлением и не потеряется
+    with notifier.subscribe([attempt_id]) as subscription:
+        attempt = await store.attempt.get_attempt_by_id(attempt_id=attempt_id)
+        if not attempt:
+            raise AttemptNotFoundException
 
-    event = execution_result_handler.add_pending_request(attempt_id)
+        if not (
+            current_user.is_superuser or current_user.id == attempt.user_id
+        ):
+            raise AttemptAccessDeniedException
 
-    try:
-        await asyncio.wait_for(event.wait(), timeout=timeout_seconds)
+        if attempt.status != AttemptStatusEnum.RUNNING:
+            return attempt_result(attempt)
 
-        updated_attempt = await store.attempt.get_attempt_by_id(
-            attempt_id=attempt_id
-        )
+        # на время ожидания соединение не держим: ответ берётся
+        # из уведомления, повторно в БД не ходим
+        await store.release()
+        try:
+            async with asyncio.timeout(timeout_seconds):
+                result = await subscription.wait_result()
+        except TimeoutError:
+            result = None
 
-        if not updated_attempt:
-            raise AttemptNotFoundException
-    except TimeoutError:
+    if result is None:
         return {"id": attempt.id, "status": attempt.status}
-    except Exception as e:
-        raise e
 
-    else:
-        return {
-            "id": updated_attempt.id,
-            "status": updated_attempt.status,
-            "time_used_ms": updated_attempt.time_used_ms,
-            "memory_used_bytes": updated_attempt.memory_used_bytes,
-            "error_traceback": updated_attempt.error_traceback,
-            "failed_test_number": updated_attempt.failed_test_number,
-            "source_code_output": updated_attempt.source_code_output,
-            "expected_output": updated_attempt.expected_output,
-        }
-    finally:
-        execution_result_handler.remove_pending_request(attempt_id)
+    return {field: result[field] for field in RESULT_FIELDS}
 
 
 @router.patch(
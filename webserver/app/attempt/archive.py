@@ -0,0 +1,91 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+from app.core.background_store import background_store_service
+from app.core.config import settings
+from app.core.logger import create_log
+
+log = create_log(__name__)
+
+
+class AttemptArchiver:
+    """Фоновое обслуживание секционированной таблицы попыток.
+
+    Раз в ``interval`` секунд создаёт помесячные секции на
+    ``months_ahead`` месяцев вперёд и архивирует попытки старше
+    ``archive_after``: их исходный код и выводы сжимаются в
+    attempt_archive пачками по ``batch_size``, пока такие попытки
+    не кончатся. Читать архивированную попытку можно как обычно —
+    ``AttemptAccessor`` подставляет поля из архива.
+    """
+
+    def __init__(
+        self,
+        *,
+        archive_after_days: int = settings.ATTEMPT_ARCHIVE_AFTER_DAYS,
+        batch_size: int = settings.ATTEMPT_ARCHIVE_BATCH_SIZE,
+        interval: float = settings.ATTEMPT_ARCHIVE_INTERVAL_SECONDS,
+        months_ahead: int = settings.ATTEMPT_PARTITIONS_AHEAD_MONTHS,
+    ) -> None:
+        self.archive_after = timedelta(days=archive_after_days)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.months_ahead = months_ahead
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> int:
+        """Один проход обслуживания; возвращает число архивированных попыток."""
+        store = await background_store_service.get_store()
+        try:
+            await store.attempt.ensure_partitions(
+                until=_add_months(
+                    datetime.now(timezone.utc).date(),  # noqa: UP017
+                    self.months_ahead,
+                )
+            )
+
+            created_before = datetime.now(timezone.utc) - self.archive_after  # noqa: UP017
+            archived = 0
+            while True:
+                count = await store.attempt.archive_attempts(
+                    created_before=created_before, limit=self.batch_size
+                )
+                archived += count
+                if count < self.batch_size:
+                    break
+        finally:
+            await background_store_service.close_store(store)
+        return archived
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # следующий проход попробует снова
+                log(e, level="error")
+            await asyncio.sleep(self.interval)
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+attempt_archiver = AttemptArchiver()
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from app.core.config import settings
+
+from .notifier import (
+    PROGRESS_EVENT,
+    RESULT_EVENT,
+    RESULT_FIELDS,
+    AttemptSubscription,
+)
+
+
+def format_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def attempt_events(
+    subscription: AttemptSubscription,
+    finished: list[dict[str, Any]],
+    *,
+    progress: bool = True,
+) -> AsyncGenerator[str, None]:
+    """Поток Server-Sent Events по попыткам подписки.
+
+    Сначала отдаёт уже готовые результаты, затем — приходящие уведомления.
+    Поток закрывается, когда по всем попыткам пришёл вердикт или истёк
+    ``ATTEMPT_STREAM_TIMEOUT_SECONDS``; в паузах шлётся keepalive-комментарий.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.ATTEMPT_STREAM_TIMEOUT_SECONDS
+    pending = set(subscription.attempt_ids)
+    try:
+        for result in finished:
+            pending.discard(result["id"])
+            yield format_event(RESULT_EVENT, result)
+
+        while pending and (left := deadline - loop.time()) > 0:
+            try:
+                async with asyncio.timeout(
+                    min(settings.ATTEMPT_STREAM_KEEPALIVE_SECONDS, left)
+                ):
+                    event = await subscription.get()
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event["id"] not in pending:
+                continue
+
+            if event.get("event", RESULT_EVENT) == RESULT_EVENT:
+                pending.discard(event["id"])
+                yield format_event(
+                    RESULT_EVENT,
+                    {field: event[field] for field in RESULT_FIELDS},
+                )
+            elif progress and event["event"] == PROGRESS_EVENT:
+                yield format_event(
+                    PROGRESS_EVENT,
+                    {
+                        "id": event["id"],
+                        "passed_tests": event["passed_tests"],
+                        "total_tests": event["total_tests"],
+                    },
+                )
+    finally:
+        subscription.close()
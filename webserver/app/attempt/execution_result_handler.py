@@ -6,42 +6,98 @@ from aio_pika.abc import AbstractIncomingMessage
 from fastapi import Depends
 
 from app.core.background_store import background_store_service
+from app.core.config import settings
 from app.core.logger import create_log
-from app.store import Store
 
-from .models import AttemptStatusEnum, AttemptUpdate
+from .models import Attempt, AttemptStatusEnum, AttemptUpdate
+from .notifier import attempt_notifier
 
 log = create_log(__name__)
 
 
 class ExecutionResultHandler:
-    def __init__(self) -> None:
-        self.pending_requests: dict[int, asyncio.Event] = {}
+    """Потребитель результатов проверки, пишущий их в БД пачками.
+
+    Сообщения копятся, пока не наберётся ``batch_size`` штук или не
+    пройдёт ``batch_timeout`` секунд с первого из них; пачка применяется
+    одной транзакцией, и только после коммита сообщения подтверждаются.
+    Если пачка не записалась, сообщения применяются по одному, чтобы
+    один плохой результат не тянул за собой остальные.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = settings.RESULT_BATCH_SIZE,
+        batch_timeout: float = settings.RESULT_BATCH_TIMEOUT_SECONDS,
+    ) -> None:
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self._batch: list[
+            tuple[AbstractIncomingMessage, int, AttemptUpdate]
+        ] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_timer: asyncio.Task[None] | None = None
 
     async def handle_result(self, message: AbstractIncomingMessage):
-        async with message.process():
-            store = None
-            try:
-                store = await background_store_service.get_store()
-
-                result_data = json.loads(message.body.decode())
-                attempt_id = result_data["id"]
-
-                await self._update_attempt(store, attempt_id, result_data)
-
-                if attempt_id in self.pending_requests:
-                    self.pending_requests[attempt_id].set()
+        try:
+            result_data = json.loads(message.body.decode())
+            attempt_id = result_data["id"]
+            attempt_update = self._attempt_update(result_data)
+        except Exception as e:
+            log(e, level="error")
+            await message.ack()
+            return
+
+        self._batch.append((message, attempt_id, attempt_update))
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.batch_timeout)
+        self._flush_timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            batch, self._batch = self._batch, []
+            if not batch:
+                return
 
+            try:
+                attempts = await self._apply(
+                    {attempt_id: update for _, attempt_id, update in batch}
+                )
             except Exception as e:
-                log(e, level="error")
-            finally:
-                if store:
-                    await background_store_service.close_store(store)
-
-    async def _update_attempt(
-        self, store: Store, attempt_id: int, result_data: dict[str, Any]
-    ):
-        update_data = AttemptUpdate(
+                log(e, level="error", additional_info=f"batch: {len(batch)}")
+                attempts = []
+                for _, attempt_id, update in batch:
+                    try:
+                        attempts += await self._apply({attempt_id: update})
+                    except Exception as exc:
+                        log(exc, level="error")
+
+            for message, _, _ in batch:
+                await message.ack()
+
+            # уведомления уходят только после коммита результатов
+            for attempt in attempts:
+                try:
+                    await attempt_notifier.publish(attempt)
+                except Exception as e:
+                    log(e, level="error")
+
+    async def _apply(self, updates: dict[int, AttemptUpdate]) -> list[Attempt]:
+        store = await background_store_service.get_store()
+        try:
+            return await store.attempt.apply_results(updates=updates)
+        finally:
+            await background_store_service.close_store(store)
+
+    def _attempt_update(self, result_data: dict[str, Any]) -> AttemptUpdate:
+        return AttemptUpdate(
             status=AttemptStatusEnum(result_data["status"]),
             time_used_ms=result_data.get("time_used_ms"),
             memory_used_bytes=result_data.get("memory_used_bytes"),
@@ -51,19 +107,6 @@ class ExecutionResultHandler:
             expected_output=result_data.get("expected_output"),
         )
 
-        await store.attempt.update_attempt(
-            attempt_id=attempt_id, attempt_update=update_data
-        )
-
-    def add_pending_request(self, attempt_id: int) -> asyncio.Event:
-        if attempt_id not in self.pending_requests:
-            self.pending_requests[attempt_id] = asyncio.Event()
-        return self.pending_requests[attempt_id]
-
-    def remove_pending_request(self, attempt_id: int):
-        if attempt_id in self.pending_requests:
-            del self.pending_requests[attempt_id]
-
 
 execution_result_handler = ExecutionResultHandler()
 
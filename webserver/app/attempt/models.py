@@ -1,15 +1,21 @@
-from datetime import datetime
+import json
+import zlib
+from datetime import datetime, timezone
 from enum import StrEnum
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import Enum as SQLEnum, ForeignKeyConstraint, Index
 from sqlmodel import (
     Column,
     DateTime,
     Field,
     ForeignKey,
     Integer,
+    LargeBinary,
+    SmallInteger,
     SQLModel,
+    String,
     text,
 )
 
@@ -39,6 +45,25 @@ class ProgrammingLanguageEnum(StrEnum):
     KOTLIN = "Kotlin"
 
 
+class AttemptMetricEnum(StrEnum):
+    time_used_ms = "time_used_ms"
+    memory_used_bytes = "memory_used_bytes"
+
+
+class RollupGranularityEnum(StrEnum):
+    hour = "hour"
+    day = "day"
+
+    def truncate(self, moment: datetime) -> datetime:
+        """Начало корзины (по UTC), в которую попадает момент."""
+        moment = moment.astimezone(timezone.utc).replace(  # noqa: UP017
+            minute=0, second=0, microsecond=0
+        )
+        if self is RollupGranularityEnum.day:
+            moment = moment.replace(hour=0)
+        return moment
+
+
 class AttemptBase(SQLModel):
     user_id: UUID = Field(
         sa_column=Column(ForeignKey("user.id", ondelete="CASCADE"))
@@ -71,7 +96,31 @@ class AttemptUpdate(SQLModel):
 
 
 class Attempt(AttemptBase, table=True):
-    id: int = Field(primary_key=True)
+    # ключи курсорной пагинации истории попыток
+    __table_args__ = (
+        Index(
+            "ix_attempt_user_id_created_at_id", "user_id", "created_at", "id"
+        ),
+        Index(
+            "ix_attempt_task_id_created_at_id", "task_id", "created_at", "id"
+        ),
+        Index("ix_attempt_created_at_id", "created_at", "id"),
+        Index(
+            "ix_attempt_user_id_status_created_at",
+            "user_id",
+            "status",
+            "created_at",
+        ),
+        # помесячные секции, см. app.attempt.archive
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # первичный ключ секционированной таблицы обязан включать created_at,
+    # но попытка по-прежнему однозначно определяется своим id. Чтение по
+    # одному id секции не отсекает и проверяет индекс ключа в каждой из
+    # них; где created_at известен, запросы передают его вместе с id
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": True})
     status: AttemptStatusEnum = Field(
         default=AttemptStatusEnum.RUNNING,
         sa_column=Column(
@@ -92,8 +141,122 @@ class Attempt(AttemptBase, table=True):
             DateTime(timezone=True),
             server_default=text("CURRENT_TIMESTAMP"),
             nullable=False,
+            primary_key=True,
         )
     )
+    # тяжёлые поля старой попытки сжаты в attempt_archive
+    archived_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+
+
+class AttemptArchive(SQLModel, table=True):
+    """Сжатые zlib тяжёлые текстовые поля архивированных попыток.
+
+    В самой попытке эти поля после архивации пустые; ``AttemptAccessor``
+    подставляет их обратно при чтении попытки.
+    """
+
+    __tablename__ = "attempt_archive"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["attempt_id", "attempt_created_at"],
+            ["attempt.id", "attempt.created_at"],
+            ondelete="CASCADE",
+        ),
+    )
+
+    attempt_id: int = Field(primary_key=True)
+    attempt_created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+    # zlib(JSON с полями из ARCHIVED_FIELDS)
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+    @classmethod
+    def pack(cls, attempt: Any) -> "AttemptArchive":
+        fields = {field: getattr(attempt, field) for field in ARCHIVED_FIELDS}
+        return cls(
+            attempt_id=attempt.id,
+            attempt_created_at=attempt.created_at,
+            payload=zlib.compress(json.dumps(fields).encode()),
+        )
+
+    def unpack(self) -> dict[str, str | None]:
+        return json.loads(zlib.decompress(self.payload))
+
+
+# поля, которые уезжают в attempt_archive
+ARCHIVED_FIELDS = (
+    "source_code",
+    "source_code_output",
+    "expected_output",
+    "error_traceback",
+)
+
+
+class AttemptRollup(SQLModel, table=True):
+    """Число вердиктов по часам и дням в разрезе языка, статуса и задачи.
+
+    Ведётся ``AttemptAccessor`` по мере прихода результатов: корзина
+    берётся по времени отправки попытки. Внешнего ключа на задачу нет —
+    история отправок остаётся и после её удаления.
+    """
+
+    __tablename__ = "attempt_rollup"
+
+    granularity: RollupGranularityEnum = Field(
+        sa_column=Column(String, primary_key=True)
+    )
+    bucket_start: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), primary_key=True)
+    )
+    programming_language: ProgrammingLanguageEnum = Field(
+        sa_column=Column(
+            SQLEnum(ProgrammingLanguageEnum, name="programming_language_enum"),
+            primary_key=True,
+        )
+    )
+    status: AttemptStatusEnum = Field(
+        sa_column=Column(
+            SQLEnum(AttemptStatusEnum, name="attempt_status_enum"),
+            primary_key=True,
+        )
+    )
+    task_id: int = Field(primary_key=True)
+    count: int = Field(default=0)
+
+
+class AttemptHistogram(SQLModel, table=True):
+    """Гистограммы времени и памяти принятых попыток по задаче и языку.
+
+    Одна строка — одна логарифмическая корзина (см. ``app.attempt.sketch``),
+    поэтому на пару задача–язык приходится не больше пары сотен строк,
+    сколько бы попыток ни было. Ведётся ``AttemptAccessor`` вместе с
+    вердиктами.
+    """
+
+    __tablename__ = "attempt_histogram"
+
+    task_id: int = Field(
+        sa_column=Column(
+            Integer,
+            ForeignKey("task.id", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
+    programming_language: ProgrammingLanguageEnum = Field(
+        sa_column=Column(
+            SQLEnum(ProgrammingLanguageEnum, name="programming_language_enum"),
+            primary_key=True,
+        )
+    )
+    metric: AttemptMetricEnum = Field(
+        sa_column=Column(String, primary_key=True)
+    )
+    bucket: int = Field(sa_column=Column(SmallInteger, primary_key=True))
+    count: int = Field(default=0)
 
 
 class AttemptPublic(AttemptBase):
@@ -112,14 +275,46 @@ class AttemptPublic(AttemptBase):
 
 class AttemptForListPublic(SQLModel):
     id: int
+    task_id: int
     status: AttemptStatusEnum
     programming_language: ProgrammingLanguageEnum
     time_used_ms: int
     memory_used_bytes: int
-    failed_test_number: int
+    failed_test_number: int | None = None
     created_at: datetime
 
+    @classmethod
+    def columns(cls) -> list[Any]:
+        """Колонки ``Attempt``, из которых собирается элемент списка"""
+        return [getattr(Attempt, name) for name in cls.model_fields]
+
 
 class AttemptsPublic(SQLModel):
     data: list[AttemptForListPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
+
+
+class AttemptPercentiles(SQLModel):
+    attempt_id: int
+    programming_language: ProgrammingLanguageEnum
+    # сколько принятых попыток на этом языке участвует в сравнении
+    accepted_attempts: int
+    # доля принятых попыток (в процентах), которые медленнее / тяжелее
+    faster_than: float | None = None
+    less_memory_than: float | None = None
+
+
+class MetricQuantiles(SQLModel):
+    p50: float
+    p75: float
+    p90: float
+    p99: float
+
+
+class TaskPercentiles(SQLModel):
+    task_id: int
+    programming_language: ProgrammingLanguageEnum | None = None
+    accepted_attempts: int
+    time_used_ms: MetricQuantiles | None = None
+    memory_used_bytes: MetricQuantiles | None = None
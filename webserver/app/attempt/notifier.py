@@ -0,0 +1,145 @@
+import asyncio
+import json
+from collections.abc import Callable, Iterable
+from typing import Annotated, Any, Self
+
+from aio_pika.abc import AbstractIncomingMessage
+from fastapi import Depends
+
+from app.core.logger import create_log
+from app.core.rabbitmq_client import rabbitmq_client
+
+from .models import Attempt
+
+log = create_log(__name__)
+
+# поля результата, которые отдаются клиенту, ждущему вердикт
+RESULT_FIELDS = (
+    "id",
+    "status",
+    "time_used_ms",
+    "memory_used_bytes",
+    "error_traceback",
+    "failed_test_number",
+    "source_code_output",
+    "expected_output",
+)
+
+
+RESULT_EVENT = "result"
+# прогресс по тестам публикует сам воркер, минуя веб-сервер
+PROGRESS_EVENT = "progress"
+
+
+def attempt_result(attempt: Attempt) -> dict[str, Any]:
+    return {field: getattr(attempt, field) for field in RESULT_FIELDS}
+
+
+class AttemptSubscription:
+    def __init__(self, notifier: "AttemptNotifier", attempt_ids: set[int]):
+        self.notifier = notifier
+        self.attempt_ids = attempt_ids
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    async def get(self) -> dict[str, Any]:
+        """Следующее событие; срок ожидания задаёт вызывающий код."""
+        return await self.queue.get()
+
+    async def wait_result(self) -> dict[str, Any]:
+        """Ждёт результат попытки, пропуская события прогресса."""
+        while True:
+            event = await self.get()
+            if event.get("event", RESULT_EVENT) == RESULT_EVENT:
+                return event
+
+    def close(self) -> None:
+        self.notifier.unsubscribe(self)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class AttemptNotifier:
+    """Рассылка результатов попыток по всем процессам веб-сервера.
+
+    Результат из общей очереди забирает один случайный процесс. После
+    записи в БД он публикует уведомление в fanout-exchange
+    ``attempt_notifications``, а у каждого процесса к нему привязана своя
+    эксклюзивная очередь — так уведомление доходит до процесса, где ждёт
+    клиент.
+
+    Туда же воркер публикует события прогресса по тестам (``event`` равен
+    ``progress``), у результатов ``event`` равен ``result``.
+
+    Подписываться нужно до чтения статуса из БД: тогда результат,
+    записанный после чтения, гарантированно придёт уведомлением.
+    """
+
+    def __init__(self) -> None:
+        self.subscriptions: dict[int, set[AttemptSubscription]] = {}
+        # обработчики событий exchange; ошибка обработчика логируется, и
+        # результаты с прогрессом всё равно доходят до подписчиков попыток
+        self.listeners: dict[str, list[Callable[[dict[str, Any]], None]]] = {}
+
+    def add_listener(
+        self, event: str, callback: Callable[[dict[str, Any]], None]
+    ) -> None:
+        self.listeners.setdefault(event, []).append(callback)
+
+    def subscribe(self, attempt_ids: Iterable[int]) -> AttemptSubscription:
+        subscription = AttemptSubscription(self, set(attempt_ids))
+        for attempt_id in subscription.attempt_ids:
+            self.subscriptions.setdefault(attempt_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: AttemptSubscription) -> None:
+        for attempt_id in subscription.attempt_ids:
+            subscribers = self.subscriptions.get(attempt_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscriptions[attempt_id]
+
+    def dispatch(self, payload: dict[str, Any]) -> None:
+        event = payload.get("event", RESULT_EVENT)
+        for listener in self.listeners.get(event, ()):
+            try:
+                listener(payload)
+            except Exception as e:
+                log(e, level="error", additional_info=f"event: {event}")
+        if event not in (RESULT_EVENT, PROGRESS_EVENT):
+            return
+
+        for subscription in self.subscriptions.get(payload["id"], ()):
+            subscription.queue.put_nowait(payload)
+
+    async def publish(self, attempt: Attempt) -> None:
+        await rabbitmq_client.publish_notification(
+            {
+                "event": RESULT_EVENT,
+                **attempt_result(attempt),
+                "user_id": str(attempt.user_id),
+                "task_id": attempt.task_id,
+            }
+        )
+
+    async def handle_notification(self, message: AbstractIncomingMessage):
+        async with message.process():
+            try:
+                self.dispatch(json.loads(message.body.decode()))
+            except Exception as e:
+                log(e, level="error")
+
+
+attempt_notifier = AttemptNotifier()
+
+
+def get_attempt_notifier() -> AttemptNotifier:
+    return attempt_notifier
+
+
+AttemptNotifierDep = Annotated[AttemptNotifier, Depends(get_attempt_notifier)]
@@ -0,0 +1,57 @@
+"""Логарифмические гистограммы времени и памяти принятых попыток.
+
+Значение ``v`` попадает в корзину ``floor(log2(v + 1) * BUCKETS_PER_OCTAVE)``:
+границы корзин растут геометрически, поэтому относительная погрешность
+(около 19% при четырёх корзинах на октаву) одинакова и для миллисекунд,
+и для гигабайт, а число корзин — не больше ~160 при любом числе попыток.
+Гистограмма хранится словарём ``{корзина: число попыток}``.
+"""
+
+import math
+
+BUCKETS_PER_OCTAVE = 4
+
+
+def bucket_of(value: int) -> int:
+    return math.floor(math.log2(max(value, 0) + 1) * BUCKETS_PER_OCTAVE)
+
+
+def bucket_bounds(bucket: int) -> tuple[float, float]:
+    """Полуинтервал [нижняя, верхняя) значений корзины."""
+    return (
+        2 ** (bucket / BUCKETS_PER_OCTAVE) - 1,
+        2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE) - 1,
+    )
+
+
+def percentile_rank(histogram: dict[int, int], value: int) -> float | None:
+    """Доля попыток (в процентах), у которых значение больше ``value``.
+
+    Попытки из той же корзины считаются наполовину больше, наполовину
+    меньше. None, если гистограмма пуста.
+    """
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+
+    bucket = bucket_of(value)
+    above = sum(count for b, count in histogram.items() if b > bucket)
+    same = histogram.get(bucket, 0)
+    return round((above + same / 2) / total * 100, 1)
+
+
+def quantile(histogram: dict[int, int], q: float) -> float | None:
+    """Оценка q-квантиля (0 <= q <= 1) с интерполяцией внутри корзины."""
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+
+    rank = q * total
+    seen = 0
+    for bucket in sorted(histogram):
+        count = histogram[bucket]
+        if count > 0 and seen + count >= rank:
+            low, high = bucket_bounds(bucket)
+            return low + (high - low) * (rank - seen) / count
+        seen += count
+    return bucket_bounds(max(histogram))[1]
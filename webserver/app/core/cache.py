@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any
+
+
+class TTLCache[KeyT: Hashable]:
+    """LRU-кэш в памяти процесса с ограниченным временем жизни записей.
+
+    ``clear`` и ``discard`` увеличивают поколение кэша: значение, которое
+    начали загружать до очистки, в кэш уже не попадёт, даже если загрузка
+    закончится после неё.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: OrderedDict[KeyT, tuple[float, Any]] = OrderedDict()
+        self.generation = 0
+
+    def get(self, key: KeyT) -> Any | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: KeyT, value: Any) -> None:
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get_or_load(
+        self, key: KeyT, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        generation = self.generation
+        value = await load()
+        if generation == self.generation:
+            self.set(key, value)
+        return value
+
+    def discard(self, keys: Iterable[KeyT]) -> None:
+        self.generation += 1
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.entries.clear()
@@ -116,6 +116,45 @@ class Settings(BaseSettings):
     def RABBITMQ_URL(self) -> str:  # noqa: N802
         return f"amqp://{self.RABBITMQ_DEFAULT_USER}:{self.RABBITMQ_DEFAULT_PASS}@{self.RABBITMQ_HOST}:{self.RABBITMQ_PORT}/"
 
+    # Результаты проверки пишутся в БД пачками: размер пачки и сколько
+    # секунд ждать её заполнения
+    RESULT_BATCH_SIZE: int = 50
+    RESULT_BATCH_TIMEOUT_SECONDS: float = 0.05
+
+    # Поток событий попыток (SSE): сколько попыток в одной подписке,
+    # период keepalive и максимальная длительность соединения
+    ATTEMPT_STREAM_MAX_IDS: int = 50
+    ATTEMPT_STREAM_KEEPALIVE_SECONDS: float = 15
+    ATTEMPT_STREAM_TIMEOUT_SECONDS: float = 10 * 60
+
+    # Запись задач воркеру в gzip-JSONL для офлайн-прогона (по умолчанию
+    # выключена); в пути можно указать {pid}, чтобы процессы не мешали
+    # друг другу
+    JUDGE_TRAFFIC_LOG_PATH: str | None = None
+    JUDGE_TRAFFIC_SAMPLE_RATE: float = 1.0
+
+    # Кэш каталога задач и тегов в памяти процесса: время жизни записи
+    # и сколько разных запросов хранить
+    CATALOG_CACHE_TTL_SECONDS: float = 30
+    CATALOG_CACHE_MAX_ENTRIES: int = 1024
+
+    # Статистика админки отдаётся из снимка в памяти; старше этого возраста
+    # снимок пересчитывается в фоне
+    ADMIN_STATS_MAX_AGE_SECONDS: float = 60
+
+    # Годовая статистика профиля кэшируется по (пользователь, год) и
+    # сбрасывается при новом вердикте OK
+    USER_STATS_CACHE_TTL_SECONDS: float = 600
+    USER_STATS_CACHE_MAX_ENTRIES: int = 4096
+
+    # Попытки секционированы по месяцам: на сколько месяцев вперёд
+    # создаются секции. Тяжёлые поля попыток старше ATTEMPT_ARCHIVE_AFTER_DAYS
+    # сжимаются в архив пачками раз в ATTEMPT_ARCHIVE_INTERVAL_SECONDS
+    ATTEMPT_PARTITIONS_AHEAD_MONTHS: int = 2
+    ATTEMPT_ARCHIVE_AFTER_DAYS: int = 180
+    ATTEMPT_ARCHIVE_BATCH_SIZE: int = 500
+    ATTEMPT_ARCHIVE_INTERVAL_SECONDS: float = 60 * 60
+
     @model_validator(mode="after")
     def _enforce_non_default_secrets(self) -> Self:
         self._check_default_secret("SECRET_KEY", self.SECRET_KEY)
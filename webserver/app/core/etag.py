@@ -0,0 +1,45 @@
+"""Условные GET-запросы: ETag и ответ 304 без сериализации тела."""
+
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+# общий для всех ответ, который браузер сверяет перед использованием
+PUBLIC_REVALIDATE = "public, no-cache"
+# ответ зависит от пользователя: кэшировать может только браузер,
+# и перед каждым использованием он должен сверить ETag
+PRIVATE_REVALIDATE = "private, no-cache"
+# содержимое больше не меняется (например, завершённая попытка)
+PRIVATE_IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def make_etag(*parts: Any) -> str:
+    """Сильный ETag из значений, однозначно задающих содержимое ответа"""
+    raw = "\x1f".join(str(part) for part in parts)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # для If-None-Match сравнение слабое: префикс W/ не учитывается
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str, cache_control: str
+) -> Response | None:
+    """Ставит валидаторы на ответ; возвращает 304, если клиент уже имеет его.
+
+    Если вернулся ``None``, обработчик отдаёт тело как обычно.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
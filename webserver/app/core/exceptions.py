@@ -41,3 +41,14 @@ class AccessDeniedException(HTTPException):
             status_code=self.default_status_code,
             detail=detail or self.default_message,
         )
+
+
+class InvalidCursorException(HTTPException):
+    default_status_code = 400
+    default_message = "Некорректный курсор пагинации"
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=self.default_status_code,
+            detail=self.default_message,
+        )
@@ -2,17 +2,35 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from app.attempt.archive import attempt_archiver
 from app.attempt.execution_result_handler import execution_result_handler
+from app.attempt.notifier import RESULT_EVENT, attempt_notifier
 from app.core.rabbitmq_client import rabbitmq_client
+from app.core.traffic_recorder import traffic_recorder
+from app.task.cache import CATALOG_EVENT, catalog_cache
+from app.user.cache import user_stats_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await rabbitmq_client.connect()
-    await rabbitmq_client.start_result_consumer(
-        execution_result_handler.handle_result
-    )
+    with traffic_recorder.recording():
+        await rabbitmq_client.connect()
+        await rabbitmq_client.start_result_consumer(
+            execution_result_handler.handle_result
+        )
+        attempt_notifier.add_listener(
+            CATALOG_EVENT, catalog_cache.handle_notification
+        )
+        attempt_notifier.add_listener(
+            RESULT_EVENT, user_stats_cache.handle_notification
+        )
+        await rabbitmq_client.start_notification_consumer(
+            attempt_notifier.handle_notification
+        )
+        attempt_archiver.start()
 
-    yield
+        yield
 
-    await rabbitmq_client.close()
+        await attempt_archiver.stop()
+        await execution_result_handler.flush()
+        await rabbitmq_client.close()
@@ -0,0 +1,116 @@
+"""Курсорная (keyset) пагинация списков.
+
+Курсор — непрозрачная для клиента строка с ключом сортировки последней
+выданной строки. Следующая страница выбирается условием «строго после
+этого ключа», поэтому её стоимость не зависит от глубины, в отличие от
+OFFSET, который заставляет БД пройти все пропущенные строки.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, Select, tuple_
+
+from .exceptions import InvalidCursorException
+
+
+def with_count_default(with_count: bool | None, cursor: str | None) -> bool:
+    """Общее число по умолчанию нужно только первой странице.
+
+    COUNT проходит все подходящие строки, поэтому на следующих страницах
+    он считается лишь по явной просьбе клиента.
+    """
+    return with_count if with_count is not None else cursor is None
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [
+        value.isoformat()
+        if isinstance(value, datetime)
+        else str(value)
+        if isinstance(value, UUID | Decimal)
+        else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":"))
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple[Any, ...]:
+    """Разбирает курсор, приводя значения к ``types`` по порядку"""
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("cursor shape mismatch")
+        return tuple(
+            _parse_value(value, type_)
+            for value, type_ in zip(payload, types, strict=True)
+        )
+    except (ValueError, TypeError, ArithmeticError) as e:
+        raise InvalidCursorException from e
+
+
+def _parse_value(value: Any, type_: type) -> Any:
+    if type_ is datetime:
+        return datetime.fromisoformat(value)
+    if type_ is UUID:
+        return UUID(value)
+    if type_ is Decimal:
+        # NUMERIC передаётся строкой, чтобы граница страницы не сдвигалась
+        # из-за округления во float
+        return Decimal(str(value))
+    if not isinstance(value, type_) or isinstance(value, bool):
+        raise TypeError(f"expected {type_.__name__}")
+    return value
+
+
+def after_key(
+    columns: list[Any], values: tuple[Any, ...], *, descending: bool
+) -> ColumnElement[bool]:
+    """Условие «строка идёт после ключа» для сортировки по ``columns``.
+
+    Сравнение кортежей ``(a, b) > (x, y)`` Postgres умеет вести по
+    составному индексу с тем же порядком колонок.
+    """
+    key = tuple_(*columns)
+    return key < values if descending else key > values
+
+
+def page_query[SelectT: Select[Any]](
+    query: SelectT,
+    *,
+    sort_key: list[Any],
+    after: tuple[Any, ...] | None,
+    skip: int,
+    limit: int,
+    descending: bool = False,
+) -> SelectT:
+    """Ограничивает запрос одной страницей.
+
+    С курсором берутся строки после его ключа ``after``, без курсора —
+    со сдвигом ``skip``. Выбирается ``limit + 1`` строк: лишняя строка
+    показывает :func:`split_page`, что есть следующая страница.
+    """
+    if after is not None:
+        query = query.where(after_key(sort_key, after, descending=descending))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def split_page[RowT](
+    rows: Sequence[RowT],
+    limit: int,
+    cursor_key: Callable[[RowT], tuple[Any, ...]],
+) -> tuple[list[RowT], str | None]:
+    """Отрезает лишнюю строку и строит курсор следующей страницы."""
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, encode_cursor(*cursor_key(page[-1]))
@@ -14,6 +14,7 @@ from aio_pika.abc import (
 
 from app.core.config import settings
 from app.core.logger import create_log
+from app.core.traffic_recorder import traffic_recorder
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,11 +28,17 @@ class RabbitMQClient:
         self.task_exchange: AbstractExchange
         self.result_exchange: AbstractExchange
         self.result_queue: AbstractQueue
+        self.notification_exchange: AbstractExchange
+        self.notification_queue: AbstractQueue
 
     async def connect(self) -> None:
         try:
             self.connection = await connect(settings.RABBITMQ_URL)
             self.channel = await self.connection.channel()
+            # запас на следующую пачку, пока текущая пишется в БД
+            await self.channel.set_qos(
+                prefetch_count=settings.RESULT_BATCH_SIZE * 2
+            )
 
             self.task_exchange = await self.channel.declare_exchange(
                 "code_execution", ExchangeType.DIRECT, durable=True
@@ -47,6 +54,19 @@ class RabbitMQClient:
 
             await self.result_queue.bind(self.result_exchange, routing_key="")
 
+            self.notification_exchange = await self.channel.declare_exchange(
+                "attempt_notifications", ExchangeType.FANOUT, durable=True
+            )
+
+            # своя очередь у каждого процесса: уведомление получат все
+            self.notification_queue = await self.channel.declare_queue(
+                exclusive=True, auto_delete=True
+            )
+
+            await self.notification_queue.bind(
+                self.notification_exchange, routing_key=""
+            )
+
             logger.info("Connected to RabbitMQ")
 
         except Exception as e:
@@ -63,6 +83,7 @@ class RabbitMQClient:
         )
 
         await self.task_exchange.publish(message, routing_key="execute_code")
+        traffic_recorder.record(task_data)
 
     async def start_result_consumer(self, callback: Callable):
         if not self.result_queue:
@@ -70,6 +91,23 @@ class RabbitMQClient:
 
         await self.result_queue.consume(callback)
 
+    async def publish_notification(self, payload: dict[str, Any]):
+        if not self.notification_exchange:
+            await self.connect()
+
+        message = Message(
+            json.dumps(payload).encode(),
+            delivery_mode=aio_pika.DeliveryMode.NOT_PERSISTENT,
+        )
+
+        await self.notification_exchange.publish(message, routing_key="")
+
+    async def start_notification_consumer(self, callback: Callable):
+        if not self.notification_queue:
+            await self.connect()
+
+        await self.notification_queue.consume(callback)
+
     async def close(self):
         if self.connection:
             await self.connection.close()
@@ -0,0 +1,69 @@
+import gzip
+import json
+import os
+import random
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import IO, Any
+
+from app.core.config import settings
+from app.core.logger import create_log
+
+log = create_log(__name__)
+
+
+class TrafficRecorder:
+    """Запись отправляемых в воркер задач для офлайн-прогона.
+
+    Пишет gzip-JSONL: в каждой строке смещение от начала записи в секундах
+    и тело задачи с обезличенным id (порядковый номер вместо id попытки).
+    Ни id попыток, ни абсолютное время в лог не попадают. Лог читает
+    ``python -m app.harness.replay`` в code_executor.
+    """
+
+    def __init__(self, path: str | None, *, sample_rate: float = 1.0):
+        self.path = path.format(pid=os.getpid()) if path else None
+        self.sample_rate = sample_rate
+        self._file: IO[str] | None = None
+        self._started = 0.0
+        self._sequence = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @contextmanager
+    def recording(self) -> Iterator[None]:
+        """Держит лог открытым, пока работает приложение."""
+        if not self.path or self._file:
+            yield
+            return
+        # gzip допускает дозапись: каждый запуск — отдельный member
+        with gzip.open(self.path, "at", encoding="utf-8") as file:
+            self._file = file
+            self._started = time.monotonic()
+            try:
+                yield
+            finally:
+                self._file = None
+
+    def record(self, task_data: dict[str, Any]) -> None:
+        if self._file is None or random.random() >= self.sample_rate:
+            return
+        self._sequence += 1
+        entry = {
+            "offset": round(time.monotonic() - self._started, 3),
+            "task": {**task_data, "id": self._sequence},
+        }
+        try:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            # запись трафика не должна мешать отправке попыток
+            log(e, level="warning")
+
+
+traffic_recorder = TrafficRecorder(
+    settings.JUDGE_TRAFFIC_LOG_PATH,
+    sample_rate=settings.JUDGE_TRAFFIC_SAMPLE_RATE,
+)
@@ -1,103 +1,123 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
 from sqlalchemy import desc, func, select
 from sqlmodel import col
 
-from app.attempt.models import Attempt, AttemptStatusEnum
+from app.attempt.models import (
+    Attempt,
+    AttemptRollup,
+    AttemptStatusEnum,
+    RollupGranularityEnum,
+)
 from app.core.accessor import BaseAccessor
 from app.core.exceptions import InternalException
 from app.core.logger import create_log
-from app.task.models import Tag, Task, TaskTagLink
+from app.task.models import DifficultyEnum, Tag, Task, TaskTagLink
 from app.user.models import User
 
-from .models import AdminStats
+from . import hll
+from .exceptions import InvalidTimeRangeException
+from .models import (
+    AdminStats,
+    AttemptTimeseriesFilters,
+    DailyUserSketch,
+    TaskUserSketch,
+    UserSketchEventEnum,
+)
 
-log = create_log(__name__)
+log = create_log(
+    __name__,
+    {
+        InvalidTimeRangeException: InvalidTimeRangeException.default_message,
+    },
+)
 
+# сколько корзин можно запросить за раз и сколько отдаётся по умолчанию
+MAX_TIMESERIES_BUCKETS = 1000
+DEFAULT_TIMESERIES_BUCKETS = 30
 
-class StatisticsAccessor(BaseAccessor):
-    async def get_admin_stats(self) -> AdminStats:  # noqa: PLR0914
-        try:
-            total_users = (
-                await self.session.scalar(select(func.count(col(User.id)))) or 0
-            )
+BUCKET_SIZES = {
+    RollupGranularityEnum.hour: timedelta(hours=1),
+    RollupGranularityEnum.day: timedelta(days=1),
+}
 
-            active_users = (
-                await self.session.scalar(
-                    select(func.count(col(User.id))).where(
-                        col(User.is_active) == True  # noqa: E712
-                    )
-                )
-                or 0
-            )
-            inactive_users = total_users - active_users
 
-            superusers = (
-                await self.session.scalar(
-                    select(func.count(col(User.id))).where(
-                        col(User.is_superuser) == True  # noqa: E712
-                    )
-                )
-                or 0
-            )
+class StatisticsAccessor(BaseAccessor):
+    async def get_admin_stats(self) -> AdminStats:
+        """Статистика для админки за пять агрегатных запросов.
 
-            total_tasks = (
-                await self.session.scalar(select(func.count(col(Task.id)))) or 0
-            )
+        Каждая таблица читается один раз: вместо отдельного COUNT на
+        каждую цифру считаются агрегаты с FILTER.
+        """
+        try:
+            generated_at = datetime.now(timezone.utc)  # noqa: UP017
+            thirty_days_ago = generated_at - timedelta(days=30)
 
-            public_tasks = (
-                await self.session.scalar(
-                    select(func.count(col(Task.id))).where(
-                        col(Task.is_public) == True  # noqa: E712
-                    )
+            users = (
+                await self.session.execute(
+                    select(
+                        func.count().label("total"),
+                        func.count()
+                        .filter(col(User.is_active) == True)  # noqa: E712
+                        .label("active"),
+                        func.count()
+                        .filter(col(User.is_superuser) == True)  # noqa: E712
+                        .label("superusers"),
+                        func.count()
+                        .filter(col(User.created_at) >= thirty_days_ago)
+                        .label("recent"),
+                    ).select_from(User)
                 )
-                or 0
-            )
-            private_tasks = total_tasks - public_tasks
+            ).one()
 
-            difficulty_stats = {}
-            for difficulty in ["easy", "medium", "hard"]:
-                count = await self.session.scalar(
-                    select(func.count(col(Task.id))).where(
-                        col(Task.difficulty) == difficulty
-                    )
+            tasks = (
+                await self.session.execute(
+                    select(
+                        func.count().label("total"),
+                        func.count()
+                        .filter(col(Task.is_public) == True)  # noqa: E712
+                        .label("public"),
+                        *(
+                            func.count()
+                            .filter(col(Task.difficulty) == difficulty)
+                            .label(difficulty.value)
+                            for difficulty in DifficultyEnum
+                        ),
+                    ).select_from(Task)
                 )
-                difficulty_stats[difficulty] = count or 0
+            ).one()
 
-            total_attempts = (
-                await self.session.scalar(select(func.count(col(Attempt.id))))
-                or 0
-            )
-            successful_attempts = (
-                await self.session.scalar(
-                    select(func.count(col(Attempt.id))).where(
-                        col(Attempt.status) == AttemptStatusEnum.OK
-                    )
+            # по языкам, а итоги — суммой строк, без второго прохода
+            language_rows = (
+                await self.session.execute(
+                    select(
+                        col(Attempt.programming_language),
+                        func.count().label("total"),
+                        func.count()
+                        .filter(col(Attempt.status) == AttemptStatusEnum.OK)
+                        .label("successful"),
+                        func.count()
+                        .filter(col(Attempt.created_at) >= thirty_days_ago)
+                        .label("recent"),
+                    ).group_by(col(Attempt.programming_language))
                 )
-                or 0
-            )
+            ).all()
+
+            attempts_by_language = {
+                row.programming_language.value: row.total
+                for row in language_rows
+            }
+            total_attempts = sum(row.total for row in language_rows)
+            successful_attempts = sum(row.successful for row in language_rows)
             success_rate = (
                 (successful_attempts / total_attempts * 100)
                 if total_attempts > 0
                 else 0
             )
 
-            language_stats = await self.session.execute(
-                select(
-                    col(Attempt.programming_language),
-                    func.count(col(Attempt.id)).label("count"),
-                ).group_by(col(Attempt.programming_language))
-            )
-
-            attempts_by_language: dict[str, int] = {}
-            for row in language_stats.all():
-                language_name = (
-                    row[0].value if hasattr(row[0], "value") else str(row[0])
-                )
-                attempts_by_language[language_name] = row[1]
-
             total_tags = (
-                await self.session.scalar(select(func.count(col(Tag.id)))) or 0
+                await self.session.scalar(select(func.count()).select_from(Tag))
+                or 0
             )
 
             most_used_tags_query = await self.session.execute(
@@ -115,44 +135,162 @@ class StatisticsAccessor(BaseAccessor):
                 for row in most_used_tags_query.all()
             ]
 
-            thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)  # noqa: UP017
-            registrations_last_30_days = (
-                await self.session.scalar(
-                    select(func.count(col(User.id))).where(
-                        col(User.created_at) >= thirty_days_ago
-                    )
-                )
-                or 0
-            )
-
-            attempts_last_30_days = (
-                await self.session.scalar(
-                    select(func.count(col(Attempt.id))).where(
-                        col(Attempt.created_at) >= thirty_days_ago
-                    )
-                )
-                or 0
-            )
-
             return AdminStats(
-                total_users=total_users,
-                active_users=active_users,
-                inactive_users=inactive_users,
-                superusers=superusers,
-                total_tasks=total_tasks,
-                public_tasks=public_tasks,
-                private_tasks=private_tasks,
-                tasks_by_difficulty=difficulty_stats,
+                total_users=users.total,
+                active_users=users.active,
+                inactive_users=users.total - users.active,
+                superusers=users.superusers,
+                total_tasks=tasks.total,
+                public_tasks=tasks.public,
+                private_tasks=tasks.total - tasks.public,
+                tasks_by_difficulty={
+                    difficulty.value: getattr(tasks, difficulty.value)
+                    for difficulty in DifficultyEnum
+                },
                 total_attempts=total_attempts,
                 successful_attempts=successful_attempts,
                 success_rate=round(success_rate, 2),
                 attempts_by_language=attempts_by_language,
                 total_tags=total_tags,
                 most_used_tags=most_used_tags,
-                attempts_last_30_days=attempts_last_30_days,
-                registrations_last_30_days=registrations_last_30_days,
+                attempts_last_30_days=sum(row.recent for row in language_rows),
+                registrations_last_30_days=users.recent,
+                generated_at=generated_at,
             )
 
         except Exception as e:
             log(e)
             raise InternalException from e
+
+    async def get_attempt_timeseries(
+        self, *, filters: AttemptTimeseriesFilters
+    ) -> dict:
+        """Ряд числа вердиктов по корзинам из attempt_rollup.
+
+        Интервал [start, end) расширяется до границ корзин; пустые
+        корзины в ответ не попадают.
+        """
+        granularity = filters.granularity
+        bucket_size = BUCKET_SIZES[granularity]
+        end = _as_utc(filters.end or datetime.now(timezone.utc))  # noqa: UP017
+        start = granularity.truncate(
+            _as_utc(filters.start)
+            if filters.start
+            else end - bucket_size * DEFAULT_TIMESERIES_BUCKETS
+        )
+
+        try:
+            if not start < end:
+                raise InvalidTimeRangeException
+            if (end - start) / bucket_size > MAX_TIMESERIES_BUCKETS:
+                raise InvalidTimeRangeException
+
+            dimensions = [
+                getattr(AttemptRollup, dimension.value)
+                for dimension in dict.fromkeys(filters.group_by or ())
+            ]
+            query = (
+                select(
+                    col(AttemptRollup.bucket_start),
+                    *dimensions,
+                    func.sum(col(AttemptRollup.count)).label("count"),
+                )
+                .where(
+                    col(AttemptRollup.granularity) == granularity,
+                    col(AttemptRollup.bucket_start) >= start,
+                    col(AttemptRollup.bucket_start) < end,
+                )
+                .group_by(col(AttemptRollup.bucket_start), *dimensions)
+                .having(func.sum(col(AttemptRollup.count)) != 0)
+                .order_by(col(AttemptRollup.bucket_start), *dimensions)
+            )
+            if filters.programming_languages:
+                query = query.where(
+                    col(AttemptRollup.programming_language).in_(
+                        filters.programming_languages
+                    )
+                )
+            if filters.statuses:
+                query = query.where(
+                    col(AttemptRollup.status).in_(filters.statuses)
+                )
+            if filters.task_ids:
+                query = query.where(
+                    col(AttemptRollup.task_id).in_(filters.task_ids)
+                )
+
+            result = await self.session.execute(query)
+            data = [dict(row._mapping) for row in result.all()]
+
+        except InvalidTimeRangeException as e:
+            log(e, level="warning", additional_info=f"{start} - {end}")
+            raise
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return {
+                "granularity": granularity,
+                "start": start,
+                "end": end,
+                "data": data,
+            }
+
+    async def count_distinct_users(
+        self, *, event: UserSketchEventEnum, start: date, end: date
+    ) -> int:
+        """Оценка числа разных пользователей за дни [start, end].
+
+        Дневные скетчи объединяются агрегатом ``hll_union`` в БД, наружу
+        уходит один массив регистров.
+        """
+        try:
+            if start > end:
+                raise InvalidTimeRangeException
+
+            registers = await self.session.scalar(
+                select(func.hll_union(col(DailyUserSketch.registers))).where(
+                    col(DailyUserSketch.event) == event,
+                    col(DailyUserSketch.day) >= start,
+                    col(DailyUserSketch.day) <= end,
+                )
+            )
+
+        except InvalidTimeRangeException as e:
+            log(e, level="warning", additional_info=f"{start} - {end}")
+            raise
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return hll.estimate(registers) if registers else 0
+
+    async def count_task_distinct_users(
+        self, *, task_id: int
+    ) -> dict[UserSketchEventEnum, int]:
+        try:
+            result = await self.session.execute(
+                select(
+                    col(TaskUserSketch.event), col(TaskUserSketch.registers)
+                ).where(col(TaskUserSketch.task_id) == task_id)
+            )
+            counts: dict[UserSketchEventEnum, int] = dict.fromkeys(
+                UserSketchEventEnum, 0
+            )
+            for row in result.all():
+                counts[UserSketchEventEnum(row.event)] = hll.estimate(
+                    row.registers
+                )
+
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return counts
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Время без часового пояса считается заданным в UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)  # noqa: UP017
+    return moment
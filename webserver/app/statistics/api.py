@@ -1,11 +1,22 @@
-from typing import Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from app.auth.deps import get_current_active_superuser
 from app.store import StoreDep
 
-from .models import AdminStats
+from .hll import STANDARD_ERROR
+from .models import (
+    AdminStats,
+    AttemptTimeseries,
+    AttemptTimeseriesFilters,
+    DistinctUsers,
+    Engagement,
+    TaskDistinctUsers,
+    UserSketchEventEnum,
+)
+from .snapshot import AdminStatsSnapshotDep
 
 router = APIRouter(prefix="/stats", tags=["stat"])
 
@@ -15,5 +26,85 @@ router = APIRouter(prefix="/stats", tags=["stat"])
     response_model=AdminStats,
     dependencies=[Depends(get_current_active_superuser)],
 )
-async def get_admin_stats(store: StoreDep) -> Any:
-    return await store.statistics.get_admin_stats()
+async def get_admin_stats(
+    snapshot: AdminStatsSnapshotDep, refresh: bool = False
+) -> Any:
+    if refresh:
+        return await snapshot.refresh()
+    return await snapshot.get()
+
+
+@router.get(
+    "/attempts",
+    response_model=AttemptTimeseries,
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def get_attempt_timeseries(
+    store: StoreDep, filters: Annotated[AttemptTimeseriesFilters, Query()]
+) -> Any:
+    return await store.statistics.get_attempt_timeseries(filters=filters)
+
+
+@router.get(
+    "/users/distinct",
+    response_model=DistinctUsers,
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def count_distinct_users(
+    store: StoreDep,
+    start: date,
+    end: date,
+    event: UserSketchEventEnum = UserSketchEventEnum.submitted,
+) -> Any:
+    count = await store.statistics.count_distinct_users(
+        event=event, start=start, end=end
+    )
+    return DistinctUsers(
+        event=event,
+        start=start,
+        end=end,
+        count=count,
+        standard_error=STANDARD_ERROR,
+    )
+
+
+@router.get(
+    "/users/engagement",
+    response_model=Engagement,
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def get_engagement(store: StoreDep, day: date | None = None) -> Any:
+    if day is None:
+        day = datetime.now(timezone.utc).date()  # noqa: UP017
+
+    dau, wau, mau = [
+        await store.statistics.count_distinct_users(
+            event=UserSketchEventEnum.submitted,
+            start=day - timedelta(days=days - 1),
+            end=day,
+        )
+        for days in (1, 7, 30)
+    ]
+    return Engagement(
+        day=day,
+        dau=dau,
+        wau=wau,
+        mau=mau,
+        stickiness=round(dau / mau, 3) if mau else 0.0,
+        standard_error=STANDARD_ERROR,
+    )
+
+
+@router.get(
+    "/tasks/{task_id}/users",
+    response_model=TaskDistinctUsers,
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def count_task_distinct_users(store: StoreDep, task_id: int) -> Any:
+    counts = await store.statistics.count_task_distinct_users(task_id=task_id)
+    return TaskDistinctUsers(
+        task_id=task_id,
+        submitters=counts[UserSketchEventEnum.submitted],
+        solvers=counts[UserSketchEventEnum.solved],
+        standard_error=STANDARD_ERROR,
+    )
@@ -0,0 +1,12 @@
+from fastapi import HTTPException
+
+
+class InvalidTimeRangeException(HTTPException):
+    default_status_code = 400
+    default_message = "Некорректный временной интервал"
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=self.default_status_code,
+            detail=self.default_message,
+        )
@@ -1,6 +1,24 @@
+from datetime import date, datetime
+from enum import StrEnum
 from typing import Any
 
-from sqlmodel import SQLModel
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import (
+    Column,
+    Date,
+    Field,
+    ForeignKey,
+    Integer,
+    SmallInteger,
+    SQLModel,
+    String,
+)
+
+from app.attempt.models import (
+    AttemptStatusEnum,
+    ProgrammingLanguageEnum,
+    RollupGranularityEnum,
+)
 
 
 class AdminStats(SQLModel):
@@ -24,3 +42,110 @@ class AdminStats(SQLModel):
 
     registrations_last_30_days: int
     attempts_last_30_days: int
+
+    # когда снимок посчитан: админка отдаёт его из памяти
+    generated_at: datetime
+
+
+class RollupDimensionEnum(StrEnum):
+    programming_language = "programming_language"
+    status = "status"
+    task_id = "task_id"
+
+
+class AttemptTimeseriesFilters(SQLModel):
+    granularity: RollupGranularityEnum = RollupGranularityEnum.day
+    # по умолчанию — последние 30 корзин
+    start: datetime | None = None
+    end: datetime | None = None
+    group_by: list[RollupDimensionEnum] | None = None
+    programming_languages: list[ProgrammingLanguageEnum] | None = None
+    statuses: list[AttemptStatusEnum] | None = None
+    task_ids: list[int] | None = None
+
+
+class AttemptTimeseriesPoint(SQLModel):
+    bucket_start: datetime
+    # заполнены только измерения из group_by
+    programming_language: ProgrammingLanguageEnum | None = None
+    status: AttemptStatusEnum | None = None
+    task_id: int | None = None
+    count: int
+
+
+class AttemptTimeseries(SQLModel):
+    granularity: RollupGranularityEnum
+    start: datetime
+    end: datetime
+    data: list[AttemptTimeseriesPoint]
+
+
+class UserSketchEventEnum(StrEnum):
+    submitted = "submitted"
+    solved = "solved"
+
+
+class DailyUserSketch(SQLModel, table=True):
+    """HyperLogLog-скетч пользователей, отправивших/решивших что-то за день.
+
+    Регистры (см. ``app.statistics.hll``) обновляются SQL-функцией
+    ``hll_add``, а за интервал дней объединяются агрегатом ``hll_union``;
+    обе созданы миграцией. Скетчи пополняются пачкой вместе с вердиктами,
+    поэтому отправка попадает в день своей попытки, когда её проверят.
+    """
+
+    __tablename__ = "daily_user_sketch"
+
+    day: date = Field(sa_column=Column(Date, primary_key=True))
+    event: UserSketchEventEnum = Field(
+        sa_column=Column(String, primary_key=True)
+    )
+    registers: list[int] = Field(
+        sa_column=Column(ARRAY(SmallInteger), nullable=False)
+    )
+
+
+class TaskUserSketch(SQLModel, table=True):
+    """HyperLogLog-скетч пользователей, отправлявших/решивших задачу."""
+
+    __tablename__ = "task_user_sketch"
+
+    task_id: int = Field(
+        sa_column=Column(
+            Integer,
+            ForeignKey("task.id", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
+    event: UserSketchEventEnum = Field(
+        sa_column=Column(String, primary_key=True)
+    )
+    registers: list[int] = Field(
+        sa_column=Column(ARRAY(SmallInteger), nullable=False)
+    )
+
+
+class DistinctUsers(SQLModel):
+    event: UserSketchEventEnum
+    start: date
+    end: date
+    count: int
+    # относительная стандартная ошибка оценки
+    standard_error: float
+
+
+class Engagement(SQLModel):
+    day: date
+    dau: int
+    wau: int
+    mau: int
+    # доля месячной аудитории, заходящей каждый день
+    stickiness: float
+    standard_error: float
+
+
+class TaskDistinctUsers(SQLModel):
+    task_id: int
+    submitters: int
+    solvers: int
+    standard_error: float
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.core.background_store import background_store_service
+from app.core.config import settings
+from app.core.logger import create_log
+
+from .models import AdminStats
+
+log = create_log(__name__)
+
+
+class AdminStatsSnapshot:
+    """Снимок статистики админки, который пересчитывается в фоне.
+
+    Запрос получает готовый снимок из памяти; если тот старше
+    ``max_age_seconds``, запускается один фоновый пересчёт, а клиент
+    сразу получает прежний снимок с его ``generated_at``. Синхронно
+    статистика считается только для первого запроса после старта.
+    """
+
+    def __init__(self, *, max_age_seconds: float) -> None:
+        self.max_age = timedelta(seconds=max_age_seconds)
+        self.stats: AdminStats | None = None
+        self.refreshing: asyncio.Task | None = None
+        self.lock = asyncio.Lock()
+
+    async def get(self) -> AdminStats:
+        if self.stats is None:
+            return await self.refresh()
+
+        if self.is_stale() and (
+            self.refreshing is None or self.refreshing.done()
+        ):
+            self.refreshing = asyncio.create_task(self._refresh_quietly())
+        return self.stats
+
+    def is_stale(self) -> bool:
+        return (
+            self.stats is None
+            or datetime.now(timezone.utc) - self.stats.generated_at  # noqa: UP017
+            > self.max_age
+        )
+
+    async def refresh(self) -> AdminStats:
+        async with self.lock:
+            store = await background_store_service.get_store()
+            try:
+                stats = await store.statistics.get_admin_stats()
+            finally:
+                await background_store_service.close_store(store)
+            self.stats = stats
+        return stats
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            # остаётся прежний снимок, следующий запрос попробует снова
+            log(e, level="error")
+
+
+admin_stats_snapshot = AdminStatsSnapshot(
+    max_age_seconds=settings.ADMIN_STATS_MAX_AGE_SECONDS
+)
+
+
+def get_admin_stats_snapshot() -> AdminStatsSnapshot:
+    return admin_stats_snapshot
+
+
+AdminStatsSnapshotDep = Annotated[
+    AdminStatsSnapshot, Depends(get_admin_stats_snapshot)
+]
@@ -46,6 +46,14 @@ class Store:
         finally:
             reset_explicit_transaction(token)
 
+    async def release(self) -> None:
+        """Отдаёт соединение в пул, не дожидаясь конца запроса.
+
+        Для долгих ожиданий (long polling): загруженные объекты остаются
+        доступны, а следующий запрос к БД возьмёт соединение заново.
+        """
+        await self.session.close()
+
     @property
     def user(self) -> UserAccessor:
         if self._user is None:
@@ -1,14 +1,25 @@
+import re
+from decimal import Decimal
 from typing import Any, TypedDict
 from uuid import UUID
 
-from sqlalchemy import case as sql_case, func, literal, or_
+from sqlalchemy import (
+    ColumnElement,
+    and_,
+    func,
+    literal,
+    literal_column,
+    or_,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import col, select
 
-from app.attempt.models import Attempt, AttemptStatusEnum
 from app.core.accessor import BaseAccessor
-from app.core.exceptions import InternalException
+from app.core.exceptions import InternalException, InvalidCursorException
 from app.core.logger import create_log
+from app.core.pagination import decode_cursor, page_query, split_page
+from app.user.models import UserScore
 
 from .exceptions import (
     TagAlreadyExistsException,
@@ -19,6 +30,8 @@ from .exceptions import (
     TastTagRelationshipNotExistsExceptionException,
 )
 from .models import (
+    DIFFICULTY_SCORES,
+    TASK_SEARCH_CONFIG,
     DifficultyEnum,
     SortByEnum,
     SortOrderEnum,
@@ -26,12 +39,17 @@ from .models import (
     TagCreate,
     TagUpdate,
     Task,
+    TaskAccessInfo,
     TaskCreate,
+    TaskPublicForList,
     TaskStatusEnum,
     TasksTypeEnum,
     TaskTagLink,
     TaskUpdate,
     TaskWithAttemptStatus,
+    UserTaskStatus,
+    task_search_vector,
+    task_tag_ids,
 )
 
 log = create_log(
@@ -44,13 +62,35 @@ log = create_log(
 
 
 class TasksDict(TypedDict):
-    tasks: list[TaskWithAttemptStatus]
-    count: int
+    tasks: list[TaskPublicForList]
+    count: int | None
+    next_cursor: str | None
 
 
 class TagsDict(TypedDict):
     tags: list[Tag]
-    count: int
+    count: int | None
+    next_cursor: str | None
+
+
+def _search_tsquery(search: str) -> ColumnElement | None:
+    """Префиксный tsquery из слов строки поиска.
+
+    ``сумм мас`` превращается в ``сумм:* & мас:*``. Знаки препинания
+    отбрасываются, чтобы пользовательский ввод не мог испортить
+    синтаксис tsquery.
+    """
+    words = re.findall(r"\w+", search.lower())
+    if not words:
+        return None
+    return func.to_tsquery(
+        literal_column(f"'{TASK_SEARCH_CONFIG}'"),
+        " & ".join(f"{word}:*" for word in words),
+    )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class TaskAccessor(BaseAccessor):
@@ -64,6 +104,80 @@ class TaskAccessor(BaseAccessor):
         else:
             return result
 
+    async def get_task_access_info(
+        self, *, task_id: int
+    ) -> TaskAccessInfo | None:
+        """Владелец, видимость и версия задачи без чтения условия и тестов"""
+        try:
+            result = await self.session.execute(
+                select(*TaskAccessInfo.columns()).where(col(Task.id) == task_id)
+            )
+            row = result.first()
+
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return TaskAccessInfo.model_validate(row._mapping) if row else None
+
+    async def get_user_task_statuses(
+        self, *, user_id: UUID, task_ids: list[int]
+    ) -> dict[int, TaskStatusEnum]:
+        """Статусы задач пользователя; задач без попыток в ответе нет"""
+        try:
+            result = await self.session.execute(
+                select(
+                    col(UserTaskStatus.task_id), col(UserTaskStatus.status)
+                ).where(
+                    col(UserTaskStatus.user_id) == user_id,
+                    col(UserTaskStatus.task_id).in_(task_ids),
+                )
+            )
+            statuses = {
+                task_id: TaskStatusEnum(status) for task_id, status in result
+            }
+
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return statuses
+
+    async def suggest_task_titles(
+        self,
+        *,
+        prefix: str,
+        user_id: UUID | None = None,
+        limit: int = 10,
+    ) -> list[str]:
+        """Названия задач, начинающиеся с ``prefix``, для автодополнения"""
+        try:
+            visible = col(Task.is_public) == True  # noqa: E712
+            if user_id is not None:
+                visible = or_(visible, col(Task.user_id) == user_id)
+
+            # lower(title) LIKE 'префикс%' идёт по индексу text_pattern_ops
+            title_lower = func.lower(col(Task.title))
+            query = (
+                select(col(Task.title))
+                .where(
+                    visible,
+                    title_lower.like(
+                        _escape_like(prefix.lower()) + "%", escape="\\"
+                    ),
+                )
+                .order_by(title_lower)
+                .limit(limit)
+            )
+            result = await self.session.execute(query)
+            titles = list(result.scalars().all())
+
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return titles
+
     async def get_task_by_id_with_status(
         self,
         *,
@@ -74,37 +188,15 @@ class TaskAccessor(BaseAccessor):
             base_query: Any = select(Task)
 
             if user_id is not None:
-                status_subq = (
-                    select(
-                        Attempt.task_id,
-                        sql_case(
-                            (
-                                func.sum(
-                                    sql_case(
-                                        (
-                                            col(Attempt.status)
-                                            == AttemptStatusEnum.OK,
-                                            1,
-                                        ),
-                                        else_=0,
-                                    )
-                                )
-                                > 0,
-                                literal(TaskStatusEnum.solved),
-                            ),
-                            else_=literal(TaskStatusEnum.attempted),
-                        ).label("user_attempt_status"),
-                    )
-                    .where(Attempt.user_id == user_id)
-                    .group_by(col(Attempt.task_id))
-                    .subquery()
-                )
-
                 base_query = base_query.outerjoin(
-                    status_subq, col(Task.id) == status_subq.c.task_id
+                    UserTaskStatus,
+                    and_(
+                        col(UserTaskStatus.task_id) == col(Task.id),
+                        col(UserTaskStatus.user_id) == user_id,
+                    ),
                 ).add_columns(
                     func.coalesce(
-                        status_subq.c.user_attempt_status,
+                        col(UserTaskStatus.status),
                         literal(TaskStatusEnum.todo),
                     ).label("user_attempt_status")
                 )
@@ -146,78 +238,48 @@ class TaskAccessor(BaseAccessor):
         tag_ids: list[int] | None = None,
         skip: int = 0,
         limit: int = 100,
+        cursor: str | None = None,
+        with_count: bool = True,
     ) -> TasksDict:
         try:
-            base_query = select(Task)
+            # только колонки списка: JSON с тестами может весить мегабайты
+            base_query = select(*TaskPublicForList.columns())
 
             if user_id is not None:
-                status_subq = (
-                    select(
-                        Attempt.task_id,
-                        sql_case(
-                            (
-                                func.sum(
-                                    sql_case(
-                                        (
-                                            col(Attempt.status)
-                                            == AttemptStatusEnum.OK,
-                                            1,
-                                        ),
-                                        else_=0,
-                                    )
-                                )
-                                > 0,
-                                literal(TaskStatusEnum.solved),
-                            ),
-                            else_=literal(TaskStatusEnum.attempted),
-                        ).label("user_attempt_status"),
-                    )
-                    .where(Attempt.user_id == user_id)
-                    .group_by(col(Attempt.task_id))
-                    .subquery()
-                )
-
+                # статус берётся из поддерживаемой сводки, а не группировкой
+                # всех попыток пользователя
                 base_query = base_query.outerjoin(
-                    status_subq, col(Task.id) == status_subq.c.task_id
+                    UserTaskStatus,
+                    and_(
+                        col(UserTaskStatus.task_id) == col(Task.id),
+                        col(UserTaskStatus.user_id) == user_id,
+                    ),
                 ).add_columns(
                     func.coalesce(
-                        status_subq.c.user_attempt_status,
+                        col(UserTaskStatus.status),
                         literal(TaskStatusEnum.todo),
                     ).label("user_attempt_status")
                 )  # type: ignore[assignment]
 
                 if statuses:
                     filters = []
-                    if any(
-                        s in statuses
-                        for s in [
-                            TaskStatusEnum.solved,
-                            TaskStatusEnum.attempted,
-                        ]
-                    ):
-                        filters.append(
-                            status_subq.c.user_attempt_status.in_(
-                                [
-                                    s.value
-                                    for s in statuses
-                                    if s
-                                    in [
-                                        TaskStatusEnum.solved,
-                                        TaskStatusEnum.attempted,
-                                    ]
-                                ]
-                            )
-                        )
+                    if started := [
+                        s.value
+                        for s in statuses
+                        if s
+                        in [TaskStatusEnum.solved, TaskStatusEnum.attempted]
+                    ]:
+                        filters.append(col(UserTaskStatus.status).in_(started))
                     if TaskStatusEnum.todo in statuses:
-                        filters.append(
-                            status_subq.c.user_attempt_status.is_(None)
-                        )
+                        filters.append(col(UserTaskStatus.task_id).is_(None))
 
                     base_query = base_query.where(or_(*filters))
 
-            if search:
+            # ILIKE '%...%' всегда читает всю таблицу, tsquery идёт по GIN
+            ts_query = _search_tsquery(search) if search else None
+            if ts_query is not None:
                 base_query = base_query.where(
-                    col(Task.title).ilike(f"%{search}%")
+                    task_search_vector.op("@@")(ts_query)
                 )
             if tasks_type == TasksTypeEnum.public:
                 base_query = base_query.where(col(Task.is_public) == True)  # noqa: E712
@@ -230,59 +292,91 @@ class TaskAccessor(BaseAccessor):
                 )
 
             if tag_ids:
-                tag_subquery = (
-                    select(TaskTagLink.task_id)
-                    .where(col(TaskTagLink.tag_id).in_(tag_ids))
-                    .group_by(col(TaskTagLink.task_id))
-                    .having(func.count(col(TaskTagLink.tag_id)) == len(tag_ids))
+                base_query = base_query.where(
+                    task_tag_ids.contains(sorted(set(tag_ids)))
                 )
-                base_query = base_query.where(col(Task.id).in_(tag_subquery))
 
             sort_column: Any
+            cursor_type: type
             if sort_by == SortByEnum.difficulty:
-                sort_column = sql_case(
-                    (col(Task.difficulty) == DifficultyEnum.easy, 1),
-                    (col(Task.difficulty) == DifficultyEnum.medium, 2),
-                    (col(Task.difficulty) == DifficultyEnum.hard, 3),
-                )
+                sort_column = Task.difficulty_rank_column()
+                cursor_type = int
             elif sort_by == SortByEnum.acceptance:
                 sort_column = Task.acceptance_column()
+                cursor_type = Decimal
+            elif sort_by == SortByEnum.relevance and ts_query is not None:
+                sort_column = func.ts_rank(task_search_vector, ts_query)
+                cursor_type = float
             else:
-                sort_column = Task.id
-
-            if sort_order == SortOrderEnum.desc:
-                sort_column = sort_column.desc()
-            else:
-                sort_column = sort_column.asc()
-
-            base_query = base_query.order_by(sort_column)
-
-            count_query = select(func.count(base_query.subquery().c.id))
-            count_result = await self.session.execute(count_query)
-            count = count_result.scalar_one()
-
-            tasks_query = base_query.offset(skip).limit(limit)
-            tasks_result = await self.session.execute(tasks_query)
-            tasks_with_status = tasks_result.all()
+                sort_column = col(Task.id)
+                cursor_type = int
+
+            # id добавлен вторым ключом: без него порядок равных значений
+            # не определён и курсор мог бы терять или повторять строки
+            sort_key = [sort_column, col(Task.id)]
+            descending = sort_order == SortOrderEnum.desc
+            base_query = base_query.add_columns(
+                sort_column.label("sort_value")
+            ).order_by(
+                *(
+                    column.desc() if descending else column.asc()
+                    for column in sort_key
+                )
+            )
 
-            tasks_list: list[TaskWithAttemptStatus] = []
-            for row in tasks_with_status:
-                if user_id is not None:
-                    task, user_attempt_status = row
-                    new_task = TaskWithAttemptStatus(
-                        **task.model_dump(),
-                        user_attempt_status=user_attempt_status,
+            count = None
+            if with_count:
+                count = (
+                    await self.session.execute(
+                        select(func.count(base_query.subquery().c.id))
                     )
-                else:
-                    task = row[0]
-                    new_task = TaskWithAttemptStatus(**task.model_dump())
-                tasks_list.append(new_task)
+                ).scalar_one()
+
+            after = None
+            if cursor is not None:
+                # в курсоре лежит и сортировка: курсор от другой сортировки
+                # указывал бы на случайное место списка
+                sort_name, order_name, *after = decode_cursor(
+                    cursor, str, str, cursor_type, int
+                )
+                if (sort_name, order_name) != (sort_by, sort_order):
+                    raise InvalidCursorException
+
+            tasks_result = await self.session.execute(
+                page_query(
+                    base_query,
+                    sort_key=sort_key,
+                    after=tuple(after) if after is not None else None,
+                    skip=skip,
+                    limit=limit,
+                    descending=descending,
+                )
+            )
+            tasks_with_status, next_cursor = split_page(
+                tasks_result.all(),
+                limit,
+                lambda last: (
+                    sort_by.value,
+                    sort_order.value,
+                    last.sort_value,
+                    last.id,
+                ),
+            )
 
+            tasks_list = [
+                TaskPublicForList.model_validate(row._mapping)
+                for row in tasks_with_status
+            ]
+
+        except InvalidCursorException:
+            raise
         except Exception as e:
             log(e)
             raise InternalException from e
         else:
-            return TasksDict(tasks=tasks_list, count=count)
+            return TasksDict(
+                tasks=tasks_list, count=count, next_cursor=next_cursor
+            )
 
     async def create_task(self, *, task_create: TaskCreate) -> Task:
         try:
@@ -317,6 +411,14 @@ class TaskAccessor(BaseAccessor):
 
             update_data = task_update.model_dump(exclude_unset=True)
 
+            difficulty = update_data.get("difficulty")
+            if difficulty is not None and difficulty != task.difficulty:
+                await self._shift_solver_scores(
+                    task_id,
+                    total_score=DIFFICULTY_SCORES[difficulty]
+                    - DIFFICULTY_SCORES[task.difficulty],
+                )
+
             for field, value in update_data.items():
                 setattr(task, field, value)
 
@@ -340,6 +442,12 @@ class TaskAccessor(BaseAccessor):
             if not task:
                 raise TaskNotFoundException
 
+            # user_task_status удалится каскадом, очки решивших снимаем сами
+            await self._shift_solver_scores(
+                task_id,
+                total_score=-DIFFICULTY_SCORES[task.difficulty],
+                solved_tasks_count=-1,
+            )
             await self.session.delete(task)
             await self.commit()
 
@@ -351,6 +459,28 @@ class TaskAccessor(BaseAccessor):
             log(e)
             raise InternalException from e
 
+    async def _shift_solver_scores(
+        self,
+        task_id: int,
+        *,
+        total_score: int = 0,
+        solved_tasks_count: int = 0,
+    ) -> None:
+        """Сдвигает очки рейтинга всех, кто решил задачу."""
+        solvers = select(UserTaskStatus.user_id).where(
+            col(UserTaskStatus.task_id) == task_id,
+            col(UserTaskStatus.solved_count) > 0,
+        )
+        await self.session.execute(
+            update(UserScore)
+            .where(col(UserScore.user_id).in_(solvers))
+            .values(
+                total_score=UserScore.total_score + total_score,
+                solved_tasks_count=UserScore.solved_tasks_count
+                + solved_tasks_count,
+            )
+        )
+
     async def get_tag_by_id(self, *, tag_id: int) -> Tag | None:
         try:
             result = await self.session.get(Tag, tag_id)
@@ -362,22 +492,43 @@ class TaskAccessor(BaseAccessor):
             return result
 
     async def get_tags_with_count(
-        self, *, skip: int = 0, limit: int = 100
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        with_count: bool = True,
     ) -> TagsDict:
         try:
-            count_query = select(func.count()).select_from(Tag)
-            count_result = await self.session.execute(count_query)
-            count = count_result.scalar_one()
-
-            query = select(Tag).offset(skip).limit(limit)
-            tags_result = await self.session.execute(query)
-            tags = list(tags_result.scalars().all())
+            count = None
+            if with_count:
+                count_query = select(func.count()).select_from(Tag)
+                count_result = await self.session.execute(count_query)
+                count = count_result.scalar_one()
+
+            sort_key = [col(Tag.id)]
+            tags_result = await self.session.execute(
+                page_query(
+                    select(Tag).order_by(*sort_key),
+                    sort_key=sort_key,
+                    after=decode_cursor(cursor, int)
+                    if cursor is not None
+                    else None,
+                    skip=skip,
+                    limit=limit,
+                )
+            )
+            tags, next_cursor = split_page(
+                tags_result.scalars().all(), limit, lambda tag: (tag.id,)
+            )
 
+        except InvalidCursorException:
+            raise
         except Exception as e:
             log(e)
             raise InternalException from e
         else:
-            return {"tags": tags, "count": count}
+            return {"tags": tags, "count": count, "next_cursor": next_cursor}
 
     async def create_tag(self, *, tag_create: TagCreate) -> Tag:
         try:
@@ -436,6 +587,7 @@ class TaskAccessor(BaseAccessor):
                 raise TagNotFoundException
 
             await self.session.delete(tag)
+            await self._remove_tag_ids(tag_id)
             await self.commit()
 
         except TagNotFoundException as e:
@@ -466,6 +618,11 @@ class TaskAccessor(BaseAccessor):
 
             link = TaskTagLink(task_id=task_id, tag_id=tag_id)
             self.session.add(link)
+            await self.session.execute(
+                update(Task)
+                .where(col(Task.id) == task_id)
+                .values({task_tag_ids: func.array_append(task_tag_ids, tag_id)})
+            )
             await self.commit()
 
         except TaskNotFoundException as e:
@@ -498,6 +655,7 @@ class TaskAccessor(BaseAccessor):
                 raise TastTagRelationshipNotExistsExceptionException
 
             await self.session.delete(link_obj)
+            await self._remove_tag_ids(tag_id, task_id=task_id)
             await self.commit()
 
         except TastTagRelationshipNotExistsExceptionException as e:
@@ -527,3 +685,18 @@ class TaskAccessor(BaseAccessor):
             raise InternalException from e
         else:
             return tags
+
+    async def _remove_tag_ids(
+        self, tag_id: int, *, task_id: int | None = None
+    ) -> None:
+        """Убирает тег из tag_ids задачи или, без task_id, у всех задач"""
+        condition = (
+            col(Task.id) == task_id
+            if task_id is not None
+            else task_tag_ids.contains([tag_id])
+        )
+        await self.session.execute(
+            update(Task)
+            .where(condition)
+            .values({task_tag_ids: func.array_remove(task_tag_ids, tag_id)})
+        )
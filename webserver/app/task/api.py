@@ -1,15 +1,30 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 
+from app.attempt.models import (
+    AttemptMetricEnum,
+    MetricQuantiles,
+    ProgrammingLanguageEnum,
+    TaskPercentiles,
+)
+from app.attempt.sketch import quantile
 from app.auth.deps import (
     CurrentUser,
     OptionalCurrentUser,
     get_current_active_superuser,
 )
 from app.auth.models import Message
+from app.core.etag import (
+    PRIVATE_REVALIDATE,
+    PUBLIC_REVALIDATE,
+    conditional_response,
+    make_etag,
+)
+from app.core.pagination import with_count_default
 from app.store import StoreDep
 
+from .cache import CatalogCacheDep
 from .exceptions import (
     TagNotFoundException,
     TaskAccessDeniedException,
@@ -25,6 +40,7 @@ from .models import (
     TaskFilters,
     TaskPublic,
     TasksPublic,
+    TaskStatusEnum,
     TaskUpdate,
 )
 
@@ -38,12 +54,40 @@ async def get_tasks(
     store: StoreDep,
     optional_user: OptionalCurrentUser,
     filters: Annotated[TaskFilters, Query()],
+    cache: CatalogCacheDep,
+) -> Any:
+    tasks_data = await cache.get_tasks(
+        store,
+        filters={
+            **filters.model_dump(
+                mode="python", exclude_none=True, exclude={"with_count"}
+            ),
+            "with_count": with_count_default(
+                filters.with_count, filters.cursor
+            ),
+        },
+        user_id=optional_user.id if optional_user else None,
+    )
+    return TasksPublic(
+        data=tasks_data["tasks"],  # type: ignore[reportArgumentType]
+        count=tasks_data["count"],
+        next_cursor=tasks_data["next_cursor"],
+    )
+
+
+@tasks_router.get("/suggest", response_model=list[str])
+async def suggest_tasks(
+    store: StoreDep,
+    optional_user: OptionalCurrentUser,
+    prefix: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(10, ge=1, le=50),
 ) -> Any:
-    tasks_data = await store.task.get_tasks_with_filters(
+    """Названия задач по префиксу для автодополнения строки поиска"""
+    return await store.task.suggest_task_titles(
+        prefix=prefix,
         user_id=optional_user.id if optional_user else None,
-        **filters.model_dump(mode="python", exclude_none=True),
+        limit=limit,
     )
-    return TasksPublic(data=tasks_data["tasks"], count=tasks_data["count"])  # type: ignore[reportArgumentType]
 
 
 @tasks_router.post(
@@ -51,11 +95,16 @@ async def get_tasks(
     response_model=Task,
 )
 async def create_task(
-    store: StoreDep, current_user: CurrentUser, task_in: TaskCreate
+    store: StoreDep,
+    cache: CatalogCacheDep,
+    current_user: CurrentUser,
+    task_in: TaskCreate,
 ) -> Any:
     if task_in.user_id is None:
         task_in.user_id = current_user.id
-    return await store.task.create_task(task_create=task_in)
+    task = await store.task.create_task(task_create=task_in)
+    await cache.invalidate()
+    return task
 
 
 @tasks_router.get(
@@ -63,25 +112,99 @@ async def create_task(
     response_model=TaskPublic,
 )
 async def get_task(
+    request: Request,
+    response: Response,
     store: StoreDep,
     task_id: int,
     optional_user: OptionalCurrentUser,
 ) -> Any:
     user_id = optional_user.id if optional_user else None
+    # версию проверяем по лёгкой строке: при совпадении ETag ни тесты,
+    # ни условие задачи не читаются и не сериализуются
+    info = await store.task.get_task_access_info(task_id=task_id)
+    if not info:
+        raise TaskNotFoundException
+    if not (
+        info.is_public
+        or (
+            optional_user
+            and (optional_user.is_superuser or optional_user.id == info.user_id)
+        )
+    ):
+        raise TaskAccessDeniedException
+
+    user_attempt_status = TaskStatusEnum.todo
+    if user_id is not None:
+        statuses = await store.task.get_user_task_statuses(
+            user_id=user_id, task_ids=[task_id]
+        )
+        user_attempt_status = statuses.get(task_id, TaskStatusEnum.todo)
+
+    etag = make_etag(
+        "task",
+        info.id,
+        info.updated_at.isoformat(),
+        info.correct_attempts,
+        info.total_attempts,
+        user_attempt_status,
+    )
+    if not_modified := conditional_response(
+        request, response, etag, PRIVATE_REVALIDATE
+    ):
+        return not_modified
+
     task = await store.task.get_task_by_id_with_status(
         task_id=task_id, user_id=user_id
     )
     if not task:
         raise TaskNotFoundException
+    return task
+
+
+@tasks_router.get("/{task_id}/percentiles", response_model=TaskPercentiles)
+async def get_task_percentiles(
+    store: StoreDep,
+    task_id: int,
+    optional_user: OptionalCurrentUser,
+    programming_language: ProgrammingLanguageEnum | None = None,
+) -> Any:
+    """Квантили времени и памяти принятых попыток задачи."""
+    info = await store.task.get_task_access_info(task_id=task_id)
+    if not info:
+        raise TaskNotFoundException
     if not (
-        task.is_public
+        info.is_public
         or (
             optional_user
-            and (optional_user.is_superuser or optional_user.id == task.user_id)
+            and (optional_user.is_superuser or optional_user.id == info.user_id)
         )
     ):
         raise TaskAccessDeniedException
-    return task
+
+    histograms = await store.attempt.get_histograms(
+        task_id=task_id, programming_language=programming_language
+    )
+    return TaskPercentiles(
+        task_id=task_id,
+        programming_language=programming_language,
+        accepted_attempts=sum(
+            histograms[AttemptMetricEnum.time_used_ms].values()
+        ),
+        **{
+            metric.value: _metric_quantiles(histogram)
+            for metric, histogram in histograms.items()
+        },
+    )
+
+
+def _metric_quantiles(histogram: dict[int, int]) -> MetricQuantiles | None:
+    p50, p75, p90, p99 = (
+        quantile(histogram, q) for q in (0.5, 0.75, 0.9, 0.99)
+    )
+    # у пустой гистограммы квантилей нет
+    if p50 is None or p75 is None or p90 is None or p99 is None:
+        return None
+    return MetricQuantiles(p50=p50, p75=p75, p90=p90, p99=p99)
 
 
 @tasks_router.patch(
@@ -93,26 +216,33 @@ async def update_task(
     task_id: int,
     task_in: TaskUpdate,
     current_user: CurrentUser,
+    cache: CatalogCacheDep,
 ) -> Any:
-    task = await store.task.get_task_by_id(task_id=task_id)
+    task = await store.task.get_task_access_info(task_id=task_id)
     if not task:
         raise TaskNotFoundException
     if not (current_user.is_superuser or task.user_id == current_user.id):
         raise TaskAccessDeniedException
-    return await store.task.update_task(task_id=task_id, task_update=task_in)
+    updated = await store.task.update_task(task_id=task_id, task_update=task_in)
+    await cache.invalidate()
+    return updated
 
 
 @tasks_router.delete("/{task_id}")
 async def delete_task(
-    store: StoreDep, task_id: int, current_user: CurrentUser
+    store: StoreDep,
+    cache: CatalogCacheDep,
+    task_id: int,
+    current_user: CurrentUser,
 ) -> Message:
-    task = await store.task.get_task_by_id(task_id=task_id)
+    task = await store.task.get_task_access_info(task_id=task_id)
     if not task:
         raise TaskNotFoundException
     if not (current_user.is_superuser or task.user_id == current_user.id):
         raise TaskAccessDeniedException
 
     await store.task.delete_task(task_id=task_id)
+    await cache.invalidate()
     return Message(message="Задача успешно удалена")
 
 
@@ -128,9 +258,10 @@ async def get_task_tags(store: StoreDep, task_id: int) -> Any:
     "/{task_id}/tags/{tag_id}",
 )
 async def add_tag_to_task(
-    store: StoreDep, task_id: int, tag_id: int
+    store: StoreDep, cache: CatalogCacheDep, task_id: int, tag_id: int
 ) -> Message:
     await store.task.add_tag_to_task(task_id=task_id, tag_id=tag_id)
+    await cache.invalidate()
     return Message(message="Тег успешно добавлен к задаче")
 
 
@@ -138,9 +269,10 @@ async def add_tag_to_task(
     "/{task_id}/tags/{tag_id}",
 )
 async def remove_tag_from_task(
-    store: StoreDep, task_id: int, tag_id: int
+    store: StoreDep, cache: CatalogCacheDep, task_id: int, tag_id: int
 ) -> Message:
     await store.task.remove_tag_from_task(task_id=task_id, tag_id=tag_id)
+    await cache.invalidate()
     return Message(message="Тег успешно удален из задачи")
 
 
@@ -149,13 +281,39 @@ async def remove_tag_from_task(
     response_model=TagsPublic,
 )
 async def get_tags(
+    request: Request,
+    response: Response,
     store: StoreDep,
+    cache: CatalogCacheDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    with_count: bool | None = None,
 ) -> Any:
-    tags_data = await store.task.get_tags_with_count(skip=skip, limit=limit)
+    tags_data = await cache.get_tags(
+        store,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        with_count=with_count_default(with_count, cursor),
+    )
 
-    return TagsPublic(data=tags_data["tags"], count=tags_data["count"])  # pyright: ignore[reportArgumentType]
+    etag = make_etag(
+        "tags",
+        *((tag.id, tag.name) for tag in tags_data["tags"]),
+        tags_data["count"],
+        tags_data["next_cursor"],
+    )
+    if not_modified := conditional_response(
+        request, response, etag, PUBLIC_REVALIDATE
+    ):
+        return not_modified
+
+    return TagsPublic(
+        data=tags_data["tags"],  # pyright: ignore[reportArgumentType]
+        count=tags_data["count"],
+        next_cursor=tags_data["next_cursor"],
+    )
 
 
 @tags_router.post(
@@ -163,18 +321,28 @@ async def get_tags(
     dependencies=[Depends(get_current_active_superuser)],
     response_model=Tag,
 )
-async def create_tag(store: StoreDep, tag_in: TagCreate) -> Any:
-    return await store.task.create_tag(tag_create=tag_in)
+async def create_tag(
+    store: StoreDep, cache: CatalogCacheDep, tag_in: TagCreate
+) -> Any:
+    tag = await store.task.create_tag(tag_create=tag_in)
+    await cache.invalidate()
+    return tag
 
 
 @tags_router.get(
     "/{tag_id}",
     response_model=Tag,
 )
-async def get_tag(store: StoreDep, tag_id: int) -> Any:
+async def get_tag(
+    request: Request, response: Response, store: StoreDep, tag_id: int
+) -> Any:
     tag = await store.task.get_tag_by_id(tag_id=tag_id)
     if not tag:
         raise TagNotFoundException
+    if not_modified := conditional_response(
+        request, response, make_etag("tag", tag.id, tag.name), PUBLIC_REVALIDATE
+    ):
+        return not_modified
     return tag
 
 
@@ -185,18 +353,23 @@ async def get_tag(store: StoreDep, tag_id: int) -> Any:
 )
 async def update_tag(
     store: StoreDep,
+    cache: CatalogCacheDep,
     tag_id: int,
     tag_in: TagUpdate,
 ) -> Any:
     tag = await store.task.update_tag(tag_id=tag_id, tag_update=tag_in)
     if not tag:
         raise TagNotFoundException
+    await cache.invalidate()
     return tag
 
 
 @tags_router.delete(
     "/{tag_id}", dependencies=[Depends(get_current_active_superuser)]
 )
-async def delete_tag(store: StoreDep, tag_id: int) -> Message:
+async def delete_tag(
+    store: StoreDep, cache: CatalogCacheDep, tag_id: int
+) -> Message:
     await store.task.delete_tag(tag_id=tag_id)
+    await cache.invalidate()
     return Message(message="Тег успешно удален")
@@ -0,0 +1,127 @@
+import json
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logger import create_log
+from app.core.rabbitmq_client import rabbitmq_client
+from app.store import Store
+
+from .accessor import TagsDict, TasksDict
+from .models import TaskStatusEnum, TasksTypeEnum
+
+log = create_log(__name__)
+
+# уведомление остальным процессам, что каталог изменился
+CATALOG_EVENT = "catalog_changed"
+
+
+class CatalogCache:
+    """Кэш списков задач и тегов перед ``TaskAccessor``.
+
+    Каталог меняется несколько раз в день, а читается постоянно, поэтому
+    страницы хранятся в памяти процесса по нормализованным фильтрам.
+    Общая страница не зависит от пользователя: его статусы по задачам
+    страницы накладываются поверх неё отдельным запросом по первичному
+    ключу ``user_task_status``. Запросы, которые зависят от пользователя
+    целиком (личные задачи, фильтр по статусу), идут мимо кэша.
+
+    Изменение задачи или тега очищает кэш этого процесса и через
+    fanout-exchange уведомлений — остальных процессов. Счётчики попыток
+    (acceptance) кэш не отслеживает: они устаревают не больше чем на
+    время жизни записи.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: TTLCache[str] = TTLCache(
+            ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+            max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+        )
+        self.tags: TTLCache[str] = TTLCache(
+            ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+            max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+        )
+
+    async def get_tasks(
+        self,
+        store: Store,
+        *,
+        filters: dict[str, Any],
+        user_id: UUID | None = None,
+    ) -> TasksDict:
+        if filters.get("statuses") or filters.get("tasks_type") not in (
+            None,
+            TasksTypeEnum.public,
+        ):
+            return await store.task.get_tasks_with_filters(
+                user_id=user_id, **filters
+            )
+
+        page: TasksDict = await self.tasks.get_or_load(
+            _cache_key(filters),
+            lambda: store.task.get_tasks_with_filters(**filters),
+        )
+        if user_id is None:
+            return page
+
+        statuses = await store.task.get_user_task_statuses(
+            user_id=user_id, task_ids=[task.id for task in page["tasks"]]
+        )
+        # закэшированные объекты общие для всех запросов, их не меняем
+        return TasksDict(
+            tasks=[
+                task.model_copy(
+                    update={
+                        "user_attempt_status": statuses.get(
+                            task.id, TaskStatusEnum.todo
+                        )
+                    }
+                )
+                for task in page["tasks"]
+            ],
+            count=page["count"],
+            next_cursor=page["next_cursor"],
+        )
+
+    async def get_tags(self, store: Store, **params: Any) -> TagsDict:
+        return await self.tags.get_or_load(
+            _cache_key(params),
+            lambda: store.task.get_tags_with_count(**params),
+        )
+
+    def clear(self) -> None:
+        self.tasks.clear()
+        self.tags.clear()
+
+    async def invalidate(self) -> None:
+        self.clear()
+        try:
+            await rabbitmq_client.publish_notification({"event": CATALOG_EVENT})
+        except Exception as e:
+            # остальные процессы увидят изменения по истечении TTL
+            log(e, level="error")
+
+    def handle_notification(self, _payload: dict[str, Any]) -> None:
+        self.clear()
+
+
+def _cache_key(params: dict[str, Any]) -> str:
+    normalized = {
+        name: sorted(set(value)) if isinstance(value, list) else value
+        for name, value in params.items()
+        if value is not None
+    }
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+catalog_cache = CatalogCache()
+
+
+def get_catalog_cache() -> CatalogCache:
+    return catalog_cache
+
+
+CatalogCacheDep = Annotated[CatalogCache, Depends(get_catalog_cache)]
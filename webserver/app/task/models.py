@@ -1,5 +1,6 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from enum import StrEnum
+from typing import Any
 from uuid import UUID
 
 from pydantic import computed_field
@@ -7,12 +8,18 @@ from sqlalchemy import (
     JSON,
     Column,
     ColumnElement,
+    Computed,
     DateTime,
     Enum as SQLEnum,
-    case as sql_case,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    case,
     func,
     text,
 )
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlmodel import Field, ForeignKey, Relationship, SQLModel, col
 
 
@@ -27,6 +34,14 @@ class DifficultyEnum(StrEnum):
     hard = "hard"
 
 
+# Очки рейтинга за первое решение задачи каждой сложности.
+DIFFICULTY_SCORES: dict[DifficultyEnum, int] = {
+    DifficultyEnum.easy: 3,
+    DifficultyEnum.medium: 5,
+    DifficultyEnum.hard: 10,
+}
+
+
 class TaskStatusEnum(StrEnum):
     todo = "todo"
     attempted = "attempted"
@@ -37,6 +52,7 @@ class SortByEnum(StrEnum):
     id = "id"
     difficulty = "difficulty"
     acceptance = "acceptance"
+    relevance = "relevance"
 
 
 class SortOrderEnum(StrEnum):
@@ -104,14 +120,21 @@ class Task(TaskBase, table=True):
 
     @classmethod
     def acceptance_column(cls) -> ColumnElement:
-        return sql_case(
-            (
-                col(cls.total_attempts) > 0,
-                col(cls.correct_attempts)
-                / func.nullif(col(cls.total_attempts), 0),
+        return task_acceptance_rate.label("acceptance")
+
+    @classmethod
+    def difficulty_rank_column(cls) -> ColumnElement:
+        return task_difficulty_rank
+
+    @classmethod
+    def score_column(cls) -> ColumnElement:
+        return case(
+            *(
+                (col(cls.difficulty) == difficulty, score)
+                for difficulty, score in DIFFICULTY_SCORES.items()
             ),
-            else_=0.0,
-        ).label("acceptance")
+            else_=0,
+        )
 
     created_at: datetime = Field(
         sa_column=Column(
@@ -125,7 +148,7 @@ class Task(TaskBase, table=True):
             DateTime(timezone=True),
             server_default=text("CURRENT_TIMESTAMP"),
             nullable=False,
-            onupdate=datetime.now(timezone.utc),  # noqa: UP017
+            onupdate=func.now(),
         )
     )
 
@@ -134,6 +157,104 @@ class Task(TaskBase, table=True):
     )
 
 
+TASK_SEARCH_CONFIG = "simple"
+
+# Поисковый вектор хранится в таблице, но не входит в модель: он нужен
+# только в WHERE/ORDER BY и не должен читаться вместе с задачей.
+# Конфигурация simple не стеммит слова, поэтому одинаково ведёт себя
+# на русских и английских названиях, а префиксный поиск идёт через ':*'.
+task_search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        f"setweight(to_tsvector('{TASK_SEARCH_CONFIG}', title), 'A') || "
+        f"setweight(to_tsvector('{TASK_SEARCH_CONFIG}', description), 'B')",
+        persisted=True,
+    ),
+)
+Task.__table__.append_column(task_search_vector)  # type: ignore[attr-defined]
+Index("ix_task_search_vector", task_search_vector, postgresql_using="gin")
+Index(
+    "ix_task_title_prefix",
+    func.lower(Task.__table__.c.title).label("title_lower"),  # type: ignore[attr-defined]
+    postgresql_ops={"title_lower": "text_pattern_ops"},
+)
+
+# Ключи сортировки каталога хранятся генерируемыми колонками: Postgres
+# пересчитывает их при каждом изменении счётчиков, а индекс (ключ, id)
+# отдаёт первую страницу отсортированного списка без сортировки всей выборки.
+task_difficulty_rank = Column(
+    "difficulty_rank",
+    Integer,
+    Computed(
+        "CASE difficulty WHEN 'easy' THEN 1 WHEN 'medium' THEN 2 "
+        "WHEN 'hard' THEN 3 END",
+        persisted=True,
+    ),
+)
+task_acceptance_rate = Column(
+    "acceptance_rate",
+    Numeric,
+    Computed(
+        "CASE WHEN total_attempts > 0 "
+        "THEN correct_attempts::numeric / total_attempts ELSE 0 END",
+        persisted=True,
+    ),
+)
+# Копия связей с тегами: пересечение тегов проверяется одним
+# tag_ids @> ARRAY[...] по GIN-индексу вместо GROUP BY по TaskTagLink.
+# Ведётся вместе со связями в TaskAccessor.
+task_tag_ids: ColumnElement[list[int]] = Column(
+    "tag_ids",
+    ARRAY(Integer),
+    server_default=text("'{}'"),
+    nullable=False,
+)
+for _column in (task_difficulty_rank, task_acceptance_rate, task_tag_ids):
+    Task.__table__.append_column(_column)  # type: ignore[attr-defined]
+Index("ix_task_difficulty_rank_id", task_difficulty_rank, Task.__table__.c.id)  # type: ignore[attr-defined]
+Index("ix_task_acceptance_rate_id", task_acceptance_rate, Task.__table__.c.id)  # type: ignore[attr-defined]
+Index("ix_task_tag_ids", task_tag_ids, postgresql_using="gin")
+
+
+class UserTaskStatus(SQLModel, table=True):
+    """Сводка попыток пользователя по задаче, ведётся вместе с попытками.
+
+    Строка есть только у задач, которые пользователь пробовал решать;
+    её отсутствие означает статус ``todo``.
+    """
+
+    __tablename__ = "user_task_status"
+
+    user_id: UUID = Field(
+        sa_column=Column(
+            ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+        )
+    )
+    task_id: int = Field(
+        sa_column=Column(
+            ForeignKey("task.id", ondelete="CASCADE"),
+            primary_key=True,
+            index=True,
+        )
+    )
+    attempts_count: int = Field(default=0)
+    solved_count: int = Field(default=0)
+    first_solved_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    status: TaskStatusEnum = Field(
+        sa_column=Column(
+            String,
+            Computed(
+                "CASE WHEN solved_count > 0 THEN 'solved' ELSE 'attempted' END",
+                persisted=True,
+            ),
+            nullable=False,
+        )
+    )
+
+
 class TaskWithAttemptStatus(TaskBase):
     id: int
     correct_attempts: int
@@ -162,10 +283,42 @@ class TaskPublicForList(SQLModel):
     created_at: datetime
     updated_at: datetime
 
+    @classmethod
+    def columns(cls) -> list[Any]:
+        """Колонки ``Task``, из которых собирается элемент списка.
+
+        ``user_attempt_status`` добавляет запрос, если известен пользователь.
+        """
+        return [
+            col(Task.id),
+            col(Task.title),
+            col(Task.difficulty),
+            Task.acceptance_column(),
+            col(Task.is_public),
+            col(Task.created_at),
+            col(Task.updated_at),
+        ]
+
+
+class TaskAccessInfo(SQLModel):
+    id: int
+    user_id: UUID
+    is_public: bool
+
+    # версия задачи для ETag
+    updated_at: datetime
+    correct_attempts: int
+    total_attempts: int
+
+    @classmethod
+    def columns(cls) -> list[Any]:
+        return [getattr(Task, name) for name in cls.model_fields]
+
 
 class TasksPublic(SQLModel):
     data: list[TaskPublicForList]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 class TagBase(SQLModel):
@@ -194,7 +347,8 @@ class TagPublic(TagBase):
 
 class TagsPublic(SQLModel):
     data: list[TagPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 class TaskFilters(SQLModel):
@@ -207,3 +361,6 @@ class TaskFilters(SQLModel):
     sort_order: SortOrderEnum = SortOrderEnum.asc
     skip: int = Field(default=0, ge=0)
     limit: int = Field(default=100, ge=1, le=1000)
+    cursor: str | None = None
+    # по умолчанию общее число считается только для первой страницы
+    with_count: bool | None = None
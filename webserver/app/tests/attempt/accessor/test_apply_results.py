@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+)
+from app.core.exceptions import InternalException
+
+
+async def _create_attempts(store, user, task, count):
+    attempt_create = AttemptCreate(
+        user_id=user.id,
+        task_id=task.id,
+        programming_language=ProgrammingLanguageEnum.PYTHON,
+        source_code="print('hi')",
+    )
+    return [
+        await store.attempt.create_attempt(attempt_create=attempt_create)
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_success(store, user, raw_task):
+    first, second, third = await _create_attempts(store, user, raw_task, 3)
+
+    attempts = await store.attempt.apply_results(
+        updates={
+            first.id: AttemptUpdate(
+                status=AttemptStatusEnum.WRONG_ANSWER,
+                time_used_ms=15,
+                failed_test_number=2,
+            ),
+            second.id: AttemptUpdate(status=AttemptStatusEnum.OK),
+            third.id: AttemptUpdate(status=AttemptStatusEnum.OK),
+        }
+    )
+
+    by_id = {a.id: a for a in attempts}
+    assert by_id[first.id].status == AttemptStatusEnum.WRONG_ANSWER
+    assert by_id[first.id].time_used_ms == 15
+    assert by_id[first.id].failed_test_number == 2
+    assert by_id[second.id].status == AttemptStatusEnum.OK
+
+    task = await store.task.get_task_by_id(task_id=raw_task.id)
+    await store.session.refresh(task)
+    # два зачтённых решения одного пользователя — одно решение задачи
+    assert task.correct_attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_already_solved(store, user, raw_task):
+    first, second = await _create_attempts(store, user, raw_task, 2)
+    await store.attempt.apply_results(
+        updates={first.id: AttemptUpdate(status=AttemptStatusEnum.OK)}
+    )
+
+    await store.attempt.apply_results(
+        updates={second.id: AttemptUpdate(status=AttemptStatusEnum.OK)}
+    )
+
+    task = await store.task.get_task_by_id(task_id=raw_task.id)
+    await store.session.refresh(task)
+    assert task.correct_attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_skips_missing(store, attempt):
+    attempts = await store.attempt.apply_results(
+        updates={
+            attempt.id: AttemptUpdate(status=AttemptStatusEnum.RUNTIME_ERROR),
+            attempt.id + 1000: AttemptUpdate(status=AttemptStatusEnum.OK),
+        }
+    )
+    assert [a.id for a in attempts] == [attempt.id]
+    assert attempts[0].status == AttemptStatusEnum.RUNTIME_ERROR
+
+
+@pytest.mark.asyncio
+async def test_internal_error(store):
+    with patch.object(
+        store.attempt.session,
+        "execute",
+        side_effect=Exception("Database connection error"),
+    ):
+        with pytest.raises(InternalException):
+            await store.attempt.apply_results(
+                updates={1: AttemptUpdate(status=AttemptStatusEnum.OK)}
+            )
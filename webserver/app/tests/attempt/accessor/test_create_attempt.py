@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptStatusEnum,
+    ProgrammingLanguageEnum,
+)
+from app.store import Store
+
+
+@pytest.mark.asyncio
+async def test_success(store, user, raw_task):
+    attempt = await store.attempt.create_attempt(
+        attempt_create=AttemptCreate(
+            user_id=user.id,
+            task_id=raw_task.id,
+            programming_language=ProgrammingLanguageEnum.PYTHON,
+            source_code="print('hi')",
+        )
+    )
+
+    assert attempt.id is not None
+    assert attempt.status == AttemptStatusEnum.RUNNING
+    assert attempt.created_at is not None
+
+    task = await store.task.get_task_by_id(task_id=raw_task.id)
+    await store.session.refresh(task)
+    assert task.total_attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_counter(store, pg_sessionmaker, user, raw_task):
+    attempts_count = 20
+
+    async def submit():
+        async with pg_sessionmaker() as session:
+            await Store(session).attempt.create_attempt(
+                attempt_create=AttemptCreate(
+                    user_id=user.id,
+                    task_id=raw_task.id,
+                    programming_language=ProgrammingLanguageEnum.PYTHON,
+                    source_code="print('hi')",
+                )
+            )
+
+    await asyncio.gather(*(submit() for _ in range(attempts_count)))
+
+    task = await store.task.get_task_by_id(task_id=raw_task.id)
+    await store.session.refresh(task)
+    assert task.total_attempts == attempts_count
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.exceptions import InternalException, InvalidCursorException
+
+
+@pytest.mark.asyncio
+async def test_newest_first(store, user, one_task_many_attempts):
+    result = await store.attempt.get_attempts(user_id=user.id)
+
+    assert result["count"] == len(one_task_many_attempts)
+    assert [a.id for a in result["attempts"]] == sorted(
+        (a.id for a in one_task_many_attempts), reverse=True
+    )
+    assert result["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_walk(store, user, one_task_many_attempts):
+    ids: list[int] = []
+    cursor = None
+    while True:
+        page = await store.attempt.get_attempts(
+            user_id=user.id, limit=1, cursor=cursor, with_count=False
+        )
+        assert page["count"] is None
+        ids.extend(a.id for a in page["attempts"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert ids == sorted((a.id for a in one_task_many_attempts), reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(store, user):
+    with pytest.raises(InvalidCursorException):
+        await store.attempt.get_attempts(user_id=user.id, cursor="garbage")
+
+
+@pytest.mark.asyncio
+async def test_internal_error(store):
+    with patch.object(
+        store.attempt.session,
+        "execute",
+        side_effect=Exception("Database connection error"),
+    ):
+        with pytest.raises(InternalException):
+            await store.attempt.get_attempts()
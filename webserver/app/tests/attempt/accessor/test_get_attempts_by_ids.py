@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.exceptions import InternalException
+
+
+@pytest.mark.asyncio
+async def test_success(store, one_task_many_attempts):
+    ids = [a.id for a in one_task_many_attempts[:2]]
+    attempts = await store.attempt.get_attempts_by_ids(attempt_ids=ids)
+    assert sorted(a.id for a in attempts) == sorted(ids)
+
+
+@pytest.mark.asyncio
+async def test_skips_missing(store, attempt):
+    attempts = await store.attempt.get_attempts_by_ids(
+        attempt_ids=[attempt.id, attempt.id + 1000]
+    )
+    assert [a.id for a in attempts] == [attempt.id]
+
+
+@pytest.mark.asyncio
+async def test_internal_error(store):
+    with patch.object(
+        store.attempt.session,
+        "execute",
+        side_effect=Exception("Database connection error"),
+    ):
+        with pytest.raises(InternalException):
+            await store.attempt.get_attempts_by_ids(attempt_ids=[1])
@@ -0,0 +1,65 @@
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptMetricEnum,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+)
+from app.attempt.sketch import bucket_of
+from app.store import Store
+
+
+async def _attempt(store: Store, user, task, language) -> int:
+    attempt = await store.attempt.create_attempt(
+        attempt_create=AttemptCreate(
+            user_id=user.id,
+            task_id=task.id,
+            programming_language=language,
+            source_code="print('hi')",
+        )
+    )
+    return attempt.id
+
+
+async def test_histograms_follow_verdicts(store: Store, user, raw_task):
+    fast = await _attempt(store, user, raw_task, ProgrammingLanguageEnum.PYTHON)
+    slow = await _attempt(store, user, raw_task, ProgrammingLanguageEnum.PYTHON)
+    wrong = await _attempt(store, user, raw_task, ProgrammingLanguageEnum.GO)
+    await store.attempt.apply_results(
+        updates={
+            fast: AttemptUpdate(
+                status=AttemptStatusEnum.OK,
+                time_used_ms=10,
+                memory_used_bytes=1000,
+            ),
+            slow: AttemptUpdate(
+                status=AttemptStatusEnum.OK,
+                time_used_ms=900,
+                memory_used_bytes=1000,
+            ),
+            wrong: AttemptUpdate(
+                status=AttemptStatusEnum.WRONG_ANSWER, time_used_ms=5
+            ),
+        }
+    )
+
+    histograms = await store.attempt.get_histograms(task_id=raw_task.id)
+    assert histograms[AttemptMetricEnum.time_used_ms] == {
+        bucket_of(10): 1,
+        bucket_of(900): 1,
+    }
+    assert histograms[AttemptMetricEnum.memory_used_bytes] == {
+        bucket_of(1000): 2
+    }
+    go = await store.attempt.get_histograms(
+        task_id=raw_task.id, programming_language=ProgrammingLanguageEnum.GO
+    )
+    assert go[AttemptMetricEnum.time_used_ms] == {}
+
+    # отозванный вердикт убирает замеры попытки
+    await store.attempt.update_attempt(
+        attempt_id=slow,
+        attempt_update=AttemptUpdate(status=AttemptStatusEnum.WRONG_ANSWER),
+    )
+    histograms = await store.attempt.get_histograms(task_id=raw_task.id)
+    assert histograms[AttemptMetricEnum.time_used_ms] == {bucket_of(10): 1}
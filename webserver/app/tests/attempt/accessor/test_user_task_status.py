@@ -0,0 +1,111 @@
+import pytest
+from sqlmodel import select
+
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+)
+from app.task.models import TaskStatusEnum, UserTaskStatus
+
+
+async def _status(store, user, task) -> UserTaskStatus | None:
+    result = await store.session.execute(
+        select(UserTaskStatus)
+        .where(
+            UserTaskStatus.user_id == user.id,
+            UserTaskStatus.task_id == task.id,
+        )
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _correct_attempts(store, task) -> int:
+    db_task = await store.task.get_task_by_id(task_id=task.id)
+    await store.session.refresh(db_task)
+    return db_task.correct_attempts
+
+
+@pytest.mark.asyncio
+async def test_lifecycle(store, user, raw_task):
+    attempt_create = AttemptCreate(
+        user_id=user.id,
+        task_id=raw_task.id,
+        programming_language=ProgrammingLanguageEnum.PYTHON,
+        source_code="print('hi')",
+    )
+    first = await store.attempt.create_attempt(attempt_create=attempt_create)
+    second = await store.attempt.create_attempt(attempt_create=attempt_create)
+
+    status = await _status(store, user, raw_task)
+    assert status.attempts_count == 2
+    assert status.status == TaskStatusEnum.attempted
+    assert status.first_solved_at is None
+
+    for attempt in (first, second):
+        await store.attempt.update_attempt(
+            attempt_id=attempt.id,
+            attempt_update=AttemptUpdate(status=AttemptStatusEnum.OK),
+        )
+
+    status = await _status(store, user, raw_task)
+    assert status.solved_count == 2
+    assert status.status == TaskStatusEnum.solved
+    assert status.first_solved_at is not None
+    assert await _correct_attempts(store, raw_task) == 1
+
+    await store.attempt.delete_attempt(attempt_id=first.id)
+    await store.attempt.update_attempt(
+        attempt_id=second.id,
+        attempt_update=AttemptUpdate(status=AttemptStatusEnum.WRONG_ANSWER),
+    )
+
+    status = await _status(store, user, raw_task)
+    assert status.attempts_count == 1
+    assert status.status == TaskStatusEnum.attempted
+    assert status.first_solved_at is None
+    assert await _correct_attempts(store, raw_task) == 0
+
+    await store.attempt.delete_attempt(attempt_id=second.id)
+
+    assert await _status(store, user, raw_task) is None
+    task = await store.task.get_task_by_id_with_status(
+        task_id=raw_task.id, user_id=user.id
+    )
+    assert task.user_attempt_status == TaskStatusEnum.todo
+
+
+@pytest.mark.asyncio
+async def test_first_solved_at_is_earliest_accepted_attempt(
+    store, user, raw_task
+):
+    attempt_create = AttemptCreate(
+        user_id=user.id,
+        task_id=raw_task.id,
+        programming_language=ProgrammingLanguageEnum.PYTHON,
+        source_code="print('hi')",
+    )
+    first = await store.attempt.create_attempt(attempt_create=attempt_create)
+    second = await store.attempt.create_attempt(attempt_create=attempt_create)
+
+    # вердикты приходят не по порядку отправки
+    await store.attempt.apply_results(
+        updates={second.id: AttemptUpdate(status=AttemptStatusEnum.OK)}
+    )
+    status = await _status(store, user, raw_task)
+    assert status.first_solved_at == second.created_at
+
+    await store.attempt.apply_results(
+        updates={first.id: AttemptUpdate(status=AttemptStatusEnum.OK)}
+    )
+    status = await _status(store, user, raw_task)
+    assert status.first_solved_at == first.created_at
+
+    await store.attempt.update_attempt(
+        attempt_id=first.id,
+        attempt_update=AttemptUpdate(status=AttemptStatusEnum.WRONG_ANSWER),
+    )
+    status = await _status(store, user, raw_task)
+    assert status.first_solved_at == second.created_at
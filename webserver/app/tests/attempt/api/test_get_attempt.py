@@ -0,0 +1,25 @@
+import pytest
+from fastapi import status
+
+
+@pytest.mark.asyncio
+async def test_running_not_cached(user_client, attempt):
+    response = await user_client.get(f"/attempts/{attempt.id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_finished_immutable(user_client, one_task_many_attempts):
+    finished = one_task_many_attempts[-1]
+    response = await user_client.get(f"/attempts/{finished.id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert "immutable" in response.headers["cache-control"]
+
+    cached = await user_client.get(
+        f"/attempts/{finished.id}",
+        headers={"If-None-Match": f"W/{response.headers['etag']}"},
+    )
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["etag"] == response.headers["etag"]
@@ -0,0 +1,41 @@
+import pytest
+from fastapi import status
+
+from app.attempt.models import AttemptForListPublic
+
+
+@pytest.mark.asyncio
+async def test_list_fields_only(user_client, one_task_many_attempts):
+    response = await user_client.get("/attempts")
+    assert response.status_code == status.HTTP_200_OK
+
+    body = response.json()
+    assert body["count"] == len(one_task_many_attempts)
+    assert body["next_cursor"] is None
+    for item in body["data"]:
+        assert set(item) == set(AttemptForListPublic.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_by_task_cursor(user_client, raw_task, one_task_many_attempts):
+    first = await user_client.get(
+        f"/attempts/task/{raw_task.id}", params={"limit": 2}
+    )
+    assert first.status_code == status.HTTP_200_OK
+    cursor = first.json()["next_cursor"]
+    assert cursor is not None
+
+    rest = await user_client.get(
+        f"/attempts/task/{raw_task.id}", params={"cursor": cursor}
+    )
+    assert rest.status_code == status.HTTP_200_OK
+    assert rest.json()["count"] is None
+
+    ids = [item["id"] for item in first.json()["data"] + rest.json()["data"]]
+    assert ids == sorted((a.id for a in one_task_many_attempts), reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(user_client):
+    response = await user_client.get("/attempts", params={"cursor": "%%%"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
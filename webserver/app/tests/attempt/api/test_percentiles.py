@@ -0,0 +1,66 @@
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+)
+from app.store import Store
+
+
+async def _ok_attempts(store: Store, user, task, times: list[int]) -> list[int]:
+    attempt_create = AttemptCreate(
+        user_id=user.id,
+        task_id=task.id,
+        programming_language=ProgrammingLanguageEnum.PYTHON,
+        source_code="print('hi')",
+    )
+    attempt_ids = [
+        (await store.attempt.create_attempt(attempt_create=attempt_create)).id
+        for _ in times
+    ]
+    await store.attempt.apply_results(
+        updates={
+            attempt_id: AttemptUpdate(
+                status=AttemptStatusEnum.OK,
+                time_used_ms=time_used_ms,
+                memory_used_bytes=2**20,
+            )
+            for attempt_id, time_used_ms in zip(attempt_ids, times, strict=True)
+        }
+    )
+    return attempt_ids
+
+
+async def test_attempt_percentiles(user_client, store: Store, user, raw_task):
+    attempt_ids = await _ok_attempts(store, user, raw_task, [10, 40, 160, 640])
+
+    response = await user_client.get(f"/attempts/{attempt_ids[0]}/percentiles")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted_attempts"] == 4
+    assert data["faster_than"] == 87.5
+    assert data["less_memory_than"] == 50.0
+
+
+async def test_task_percentiles(unauth_client, store: Store, user, raw_task):
+    await _ok_attempts(store, user, raw_task, [10, 40, 160, 640])
+
+    response = await unauth_client.get(f"/tasks/{raw_task.id}/percentiles")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted_attempts"] == 4
+    assert data["time_used_ms"]["p50"] < data["time_used_ms"]["p99"]
+    assert data["memory_used_bytes"]["p50"] <= 2**20 * 1.2
+
+
+async def test_deleted_attempt_leaves_histograms(
+    unauth_client, store: Store, user, raw_task
+):
+    attempt_ids = await _ok_attempts(store, user, raw_task, [10, 40, 640])
+
+    await store.attempt.delete_attempt(attempt_id=attempt_ids[-1])
+
+    response = await unauth_client.get(f"/tasks/{raw_task.id}/percentiles")
+    data = response.json()
+    assert data["accepted_attempts"] == 2
+    assert data["time_used_ms"]["p99"] < 640
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import status
+
+from app.attempt.exceptions import (
+    AttemptAccessDeniedException,
+    AttemptNotFoundException,
+)
+from app.attempt.notifier import attempt_notifier
+
+
+def _events(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(
+            line.split(": ", 1) for line in block.splitlines() if ": " in line
+        )
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_finished_attempts(user_client, one_task_many_attempts):
+    finished = one_task_many_attempts[1:]
+    response = await user_client.get(
+        "/attempts/stream", params={"ids": [a.id for a in finished]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["result"] * len(finished)
+    assert {data["id"]: data["status"] for _, data in events} == {
+        a.id: a.status for a in finished
+    }
+
+
+@pytest.mark.asyncio
+async def test_running_attempt(monkeypatch, user_client, attempt):
+    subscribed = asyncio.Event()
+    subscribe = attempt_notifier.subscribe
+
+    def subscribe_and_signal(attempt_ids):
+        subscription = subscribe(attempt_ids)
+        subscribed.set()
+        return subscription
+
+    monkeypatch.setattr(attempt_notifier, "subscribe", subscribe_and_signal)
+
+    async def notify():
+        await subscribed.wait()
+        attempt_notifier.dispatch(
+            {
+                "event": "progress",
+                "id": attempt.id,
+                "passed_tests": 1,
+                "total_tests": 2,
+            }
+        )
+        attempt_notifier.dispatch(
+            {
+                "event": "result",
+                "id": attempt.id,
+                "status": "Ok",
+                "time_used_ms": 10,
+                "memory_used_bytes": 1024,
+                "error_traceback": None,
+                "failed_test_number": None,
+                "source_code_output": None,
+                "expected_output": None,
+                "user_id": "ignored",
+            }
+        )
+
+    notify_task = asyncio.create_task(notify())
+    response = await user_client.get(
+        "/attempts/stream", params={"ids": [attempt.id]}
+    )
+    await notify_task
+
+    events = _events(response.text)
+    assert events[0] == (
+        "progress",
+        {"id": attempt.id, "passed_tests": 1, "total_tests": 2},
+    )
+    assert events[1][0] == "result"
+    assert events[1][1]["status"] == "Ok"
+    assert "user_id" not in events[1][1]
+    assert attempt.id not in attempt_notifier.subscriptions
+
+
+@pytest.mark.asyncio
+async def test_not_found(user_client, attempt):
+    response = await user_client.get(
+        "/attempts/stream", params={"ids": [attempt.id, attempt.id + 1000]}
+    )
+    assert response.status_code == AttemptNotFoundException.default_status_code
+    assert attempt.id not in attempt_notifier.subscriptions
+
+
+@pytest.mark.asyncio
+async def test_foreign_attempt(user_wln_client, attempt):
+    response = await user_wln_client.get(
+        "/attempts/stream", params={"ids": [attempt.id]}
+    )
+    assert (
+        response.status_code == AttemptAccessDeniedException.default_status_code
+    )
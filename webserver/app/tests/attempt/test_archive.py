@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text, update
+from sqlmodel import col
+
+from app.attempt.archive import AttemptArchiver
+from app.attempt.models import (
+    Attempt,
+    AttemptCreate,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+)
+from app.core.background_store import background_store_service
+from app.store import Store
+
+OLD = datetime(2020, 1, 15, tzinfo=timezone.utc)  # noqa: UP017
+
+
+async def _attempt(store: Store, user, task, *, status, created_at) -> int:
+    attempt = await store.attempt.create_attempt(
+        attempt_create=AttemptCreate(
+            user_id=user.id,
+            task_id=task.id,
+            programming_language=ProgrammingLanguageEnum.PYTHON,
+            source_code=f"print({status.name!r})",
+        )
+    )
+    if status != AttemptStatusEnum.RUNNING:
+        await store.attempt.update_attempt(
+            attempt_id=attempt.id,
+            attempt_update=AttemptUpdate(
+                status=status,
+                source_code_output="out",
+                expected_output="expected",
+            ),
+        )
+    await store.session.execute(
+        update(Attempt)
+        .where(col(Attempt.id) == attempt.id)
+        .values(created_at=created_at)
+    )
+    await store.session.commit()
+    return attempt.id
+
+
+@pytest.fixture
+def archiver(monkeypatch, pg_sessionmaker) -> AttemptArchiver:
+    monkeypatch.setattr(
+        background_store_service, "session_maker", pg_sessionmaker
+    )
+    return AttemptArchiver(archive_after_days=30, batch_size=1)
+
+
+async def test_archived_attempt_reads_transparently(
+    store: Store, archiver: AttemptArchiver, user, raw_task
+):
+    old = await _attempt(
+        store, user, raw_task, status=AttemptStatusEnum.OK, created_at=OLD
+    )
+    running = await _attempt(
+        store,
+        user,
+        raw_task,
+        status=AttemptStatusEnum.RUNNING,
+        created_at=OLD,
+    )
+    recent = await _attempt(
+        store,
+        user,
+        raw_task,
+        status=AttemptStatusEnum.WRONG_ANSWER,
+        created_at=datetime.now(timezone.utc),  # noqa: UP017
+    )
+
+    assert await archiver.run_once() == 1
+
+    rows = {
+        row.id: row
+        for row in await store.session.execute(
+            text(
+                "SELECT id, source_code, source_code_output, archived_at "
+                "FROM attempt"
+            )
+        )
+    }
+    assert not rows[old].source_code
+    assert rows[old].source_code_output is None
+    assert rows[old].archived_at is not None
+    assert rows[running].archived_at is None
+    assert rows[recent].archived_at is None
+
+    attempt = await store.attempt.get_attempt_by_id(attempt_id=old)
+    assert attempt is not None
+    assert attempt.source_code == "print('OK')"
+    assert attempt.source_code_output == "out"
+    assert attempt.expected_output == "expected"
+    assert attempt.error_traceback is None
+    assert attempt not in store.session.dirty
+
+    [listed] = await store.attempt.get_attempts_by_ids(attempt_ids=[old])
+    assert listed.source_code == "print('OK')"
+
+    # повторный проход ничего не трогает
+    assert await archiver.run_once() == 0
+
+
+async def test_archive_attempts_in_batches(store: Store, user, raw_task):
+    ids = [
+        await _attempt(
+            store, user, raw_task, status=AttemptStatusEnum.OK, created_at=OLD
+        )
+        for _ in range(3)
+    ]
+    created_before = OLD + timedelta(days=1)
+
+    assert (
+        await store.attempt.archive_attempts(
+            created_before=created_before, limit=2
+        )
+        == 2
+    )
+    assert (
+        await store.attempt.archive_attempts(
+            created_before=created_before, limit=2
+        )
+        == 1
+    )
+    for attempt in await store.attempt.get_attempts_by_ids(attempt_ids=ids):
+        assert attempt.archived_at is not None
+        assert attempt.source_code == "print('OK')"
+
+
+async def test_ensure_partitions(store: Store):
+    today = datetime.now(timezone.utc).date()  # noqa: UP017
+    until = (today.replace(day=1) + timedelta(days=31 * 6)).replace(day=1)
+
+    created = await store.attempt.ensure_partitions(until=until)
+
+    partitions = set(
+        await store.session.scalars(
+            text(
+                "SELECT inhrelid::regclass::text FROM pg_inherits "
+                "WHERE inhparent = 'attempt'::regclass"
+            )
+        )
+    )
+    assert f"attempt_{until:%Y_%m}" in partitions
+    assert set(created) <= partitions
+    assert await store.attempt.ensure_partitions(until=until) == []
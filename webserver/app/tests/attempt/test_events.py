@@ -0,0 +1,45 @@
+from app.attempt.events import attempt_events
+from app.attempt.notifier import AttemptNotifier
+from app.core.config import settings
+
+
+async def test_attempt_events_keepalive_and_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "ATTEMPT_STREAM_KEEPALIVE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "ATTEMPT_STREAM_TIMEOUT_SECONDS", 0.05)
+    notifier = AttemptNotifier()
+    subscription = notifier.subscribe([1])
+
+    chunks = [chunk async for chunk in attempt_events(subscription, [])]
+
+    assert chunks
+    assert set(chunks) == {": keepalive\n\n"}
+    assert notifier.subscriptions == {}
+
+
+async def test_attempt_events_without_progress():
+    notifier = AttemptNotifier()
+    subscription = notifier.subscribe([1])
+    notifier.dispatch(
+        {"event": "progress", "id": 1, "passed_tests": 1, "total_tests": 3}
+    )
+    notifier.dispatch(
+        {"event": "result", "id": 1, "status": "Ok"}
+        | dict.fromkeys(
+            (
+                "time_used_ms",
+                "memory_used_bytes",
+                "error_traceback",
+                "failed_test_number",
+                "source_code_output",
+                "expected_output",
+            )
+        )
+    )
+
+    chunks = [
+        chunk
+        async for chunk in attempt_events(subscription, [], progress=False)
+    ]
+
+    assert len(chunks) == 1
+    assert chunks[0].startswith("event: result\n")
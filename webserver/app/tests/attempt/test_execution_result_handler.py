@@ -0,0 +1,67 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.attempt.execution_result_handler import ExecutionResultHandler
+from app.attempt.models import AttemptStatusEnum
+from app.attempt.notifier import attempt_notifier
+from app.core.background_store import background_store_service
+
+
+class _Message:
+    def __init__(self, body: dict | bytes):
+        self.body = (
+            body if isinstance(body, bytes) else json.dumps(body).encode()
+        )
+        self.acked = False
+
+    async def ack(self):
+        self.acked = True
+
+
+@pytest.fixture
+def published(monkeypatch, pg_sessionmaker):
+    monkeypatch.setattr(
+        background_store_service, "session_maker", pg_sessionmaker
+    )
+    published = []
+    monkeypatch.setattr(
+        attempt_notifier, "publish", AsyncMock(side_effect=published.append)
+    )
+    return published
+
+
+async def test_handle_result_batches(published, one_task_many_attempts):
+    running, *_ = one_task_many_attempts
+    handler = ExecutionResultHandler(batch_size=2, batch_timeout=60)
+    messages = [
+        _Message({"id": running.id, "status": "Ok", "time_used_ms": 5}),
+        _Message(b"not json"),
+        _Message({"id": running.id + 1000, "status": "Ok"}),
+    ]
+
+    await handler.handle_result(messages[0])
+    await handler.handle_result(messages[1])
+    assert not messages[0].acked
+    assert messages[1].acked
+
+    # вторая валидная запись заполняет пачку
+    await handler.handle_result(messages[2])
+
+    assert all(m.acked for m in messages)
+    assert [(a.id, a.status) for a in published] == [
+        (running.id, AttemptStatusEnum.OK)
+    ]
+
+
+async def test_handle_result_flushes_on_timeout(published, attempt):
+    handler = ExecutionResultHandler(batch_size=100, batch_timeout=0.01)
+    message = _Message({"id": attempt.id, "status": "Wrong answer"})
+
+    await handler.handle_result(message)
+    await asyncio.sleep(0.5)
+
+    assert message.acked
+    assert [a.status for a in published] == [AttemptStatusEnum.WRONG_ANSWER]
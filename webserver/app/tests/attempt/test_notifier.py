@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app.attempt.notifier import AttemptNotifier
+
+
+def _payload(attempt_id: int, status: str = "Ok") -> dict:
+    return {"id": attempt_id, "status": status}
+
+
+async def test_notifier_delivers_to_subscriber():
+    notifier = AttemptNotifier()
+
+    with notifier.subscribe([1, 2]) as subscription:
+        notifier.dispatch(_payload(2))
+        notifier.dispatch(_payload(3))
+
+        assert await subscription.get() == _payload(2)
+        assert subscription.queue.empty()
+
+
+async def test_notifier_delivers_to_every_subscriber():
+    notifier = AttemptNotifier()
+
+    with notifier.subscribe([1]) as first, notifier.subscribe([1]) as second:
+        notifier.dispatch(_payload(1))
+
+        assert await first.get() == _payload(1)
+        assert await second.get() == _payload(1)
+
+
+async def test_notifier_get_timeout():
+    notifier = AttemptNotifier()
+
+    with notifier.subscribe([1]) as subscription:
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.01):
+                await subscription.get()
+
+
+def test_notifier_unsubscribe():
+    notifier = AttemptNotifier()
+
+    with notifier.subscribe([1, 2]) as subscription:
+        pass
+    notifier.dispatch(_payload(1))
+
+    assert notifier.subscriptions == {}
+    assert subscription.queue.empty()
+
+
+def test_notifier_calls_every_listener():
+    notifier = AttemptNotifier()
+    first, second = [], []
+    notifier.add_listener("result", first.append)
+    notifier.add_listener("result", second.append)
+
+    notifier.dispatch(_payload(1))
+
+    assert first == [_payload(1)]
+    assert second == [_payload(1)]
+
+
+async def test_notifier_listener_error_does_not_block_subscribers():
+    notifier = AttemptNotifier()
+    received = []
+
+    def failing(payload: dict) -> None:
+        raise RuntimeError("listener failed")
+
+    notifier.add_listener("result", failing)
+    notifier.add_listener("result", received.append)
+
+    with notifier.subscribe([1]) as subscription:
+        notifier.dispatch(_payload(1))
+
+        assert received == [_payload(1)]
+        assert await subscription.get() == _payload(1)
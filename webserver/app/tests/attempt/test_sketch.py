@@ -0,0 +1,49 @@
+import random
+
+from app.attempt.sketch import (
+    BUCKETS_PER_OCTAVE,
+    bucket_bounds,
+    bucket_of,
+    percentile_rank,
+    quantile,
+)
+
+
+def _histogram(values: list[int]) -> dict[int, int]:
+    histogram: dict[int, int] = {}
+    for value in values:
+        bucket = bucket_of(value)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+    return histogram
+
+
+def test_value_within_bucket_bounds():
+    for value in (0, 1, 2, 7, 8, 100, 1023, 1024, 10**6, 2**33):
+        low, high = bucket_bounds(bucket_of(value))
+        assert low <= value < high
+
+
+def test_bucket_count_is_bounded():
+    # 64 ГБ в байтах укладываются в ~150 корзин
+    assert bucket_of(64 * 2**30) <= 36 * BUCKETS_PER_OCTAVE
+
+
+def test_percentile_rank():
+    histogram = _histogram([10, 20, 40, 80, 160])
+
+    assert percentile_rank(histogram, 1) == 100.0
+    assert percentile_rank(histogram, 40) == 50.0
+    assert percentile_rank(histogram, 10_000) == 0.0
+    assert percentile_rank({}, 40) is None
+
+
+def test_quantile_relative_error():
+    rng = random.Random(0)
+    values = sorted(int(rng.lognormvariate(5, 1)) for _ in range(10_000))
+    histogram = _histogram(values)
+
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * len(values))]
+        assert abs(quantile(histogram, q) - exact) / exact < 0.2
+
+    assert quantile({}, 0.5) is None
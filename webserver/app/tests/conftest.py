@@ -14,6 +14,8 @@ from app.core import db
 from app.core.config import settings
 from app.main import app as origin_app
 from app.store import Store
+from app.task.cache import catalog_cache
+from app.user.cache import user_stats_cache
 
 from .fixtures import *  # noqa: F403
 
@@ -125,6 +127,16 @@ async def _truncate_all(
         await pg_session.commit()
 
 
+@pytest.fixture(autouse=True)
+def _clear_catalog_cache():
+    # кэши живут в процессе, а данные между тестами удаляются
+    catalog_cache.clear()
+    user_stats_cache.clear()
+    yield
+    catalog_cache.clear()
+    user_stats_cache.clear()
+
+
 @pytest_asyncio.fixture
 async def db_session(pg_sessionmaker):
     async with pg_sessionmaker() as session:
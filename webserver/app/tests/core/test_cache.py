@@ -0,0 +1,57 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from app.core.cache import TTLCache
+
+
+def test_expired_entry_dropped(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now)
+    cache = TTLCache(ttl_seconds=10, max_entries=10)
+
+    cache.set("key", 1)
+    assert cache.get("key") == 1
+
+    now = 111.0
+    assert cache.get("key") is None
+    assert "key" not in cache.entries
+
+
+def test_least_recently_used_evicted():
+    cache = TTLCache(ttl_seconds=10, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+async def test_load_cached_once():
+    cache = TTLCache(ttl_seconds=10, max_entries=10)
+    load = AsyncMock(return_value="value")
+
+    assert await cache.get_or_load("key", load) == "value"
+    assert await cache.get_or_load("key", load) == "value"
+    assert load.await_count == 1
+
+
+async def test_load_racing_clear_not_stored():
+    cache = TTLCache(ttl_seconds=10, max_entries=10)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def load():
+        started.set()
+        await release.wait()
+        return "stale"
+
+    loading = asyncio.create_task(cache.get_or_load("key", load))
+    await started.wait()
+    cache.clear()
+    release.set()
+
+    assert await loading == "stale"
+    assert cache.get("key") is None
@@ -0,0 +1,15 @@
+from app.store import Store
+from app.user.models import User
+
+
+async def test_release_returns_connection(store: Store, user: User):
+    found = await store.user.get_user_by_id(user_id=user.id)
+    assert store.session.in_transaction()
+
+    await store.release()
+
+    assert not store.session.in_transaction()
+    assert found is not None
+    assert found.email == user.email
+    # после release сессией можно пользоваться дальше
+    assert await store.user.get_user_by_id(user_id=user.id) is not None
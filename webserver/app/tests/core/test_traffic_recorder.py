@@ -0,0 +1,58 @@
+import gzip
+import json
+
+from app.core.traffic_recorder import TrafficRecorder
+
+
+def _task(attempt_id: int) -> dict:
+    return {
+        "id": attempt_id,
+        "programming_language": "Python",
+        "source_code": "print(input())",
+        "time_limit_seconds": 1,
+        "memory_limit_megabytes": 64,
+        "tests": [[["1"], ["1"]]],
+    }
+
+
+def test_traffic_recorder_disabled():
+    recorder = TrafficRecorder(None)
+    with recorder.recording():
+        recorder.record(_task(1))
+
+    assert not recorder.enabled
+
+
+def test_traffic_recorder_anonymises_ids(tmp_path):
+    path = tmp_path / "traffic.jsonl.gz"
+    recorder = TrafficRecorder(str(path))
+    with recorder.recording():
+        recorder.record(_task(1042))
+        recorder.record(_task(1043))
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [e["task"]["id"] for e in entries] == [1, 2]
+    assert entries[0]["task"]["source_code"] == "print(input())"
+    assert 0 <= entries[0]["offset"] <= entries[1]["offset"]
+
+
+def test_traffic_recorder_appends(tmp_path):
+    path = tmp_path / "traffic.jsonl.gz"
+    for attempt_id in (1, 2):
+        recorder = TrafficRecorder(str(path))
+        with recorder.recording():
+            recorder.record(_task(attempt_id))
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+
+def test_traffic_recorder_sample_rate_zero(tmp_path):
+    path = tmp_path / "traffic.jsonl.gz"
+    recorder = TrafficRecorder(str(path), sample_rate=0.0)
+    with recorder.recording():
+        recorder.record(_task(1))
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert not f.read()
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+import pytest
+
+from app.core.background_store import background_store_service
+from app.statistics.snapshot import AdminStatsSnapshot
+from app.store import Store
+
+
+async def test_counts(
+    store: Store, superuser, raw_task, one_task_many_attempts
+):
+    stats = await store.statistics.get_admin_stats()
+
+    assert stats.total_users == 2
+    assert stats.superusers == 1
+    assert stats.active_users + stats.inactive_users == stats.total_users
+    assert stats.total_tasks == 1
+    assert stats.public_tasks == int(raw_task.is_public)
+    assert sum(stats.tasks_by_difficulty.values()) == stats.total_tasks
+    assert stats.total_attempts == len(one_task_many_attempts)
+    assert stats.successful_attempts == sum(
+        a.status == "Ok" for a in one_task_many_attempts
+    )
+    assert stats.attempts_by_language == {"Python": stats.total_attempts}
+    assert stats.attempts_last_30_days == stats.total_attempts
+
+
+@pytest.fixture
+def snapshot(monkeypatch, pg_sessionmaker) -> AdminStatsSnapshot:
+    monkeypatch.setattr(
+        background_store_service, "session_maker", pg_sessionmaker
+    )
+    return AdminStatsSnapshot(max_age_seconds=60)
+
+
+async def test_snapshot_served_from_memory(snapshot, user):
+    first = await snapshot.get()
+    assert first.total_users == 1
+
+    assert await snapshot.get() is first
+    assert snapshot.refreshing is None
+
+
+async def test_stale_snapshot_refreshed_in_background(
+    snapshot, user, superuser
+):
+    first = await snapshot.get()
+    first.generated_at -= timedelta(minutes=5)
+
+    # клиент получает прежний снимок, не дожидаясь пересчёта
+    assert await snapshot.get() is first
+    assert snapshot.refreshing is not None
+    await snapshot.refreshing
+
+    assert snapshot.stats is not first
+    assert not snapshot.is_stale()
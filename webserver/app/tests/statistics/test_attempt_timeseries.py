@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+    RollupGranularityEnum,
+)
+from app.statistics.exceptions import InvalidTimeRangeException
+from app.statistics.models import (
+    AttemptTimeseriesFilters,
+    RollupDimensionEnum,
+)
+from app.store import Store
+
+
+async def _attempts(store: Store, user, task, count: int) -> list[int]:
+    attempt_create = AttemptCreate(
+        user_id=user.id,
+        task_id=task.id,
+        programming_language=ProgrammingLanguageEnum.PYTHON,
+        source_code="print('hi')",
+    )
+    return [
+        (await store.attempt.create_attempt(attempt_create=attempt_create)).id
+        for _ in range(count)
+    ]
+
+
+async def test_rollups_follow_verdicts(store: Store, user, raw_task):
+    ok, wrong, running = await _attempts(store, user, raw_task, 3)
+    await store.attempt.apply_results(
+        updates={
+            ok: AttemptUpdate(status=AttemptStatusEnum.OK),
+            wrong: AttemptUpdate(status=AttemptStatusEnum.WRONG_ANSWER),
+        }
+    )
+
+    for granularity in RollupGranularityEnum:
+        series = await store.statistics.get_attempt_timeseries(
+            filters=AttemptTimeseriesFilters(
+                granularity=granularity,
+                group_by=[RollupDimensionEnum.status],
+            )
+        )
+        assert [(p["status"], p["count"]) for p in series["data"]] == [
+            (AttemptStatusEnum.OK, 1),
+            (AttemptStatusEnum.WRONG_ANSWER, 1),
+        ]
+
+    # вердикт исправлен вручную: попытка переезжает в другую корзину
+    await store.attempt.update_attempt(
+        attempt_id=wrong,
+        attempt_update=AttemptUpdate(status=AttemptStatusEnum.OK),
+    )
+    series = await store.statistics.get_attempt_timeseries(
+        filters=AttemptTimeseriesFilters(
+            group_by=[RollupDimensionEnum.status],
+            statuses=[AttemptStatusEnum.OK, AttemptStatusEnum.WRONG_ANSWER],
+        )
+    )
+    assert [(p["status"], p["count"]) for p in series["data"]] == [
+        (AttemptStatusEnum.OK, 2),
+    ]
+
+    series = await store.statistics.get_attempt_timeseries(
+        filters=AttemptTimeseriesFilters(granularity=RollupGranularityEnum.hour)
+    )
+    assert len(series["data"]) == 1
+    assert series["data"][0]["count"] == 2
+    assert "status" not in series["data"][0]
+    assert series["data"][0]["bucket_start"] == series["data"][0][
+        "bucket_start"
+    ].replace(minute=0, second=0, microsecond=0)
+
+    # удалённая попытка уходит из сводок, running в них и не было
+    await store.attempt.delete_attempt(attempt_id=ok)
+    await store.attempt.delete_attempt(attempt_id=running)
+    series = await store.statistics.get_attempt_timeseries(
+        filters=AttemptTimeseriesFilters(granularity=RollupGranularityEnum.hour)
+    )
+    assert series["data"][0]["count"] == 1
+
+
+async def test_range_outside_buckets(store: Store, user, raw_task):
+    (attempt_id,) = await _attempts(store, user, raw_task, 1)
+    await store.attempt.apply_results(
+        updates={attempt_id: AttemptUpdate(status=AttemptStatusEnum.OK)}
+    )
+
+    end = datetime.now(timezone.utc) - timedelta(days=2)  # noqa: UP017
+    series = await store.statistics.get_attempt_timeseries(
+        filters=AttemptTimeseriesFilters(end=end)
+    )
+    assert series["data"] == []
+    assert series["start"] == RollupGranularityEnum.day.truncate(
+        end - timedelta(days=30)
+    )
+
+
+async def test_invalid_range(store: Store):
+    now = datetime.now(timezone.utc)  # noqa: UP017
+    with pytest.raises(InvalidTimeRangeException):
+        await store.statistics.get_attempt_timeseries(
+            filters=AttemptTimeseriesFilters(
+                start=now, end=now - timedelta(days=1)
+            )
+        )
+    with pytest.raises(InvalidTimeRangeException):
+        await store.statistics.get_attempt_timeseries(
+            filters=AttemptTimeseriesFilters(
+                granularity=RollupGranularityEnum.hour,
+                start=now - timedelta(days=365),
+                end=now,
+            )
+        )
+
+
+async def test_api(superuser_client, user_client):
+    response = await superuser_client.get(
+        "/stats/attempts",
+        params={"granularity": "hour", "group_by": ["status", "task_id"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"] == []
+
+    response = await user_client.get("/stats/attempts")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
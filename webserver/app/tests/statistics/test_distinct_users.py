@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+)
+from app.statistics import hll
+from app.statistics.models import UserSketchEventEnum
+from app.store import Store
+
+
+async def _attempt(store: Store, user, task) -> int:
+    attempt = await store.attempt.create_attempt(
+        attempt_create=AttemptCreate(
+            user_id=user.id,
+            task_id=task.id,
+            programming_language=ProgrammingLanguageEnum.PYTHON,
+            source_code="print('hi')",
+        )
+    )
+    return attempt.id
+
+
+async def test_sketches_follow_attempts(
+    store: Store, user, superuser, raw_task
+):
+    first = await _attempt(store, user, raw_task)
+    second = await _attempt(store, user, raw_task)
+    third = await _attempt(store, superuser, raw_task)
+
+    # скетчи пополняются вместе с вердиктами, а не при отправке
+    today = datetime.now(timezone.utc).date()  # noqa: UP017
+    assert (
+        await store.statistics.count_distinct_users(
+            event=UserSketchEventEnum.submitted, start=today, end=today
+        )
+        == 0
+    )
+
+    await store.attempt.apply_results(
+        updates={
+            first: AttemptUpdate(status=AttemptStatusEnum.OK),
+            second: AttemptUpdate(status=AttemptStatusEnum.WRONG_ANSWER),
+            third: AttemptUpdate(status=AttemptStatusEnum.WRONG_ANSWER),
+        }
+    )
+
+    submitted = await store.statistics.count_distinct_users(
+        event=UserSketchEventEnum.submitted, start=today, end=today
+    )
+    solved = await store.statistics.count_distinct_users(
+        event=UserSketchEventEnum.solved,
+        start=today - timedelta(days=30),
+        end=today,
+    )
+    assert (submitted, solved) == (2, 1)
+
+    yesterday = today - timedelta(days=1)
+    assert (
+        await store.statistics.count_distinct_users(
+            event=UserSketchEventEnum.submitted, start=yesterday, end=yesterday
+        )
+        == 0
+    )
+
+    counts = await store.statistics.count_task_distinct_users(
+        task_id=raw_task.id
+    )
+    assert counts == {
+        UserSketchEventEnum.submitted: 2,
+        UserSketchEventEnum.solved: 1,
+    }
+
+
+async def test_api(superuser_client, user_client, store: Store, user, raw_task):
+    await store.attempt.apply_results(
+        updates={
+            await _attempt(store, user, raw_task): AttemptUpdate(
+                status=AttemptStatusEnum.WRONG_ANSWER
+            )
+        }
+    )
+
+    response = await superuser_client.get("/stats/users/engagement")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["dau"], data["wau"], data["mau"]) == (1, 1, 1)
+    assert data["standard_error"] == hll.STANDARD_ERROR
+
+    response = await superuser_client.get(f"/stats/tasks/{raw_task.id}/users")
+    assert response.json()["submitters"] == 1
+
+    response = await superuser_client.get(
+        "/stats/users/distinct",
+        params={"start": "2026-02-01", "end": "2026-01-01"},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await user_client.get("/stats/users/engagement")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
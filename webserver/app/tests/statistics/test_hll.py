@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+from uuid import uuid4
+
+from app.statistics import hll
+from app.statistics.models import UserSketchEventEnum
+from app.store import Store
+
+DAY = date(2026, 1, 15)
+
+
+def _sketch(user_ids) -> list[int]:
+    registers = [0] * hll.REGISTERS
+    for user_id in user_ids:
+        index, rank = hll.register_of(user_id)
+        registers[index] = max(registers[index], rank)
+    return registers
+
+
+async def _add(store: Store, day: date, user_ids) -> None:
+    # напрямую, минуя попытки: тысячам пользователей не нужны строки в БД
+    await store.attempt._add_to_user_sketches(  # noqa: SLF001
+        [
+            (user_id, None, day, UserSketchEventEnum.submitted)
+            for user_id in user_ids
+        ]
+    )
+
+
+async def _count(store: Store, start: date, end: date) -> int:
+    return await store.statistics.count_distinct_users(
+        event=UserSketchEventEnum.submitted, start=start, end=end
+    )
+
+
+def test_register_is_stable():
+    user_id = uuid4()
+    index, rank = hll.register_of(user_id)
+
+    assert hll.register_of(user_id) == (index, rank)
+    assert 0 <= index < hll.REGISTERS
+    assert rank >= 1
+
+
+def test_estimate_within_error():
+    for count in (0, 10, 1000, 50_000):
+        estimate = hll.estimate(_sketch(uuid4() for _ in range(count)))
+        assert abs(estimate - count) <= max(2, 4 * hll.STANDARD_ERROR * count)
+
+
+async def test_duplicates_not_counted(store: Store):
+    user_ids = [uuid4() for _ in range(100)]
+    await _add(store, DAY, user_ids)
+    once = await _count(store, DAY, DAY)
+
+    # повторный upsert тех же пользователей скетч не меняет
+    await _add(store, DAY, user_ids)
+    await _add(store, DAY, user_ids[:10])
+
+    assert await _count(store, DAY, DAY) == once
+    assert once == hll.estimate(_sketch(user_ids))
+
+
+async def test_union_over_days(store: Store):
+    next_day = DAY + timedelta(days=1)
+    shared = [uuid4() for _ in range(3000)]
+    first = [*shared, *(uuid4() for _ in range(1000))]
+    second = [*shared, *(uuid4() for _ in range(2000))]
+    await _add(store, DAY, first)
+    await _add(store, next_day, second)
+
+    union = await _count(store, DAY, next_day)
+
+    # hll_union совпадает с поэлементным максимумом регистров обоих дней
+    assert union == hll.estimate(_sketch([*first, *second]))
+    assert abs(union - 6000) <= 4 * hll.STANDARD_ERROR * 6000
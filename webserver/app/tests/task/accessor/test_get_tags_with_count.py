@@ -21,6 +21,19 @@ async def test_pagination(store, tags):
     assert result["count"] == 3
 
 
+@pytest.mark.asyncio
+async def test_cursor(store, tags):
+    first = await store.task.get_tags_with_count(limit=2)
+    second = await store.task.get_tags_with_count(
+        limit=2, cursor=first["next_cursor"], with_count=False
+    )
+
+    ids = [tag.id for tag in first["tags"] + second["tags"]]
+    assert ids == sorted(tag.id for tag in tags)
+    assert second["count"] is None
+    assert second["next_cursor"] is None
+
+
 @pytest.mark.asyncio
 async def test_empty_result(store):
     result = await store.task.get_tags_with_count()
@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.exceptions import InternalException
+
+
+@pytest.mark.asyncio
+async def test_success(store, raw_task):
+    info = await store.task.get_task_access_info(task_id=raw_task.id)
+    assert info is not None
+    assert info.id == raw_task.id
+    assert info.user_id == raw_task.user_id
+    assert info.is_public == raw_task.is_public
+
+
+@pytest.mark.asyncio
+async def test_not_found(store, raw_task):
+    info = await store.task.get_task_access_info(task_id=raw_task.id + 1000)
+    assert info is None
+
+
+@pytest.mark.asyncio
+async def test_internal_error(store):
+    with patch.object(
+        store.task.session,
+        "execute",
+        side_effect=Exception("Database connection error"),
+    ):
+        with pytest.raises(InternalException):
+            await store.task.get_task_access_info(task_id=1)
@@ -2,13 +2,15 @@ from unittest.mock import patch
 
 import pytest
 
-from app.core.exceptions import InternalException
+from app.core.exceptions import InternalException, InvalidCursorException
 from app.store import Store
 from app.task.models import (
     DifficultyEnum,
     SortByEnum,
     SortOrderEnum,
+    TaskCreate,
     TaskStatusEnum,
+    TasksTypeEnum,
 )
 
 
@@ -49,6 +51,91 @@ class TestGetTasksBasic:
                 await store.task.get_tasks_with_filters()
 
 
+class TestGetTasksCursor:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sort_by", list(SortByEnum))
+    @pytest.mark.parametrize("sort_order", list(SortOrderEnum))
+    async def test_walk_matches_offset(
+        self, store: Store, raw_tasks, sort_by, sort_order
+    ):
+        full = await store.task.get_tasks_with_filters(
+            tasks_type=TasksTypeEnum.personal,
+            user_id=raw_tasks[0].user_id,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
+
+        ids: list[int] = []
+        cursor = None
+        while True:
+            page = await store.task.get_tasks_with_filters(
+                tasks_type=TasksTypeEnum.personal,
+                user_id=raw_tasks[0].user_id,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                limit=3,
+                cursor=cursor,
+                with_count=False,
+            )
+            assert page["count"] is None
+            ids.extend(task.id for task in page["tasks"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert ids == [task.id for task in full["tasks"]]
+        assert len(ids) == len(raw_tasks)
+
+    @pytest.mark.asyncio
+    async def test_cursor_from_other_sort(self, store: Store, raw_tasks):
+        page = await store.task.get_tasks_with_filters(limit=1)
+
+        with pytest.raises(InvalidCursorException):
+            await store.task.get_tasks_with_filters(
+                sort_by=SortByEnum.difficulty, cursor=page["next_cursor"]
+            )
+
+
+class TestGetTasksTags:
+    @pytest.mark.asyncio
+    async def test_intersection(self, store: Store, raw_tasks_with_tags, tags):
+        for selected in ([tags[0]], [tags[0], tags[1]], tags):
+            selected_ids = {tag.id for tag in selected}
+            result = await store.task.get_tasks_with_filters(
+                tag_ids=list(selected_ids)
+            )
+
+            expected = sorted(
+                task.id
+                for task in raw_tasks_with_tags
+                if task.is_public
+                and selected_ids <= {tag.id for tag in task.tags}
+            )
+            assert [task.id for task in result["tasks"]] == expected
+            assert result["count"] == len(expected)
+
+    @pytest.mark.asyncio
+    async def test_follows_link_changes(self, store: Store, raw_tasks, tags):
+        task = next(task for task in raw_tasks if task.is_public)
+        for tag in tags[:2]:
+            await store.task.add_tag_to_task(task_id=task.id, tag_id=tag.id)
+
+        async def tagged(tag_id: int) -> list[int]:
+            result = await store.task.get_tasks_with_filters(tag_ids=[tag_id])
+            return [t.id for t in result["tasks"]]
+
+        assert await tagged(tags[0].id) == [task.id]
+
+        await store.task.remove_tag_from_task(
+            task_id=task.id, tag_id=tags[0].id
+        )
+        assert await tagged(tags[0].id) == []
+        assert await tagged(tags[1].id) == [task.id]
+
+        await store.task.delete_tag(tag_id=tags[1].id)
+        assert await tagged(tags[1].id) == []
+
+
 class TestGetTasksSearch:
     @pytest.mark.asyncio
     async def test_search_public(self, store: Store, raw_tasks):
@@ -74,6 +161,39 @@ class TestGetTasksSearch:
         assert len(result["tasks"]) == 0
         assert result["count"] == 0
 
+    @pytest.mark.asyncio
+    async def test_search_prefix_and_punctuation(self, store: Store, raw_tasks):
+        result = await store.task.get_tasks_with_filters(search="titl: 4 &!")
+
+        assert [task.title for task in result["tasks"]] == ["Title 4"]
+
+    @pytest.mark.asyncio
+    async def test_relevance_title_over_description(self, store: Store, user):
+        for title, description in [
+            ("Beta", "Find the sum of numbers"),
+            ("Alpha sum", "Add two numbers"),
+        ]:
+            await store.task.create_task(
+                task_create=TaskCreate(
+                    user_id=user.id,
+                    title=title,
+                    description=description,
+                    difficulty=DifficultyEnum.easy,
+                    time_limit_seconds=1,
+                    memory_limit_megabytes=64,
+                    tests=[[["1"], ["1"]]],
+                    is_public=True,
+                )
+            )
+
+        result = await store.task.get_tasks_with_filters(
+            search="sum",
+            sort_by=SortByEnum.relevance,
+            sort_order=SortOrderEnum.desc,
+        )
+
+        assert [task.title for task in result["tasks"]] == ["Alpha sum", "Beta"]
+
 
 class TestGetTasksSort:
     @pytest.mark.asyncio
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.exceptions import InternalException
+
+
+@pytest.mark.asyncio
+async def test_public_prefix(store, raw_tasks):
+    titles = await store.task.suggest_task_titles(prefix="title 1")
+
+    assert titles == ["Title 10"]
+
+
+@pytest.mark.asyncio
+async def test_own_private(store, raw_tasks):
+    titles = await store.task.suggest_task_titles(
+        prefix="TITLE 1", user_id=raw_tasks[0].user_id
+    )
+
+    assert titles == ["Title 1", "Title 10"]
+
+
+@pytest.mark.asyncio
+async def test_like_wildcards_escaped(store, raw_tasks):
+    assert await store.task.suggest_task_titles(prefix="%") == []
+    assert await store.task.suggest_task_titles(prefix="title_") == []
+
+
+@pytest.mark.asyncio
+async def test_limit(store, raw_tasks):
+    titles = await store.task.suggest_task_titles(prefix="title", limit=2)
+
+    assert len(titles) == 2
+
+
+@pytest.mark.asyncio
+async def test_internal_error(store):
+    with patch.object(
+        store.task.session,
+        "execute",
+        side_effect=Exception("Database connection error"),
+    ):
+        with pytest.raises(InternalException):
+            await store.task.suggest_task_titles(prefix="t")
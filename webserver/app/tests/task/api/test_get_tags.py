@@ -0,0 +1,16 @@
+import pytest
+from fastapi import status
+
+
+@pytest.mark.asyncio
+async def test_tags_etag(unauth_client, tags):
+    response = await unauth_client.get("/tags")
+    etag = response.headers["etag"]
+
+    cached = await unauth_client.get("/tags", headers={"If-None-Match": etag})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+    other_page = await unauth_client.get(
+        "/tags", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert other_page.status_code == status.HTTP_200_OK
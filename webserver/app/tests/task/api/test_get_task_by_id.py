@@ -2,6 +2,7 @@ import pytest
 from fastapi import status
 
 from app.task.exceptions import TaskNotFoundException
+from app.task.models import TaskUpdate
 
 
 @pytest.mark.asyncio
@@ -33,3 +34,26 @@ async def test_not_found(superuser_client):
     response = await superuser_client.get(f"/tasks/{fake_id}")
     assert response.status_code == TaskNotFoundException.default_status_code
     assert response.json()["detail"] == TaskNotFoundException.default_message
+
+
+@pytest.mark.asyncio
+async def test_etag_not_modified(user_client, store, raw_task):
+    response = await user_client.get(f"/tasks/{raw_task.id}")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    cached = await user_client.get(
+        f"/tasks/{raw_task.id}", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+
+    await store.task.update_task(
+        task_id=raw_task.id, task_update=TaskUpdate(title="Renamed")
+    )
+    changed = await user_client.get(
+        f"/tasks/{raw_task.id}", headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.headers["etag"] != etag
+    assert changed.json()["title"] == "Renamed"
@@ -0,0 +1,108 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.attempt.models import AttemptCreate, ProgrammingLanguageEnum
+from app.attempt.notifier import AttemptNotifier
+from app.core.rabbitmq_client import rabbitmq_client
+from app.store import Store
+from app.task.cache import CATALOG_EVENT, CatalogCache
+from app.task.models import (
+    DifficultyEnum,
+    TaskCreate,
+    TaskStatusEnum,
+    TasksTypeEnum,
+)
+
+
+@pytest.fixture(autouse=True)
+def published(monkeypatch):
+    payloads = []
+    monkeypatch.setattr(
+        rabbitmq_client,
+        "publish_notification",
+        AsyncMock(side_effect=payloads.append),
+    )
+    return payloads
+
+
+def _new_task(user_id, title: str) -> TaskCreate:
+    return TaskCreate(
+        user_id=user_id,
+        title=title,
+        description=title,
+        difficulty=DifficultyEnum.easy,
+        time_limit_seconds=1,
+        memory_limit_megabytes=64,
+        tests=[[["1"], ["1"]]],
+        is_public=True,
+    )
+
+
+async def test_page_served_from_memory(store: Store, user, raw_tasks):
+    cache = CatalogCache()
+    first = await cache.get_tasks(store, filters={})
+
+    await store.task.create_task(task_create=_new_task(user.id, "New"))
+    cached = await cache.get_tasks(store, filters={})
+    assert [t.id for t in cached["tasks"]] == [t.id for t in first["tasks"]]
+
+    await cache.invalidate()
+    fresh = await cache.get_tasks(store, filters={})
+    assert first["count"] is not None
+    assert fresh["count"] == first["count"] + 1
+
+
+async def test_user_status_overlay(store: Store, user, raw_tasks):
+    cache = CatalogCache()
+    public = [task for task in raw_tasks if task.is_public]
+    await store.attempt.create_attempt(
+        attempt_create=AttemptCreate(
+            user_id=user.id,
+            task_id=public[0].id,
+            programming_language=ProgrammingLanguageEnum.PYTHON,
+            source_code="print(1)",
+        )
+    )
+
+    anonymous = await cache.get_tasks(store, filters={})
+    personal = await cache.get_tasks(store, filters={}, user_id=user.id)
+
+    statuses = {t.id: t.user_attempt_status for t in personal["tasks"]}
+    assert statuses[public[0].id] == TaskStatusEnum.attempted
+    assert statuses[public[1].id] == TaskStatusEnum.todo
+    # общая страница в кэше не получила статусов пользователя
+    assert all(t.user_attempt_status is None for t in anonymous["tasks"])
+    assert len(cache.tasks.entries) == 1
+
+
+async def test_user_specific_filters_bypass(store: Store, user, raw_tasks):
+    cache = CatalogCache()
+    await cache.get_tasks(
+        store,
+        filters={"tasks_type": TasksTypeEnum.personal},
+        user_id=user.id,
+    )
+    await cache.get_tasks(
+        store,
+        filters={"statuses": [TaskStatusEnum.todo]},
+        user_id=user.id,
+    )
+
+    assert not cache.tasks.entries
+
+
+async def test_invalidate_broadcast(store: Store, tags, published):
+    cache = CatalogCache()
+    await cache.get_tags(store, skip=0, limit=10)
+    assert cache.tags.entries
+
+    await cache.invalidate()
+    assert published == [{"event": CATALOG_EVENT}]
+    assert not cache.tags.entries
+
+    await cache.get_tags(store, skip=0, limit=10)
+    notifier = AttemptNotifier()
+    notifier.add_listener(CATALOG_EVENT, cache.handle_notification)
+    notifier.dispatch({"event": CATALOG_EVENT})
+    assert not cache.tags.entries
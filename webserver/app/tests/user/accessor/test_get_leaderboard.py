@@ -0,0 +1,76 @@
+import pytest
+
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+)
+from app.task.models import DifficultyEnum, TaskUpdate
+
+
+async def _solve(store, user, task):
+    attempt = await store.attempt.create_attempt(
+        attempt_create=AttemptCreate(
+            user_id=user.id,
+            task_id=task.id,
+            programming_language=ProgrammingLanguageEnum.PYTHON,
+            source_code="print('hi')",
+        )
+    )
+    await store.attempt.update_attempt(
+        attempt_id=attempt.id,
+        attempt_update=AttemptUpdate(status=AttemptStatusEnum.OK),
+    )
+    return attempt
+
+
+def _scores(leaderboard) -> list[tuple]:
+    return [
+        (entry["user_id"], entry["total_score"], entry["solved_tasks_count"])
+        for entry in leaderboard["data"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scores_follow_first_solves(store, user, user_wln, raw_tasks):
+    # raw_tasks[0] — medium, raw_tasks[1] — hard, raw_tasks[2] — easy
+    await _solve(store, user, raw_tasks[0])
+    await _solve(store, user, raw_tasks[1])
+    await _solve(store, user, raw_tasks[1])
+    easy_attempt = await _solve(store, user_wln, raw_tasks[2])
+
+    leaderboard = await store.user.get_leaderboard(limit=10)
+    assert leaderboard["count"] == 2
+    assert _scores(leaderboard) == [(user.id, 15, 2), (user_wln.id, 3, 1)]
+
+    leaderboard = await store.user.get_leaderboard(limit=1)
+    assert leaderboard["count"] == 2
+    assert _scores(leaderboard) == [(user.id, 15, 2)]
+
+    rank = await store.user.get_user_rank(user_id=user_wln.id)
+    assert rank["rank"] == 2
+    assert rank["total_score"] == 3
+
+    await store.attempt.delete_attempt(attempt_id=easy_attempt.id)
+    assert await store.user.get_user_rank(user_id=user_wln.id) is None
+    leaderboard = await store.user.get_leaderboard(limit=10)
+    assert _scores(leaderboard) == [(user.id, 15, 2)]
+
+
+@pytest.mark.asyncio
+async def test_task_changes_update_scores(store, user, user_wln, raw_tasks):
+    await _solve(store, user, raw_tasks[0])
+    await _solve(store, user, raw_tasks[1])
+    await _solve(store, user_wln, raw_tasks[2])
+
+    await store.task.update_task(
+        task_id=raw_tasks[2].id,
+        task_update=TaskUpdate(difficulty=DifficultyEnum.hard),
+    )
+    await store.task.delete_task(task_id=raw_tasks[1].id)
+
+    leaderboard = await store.user.get_leaderboard(limit=10)
+    assert _scores(leaderboard) == [(user_wln.id, 10, 1), (user.id, 5, 1)]
+    rank = await store.user.get_user_rank(user_id=user.id)
+    assert rank["rank"] == 2
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.attempt.models import (
+    AttemptCreate,
+    AttemptStatusEnum,
+    AttemptUpdate,
+    ProgrammingLanguageEnum,
+)
+
+
+async def _attempt(store, user, task, status: AttemptStatusEnum):
+    attempt = await store.attempt.create_attempt(
+        attempt_create=AttemptCreate(
+            user_id=user.id,
+            task_id=task.id,
+            programming_language=ProgrammingLanguageEnum.PYTHON,
+            source_code="print('hi')",
+        )
+    )
+    await store.attempt.update_attempt(
+        attempt_id=attempt.id, attempt_update=AttemptUpdate(status=status)
+    )
+
+
+@pytest.mark.asyncio
+async def test_stats(store, user, raw_tasks):
+    # raw_tasks[0] — medium, raw_tasks[1] — hard, raw_tasks[2] — easy
+    await _attempt(store, user, raw_tasks[0], AttemptStatusEnum.OK)
+    await _attempt(store, user, raw_tasks[0], AttemptStatusEnum.OK)
+    await _attempt(store, user, raw_tasks[1], AttemptStatusEnum.WRONG_ANSWER)
+    await _attempt(store, user, raw_tasks[2], AttemptStatusEnum.OK)
+
+    stats = await store.user.get_user_stats(user_id=user.id)
+
+    # публичные задачи raw_tasks: одна лёгкая, две средних, две сложных
+    assert stats["solved_by_difficulty"] == {
+        "easy": {"solved": 1, "total": 1},
+        "medium": {"solved": 1, "total": 2},
+        "hard": {"solved": 0, "total": 2},
+    }
+    assert stats["total_solved_this_year"] == 2
+    assert [day["count"] for day in stats["activity_days"]] == [2]
+    assert {task["id"] for task in stats["recent_solved_tasks"]} == {
+        raw_tasks[0].id,
+        raw_tasks[2].id,
+    }
+
+
+@pytest.mark.asyncio
+async def test_other_year(store, user, raw_tasks):
+    await _attempt(store, user, raw_tasks[0], AttemptStatusEnum.OK)
+
+    last_year = datetime.now(timezone.utc).year - 1  # noqa: UP017
+    stats = await store.user.get_user_stats(user_id=user.id, year=last_year)
+
+    assert stats["total_solved_this_year"] == 0
+    assert stats["activity_days"] == []
+    assert stats["recent_solved_tasks"] == []
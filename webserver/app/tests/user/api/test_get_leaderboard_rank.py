@@ -0,0 +1,25 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+
+from app.user.exceptions import UserNotFoundException
+
+
+@pytest.mark.asyncio
+async def test_without_score(unauth_client, user):
+    response = await unauth_client.get(f"/users/leaderboard/{user.id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    response_data = response.json()
+    assert response_data["user_id"] == str(user.id)
+    assert response_data["rank"] is None
+    assert response_data["total_score"] == 0
+
+
+@pytest.mark.asyncio
+async def test_not_found(unauth_client):
+    response = await unauth_client.get(f"/users/leaderboard/{uuid4()}")
+
+    assert response.status_code == UserNotFoundException.default_status_code
+    assert response.json()["detail"] == UserNotFoundException.default_message
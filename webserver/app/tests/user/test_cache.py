@@ -0,0 +1,54 @@
+from app.attempt.models import AttemptStatusEnum
+from app.attempt.notifier import RESULT_EVENT, AttemptNotifier
+from app.store import Store
+from app.user.cache import UserStatsCache
+
+
+async def test_stats_served_from_memory(store: Store, user, monkeypatch):
+    cache = UserStatsCache()
+    calls = []
+    get_user_stats = store.user.get_user_stats
+
+    async def counting_get_user_stats(**kwargs):
+        calls.append(kwargs)
+        return await get_user_stats(**kwargs)
+
+    monkeypatch.setattr(store.user, "get_user_stats", counting_get_user_stats)
+
+    first = await cache.get_stats(store, user_id=user.id)
+    second = await cache.get_stats(store, user_id=user.id)
+
+    assert second is first
+    assert len(calls) == 1
+
+
+async def test_ok_result_invalidates_user(store: Store, user, user_wln):
+    cache = UserStatsCache()
+    await cache.get_stats(store, user_id=user.id)
+    await cache.get_stats(store, user_id=user_wln.id)
+
+    notifier = AttemptNotifier()
+    notifier.add_listener(RESULT_EVENT, cache.handle_notification)
+    with notifier.subscribe([1]) as subscription:
+        notifier.dispatch(
+            {
+                "event": RESULT_EVENT,
+                "id": 1,
+                "status": AttemptStatusEnum.WRONG_ANSWER,
+                "user_id": str(user.id),
+            }
+        )
+        assert len(cache.stats.entries) == 2
+
+        notifier.dispatch(
+            {
+                "event": RESULT_EVENT,
+                "id": 1,
+                "status": AttemptStatusEnum.OK,
+                "user_id": str(user.id),
+            }
+        )
+        # результат по-прежнему доходит до ждущих его клиентов
+        assert subscription.queue.qsize() == 2
+
+    assert [key[0] for key in cache.stats.entries] == [user_wln.id]
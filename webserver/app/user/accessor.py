@@ -1,16 +1,18 @@
-from datetime import datetime, timezone
-from typing import TypedDict
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, TypedDict
 from uuid import UUID
 
-from sqlalchemy import and_, desc, distinct, extract, func, select
+from sqlalchemy import desc, func, select
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import col
 
 from app.attempt.models import Attempt, AttemptStatusEnum
 from app.auth.exceptions import InvalidCredentialsException
 from app.core.accessor import BaseAccessor
-from app.core.exceptions import InternalException
+from app.core.exceptions import InternalException, InvalidCursorException
 from app.core.logger import create_log
+from app.core.pagination import decode_cursor, page_query, split_page
 from app.core.security import get_password_hash, verify_password
 from app.task.models import DifficultyEnum, Task
 
@@ -21,7 +23,14 @@ from .exceptions import (
     UserNotFoundException,
     UserSamePasswordException,
 )
-from .models import User, UserCreate, UserRegister, UserUpdate, UserUpdateMe
+from .models import (
+    User,
+    UserCreate,
+    UserRegister,
+    UserScore,
+    UserUpdate,
+    UserUpdateMe,
+)
 
 log = create_log(
     __name__,
@@ -33,7 +42,8 @@ log = create_log(
 
 class UsersDict(TypedDict):
     users: list[User]
-    count: int
+    count: int | None
+    next_cursor: str | None
 
 
 class UserAccessor(BaseAccessor):
@@ -57,22 +67,45 @@ class UserAccessor(BaseAccessor):
             return result.scalar_one_or_none()
 
     async def get_users_with_count(
-        self, *, skip: int = 0, limit: int = 100
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        with_count: bool = True,
     ) -> UsersDict:
         try:
-            count_query = select(func.count()).select_from(User)
-            count_result = await self.session.execute(count_query)
-            count = count_result.scalar_one()
-
-            query = select(User).offset(skip).limit(limit)
-            users_result = await self.session.execute(query)
-            users = list(users_result.scalars().all())
+            count = None
+            if with_count:
+                count_query = select(func.count()).select_from(User)
+                count_result = await self.session.execute(count_query)
+                count = count_result.scalar_one()
+
+            sort_key = [col(User.created_at), col(User.id)]
+            users_result = await self.session.execute(
+                page_query(
+                    select(User).order_by(*sort_key),
+                    sort_key=sort_key,
+                    after=decode_cursor(cursor, datetime, UUID)
+                    if cursor is not None
+                    else None,
+                    skip=skip,
+                    limit=limit,
+                )
+            )
+            users, next_cursor = split_page(
+                users_result.scalars().all(),
+                limit,
+                lambda user: (user.created_at, user.id),
+            )
 
+        except InvalidCursorException:
+            raise
         except Exception as e:
             log(e)
             raise InternalException from e
         else:
-            return {"users": users, "count": count}
+            return {"users": users, "count": count, "next_cursor": next_cursor}
 
     async def authenticate(self, *, email: str, password: str) -> User:
         user = await self.get_user_by_email(email=email)
@@ -197,98 +230,83 @@ class UserAccessor(BaseAccessor):
         if year is None:
             year = datetime.now(timezone.utc).year  # noqa: UP017
 
+        # диапазон вместо extract(year), чтобы работал индекс
+        # (user_id, status, created_at)
+        year_start = datetime(year, 1, 1, tzinfo=timezone.utc)  # noqa: UP017
+        year_end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)  # noqa: UP017
+
         try:
-            successful_attempts_query = (
+            solved_date = func.date(col(Attempt.created_at))
+            solved_days = (
                 select(
                     col(Attempt.task_id),
-                    col(Attempt.created_at),
-                    col(Task.difficulty),
-                    col(Task.title),
+                    solved_date.label("date"),
+                    func.max(col(Attempt.created_at)).label("solved_at"),
                 )
-                .join(Task, col(Attempt.task_id) == Task.id)
                 .where(
-                    and_(
-                        col(Attempt.user_id) == user_id,
-                        col(Attempt.status) == AttemptStatusEnum.OK,
-                        extract("year", col(Attempt.created_at)) == year,
-                    )
+                    col(Attempt.user_id) == user_id,
+                    col(Attempt.status) == AttemptStatusEnum.OK,
+                    col(Attempt.created_at) >= year_start,
+                    col(Attempt.created_at) < year_end,
                 )
-                .order_by(col(Attempt.task_id), desc(col(Attempt.created_at)))
-            )
-
-            attempts_result = await self.session.execute(
-                successful_attempts_query
+                .group_by(col(Attempt.task_id), solved_date)
+                .subquery()
             )
-            attempts = attempts_result.all()
-
-            latest_attempts_by_task = {}
-            for attempt in attempts:
-                task_id = attempt.task_id
-                if task_id not in latest_attempts_by_task:
-                    latest_attempts_by_task[task_id] = {
-                        "created_at": attempt.created_at,
-                        "difficulty": attempt.difficulty,
-                        "title": attempt.title,
-                    }
-
-            difficulty_stats = {
-                "easy": {"solved": 0, "total": 0},
-                "medium": {"solved": 0, "total": 0},
-                "hard": {"solved": 0, "total": 0},
-            }
-
-            for task_data in latest_attempts_by_task.values():
-                difficulty = task_data["difficulty"].value
-                difficulty_stats[difficulty]["solved"] += 1
-
-            for difficulty in ["easy", "medium", "hard"]:
-                total_query = select(func.count(col(Task.id))).where(
-                    and_(
-                        col(Task.difficulty) == DifficultyEnum(difficulty),
-                        col(Task.is_public) == True,  # noqa: E712
-                    )
+            # одна строка на (задачу, день); последняя по задаче помечена
+            # номером 1 — по ней считаются решённые задачи
+            solved_query = select(
+                solved_days.c.task_id,
+                solved_days.c.date,
+                solved_days.c.solved_at,
+                col(Task.title),
+                col(Task.difficulty),
+                func.row_number()
+                .over(
+                    partition_by=solved_days.c.task_id,
+                    order_by=solved_days.c.solved_at.desc(),
                 )
-                total_result = await self.session.execute(total_query)
-                difficulty_stats[difficulty]["total"] = (
-                    total_result.scalar_one()
+                .label("task_day_number"),
+            ).join(Task, col(Task.id) == solved_days.c.task_id)
+            solved_result = await self.session.execute(solved_query)
+            solved_rows = solved_result.all()
+
+            totals_query = select(
+                *(
+                    func.count()
+                    .filter(col(Task.difficulty) == difficulty)
+                    .label(difficulty.value)
+                    for difficulty in DifficultyEnum
                 )
+            ).where(col(Task.is_public) == True)  # noqa: E712
+            totals_result = await self.session.execute(totals_query)
+            totals = totals_result.one()._mapping
 
-            activity_query = (
-                select(
-                    func.date(Attempt.created_at).label("date"),
-                    func.count(distinct(col(Attempt.task_id))).label("count"),
-                )
-                .join(Task, col(Attempt.task_id) == Task.id)
-                .where(
-                    and_(
-                        col(Attempt.user_id) == user_id,
-                        col(Attempt.status) == AttemptStatusEnum.OK,
-                        extract("year", col(Attempt.created_at)) == year,
+            difficulty_stats = {
+                difficulty.value: {"solved": 0, "total": totals[difficulty]}
+                for difficulty in DifficultyEnum
+            }
+            activity: Counter[date] = Counter()
+            recent_tasks: list[dict[str, Any]] = []
+            for row in solved_rows:
+                activity[row.date] += 1
+                if row.task_day_number == 1:
+                    difficulty_stats[row.difficulty.value]["solved"] += 1
+                    recent_tasks.append(
+                        {
+                            "id": row.task_id,
+                            "title": row.title,
+                            "solved_at": row.solved_at,
+                        }
                     )
-                )
-                .group_by(func.date(Attempt.created_at))
-            )
 
-            activity_result = await self.session.execute(activity_query)
             activity_days = [
-                {"date": row.date, "count": row.count}
-                for row in activity_result.all()
+                {"date": day, "count": count} for day, count in activity.items()
             ]
-
+            total_solved = len(recent_tasks)
             recent_tasks = sorted(
-                [
-                    {
-                        "id": task_id,
-                        "title": task_data["title"],
-                        "solved_at": task_data["created_at"],
-                    }
-                    for task_id, task_data in latest_attempts_by_task.items()
-                ],
-                key=lambda x: x["solved_at"],
-                reverse=True,
+                recent_tasks, key=lambda x: x["solved_at"], reverse=True
             )[:10]
 
-            total_solved = len(latest_attempts_by_task)
             average_per_month = (
                 round(total_solved / 12, 1) if total_solved > 0 else 0
             )
@@ -309,79 +327,77 @@ class UserAccessor(BaseAccessor):
                 "average_per_week": average_per_week,
             }
 
+    @staticmethod
+    def _ranked_users_query(*columns):
+        """Активные пользователи с очками; на этом наборе строится рейтинг."""
+        return (
+            select(*columns)
+            .select_from(UserScore)
+            .join(User, col(User.id) == UserScore.user_id)
+            .where(
+                col(User.is_active) == True,  # noqa: E712
+                col(UserScore.total_score) > 0,
+            )
+        )
+
+    @classmethod
+    def _leaderboard_entries_query(cls):
+        return cls._ranked_users_query(
+            col(UserScore.user_id),
+            col(User.first_name),
+            col(User.last_name),
+            col(User.avatar_filename),
+            col(UserScore.total_score),
+            col(UserScore.solved_tasks_count),
+        )
+
     async def get_leaderboard(self, *, limit: int = 100) -> dict:
         try:
-            users_query = (
-                select(
-                    col(User.id),
-                    col(User.first_name),
-                    col(User.last_name),
-                    col(User.avatar_filename),
-                    col(Attempt.task_id),
-                    col(Task.difficulty),
-                )
-                .outerjoin(
-                    Attempt,
-                    and_(
-                        col(Attempt.user_id) == User.id,
-                        col(Attempt.status) == AttemptStatusEnum.OK,
-                    ),
+            query = (
+                self._leaderboard_entries_query()
+                .order_by(
+                    desc(col(UserScore.total_score)), col(UserScore.user_id)
                 )
-                .outerjoin(Task, col(Attempt.task_id) == Task.id)
-                .where(col(User.is_active) == True)  # noqa: E712
+                .limit(limit)
             )
+            result = await self.session.execute(query)
+            leaderboard_data = [dict(row._mapping) for row in result.all()]
 
-            users_result = await self.session.execute(users_query)
-            users_data = users_result.all()
+            count_result = await self.session.execute(
+                self._ranked_users_query(func.count())
+            )
+            count = count_result.scalar_one()
 
-            user_scores = {}
-            difficulty_scores = {
-                DifficultyEnum.easy: 3,
-                DifficultyEnum.medium: 5,
-                DifficultyEnum.hard: 10,
-            }
+        except Exception as e:
+            log(e)
+            raise InternalException from e
+        else:
+            return {"data": leaderboard_data, "count": count}
 
-            for row in users_data:
-                user_id = row.id
-                if user_id not in user_scores:
-                    user_scores[user_id] = {
-                        "first_name": row.first_name,
-                        "last_name": row.last_name,
-                        "avatar_filename": row.avatar_filename,
-                        "solved_tasks": set(),
-                        "total_score": 0,
-                    }
-
-                if (
-                    row.task_id
-                    and row.task_id not in user_scores[user_id]["solved_tasks"]
-                ):
-                    user_scores[user_id]["solved_tasks"].add(row.task_id)
-                    user_scores[user_id]["total_score"] += difficulty_scores[
-                        row.difficulty
-                    ]
-
-            leaderboard_data = []
-            for user_id, data in user_scores.items():
-                if data["total_score"] > 0:
-                    leaderboard_data.append(
-                        {
-                            "user_id": user_id,
-                            "first_name": data["first_name"],
-                            "last_name": data["last_name"],
-                            "avatar_filename": data["avatar_filename"],
-                            "total_score": data["total_score"],
-                            "solved_tasks_count": len(data["solved_tasks"]),
-                        }
-                    )
+    async def get_user_rank(self, *, user_id: UUID) -> dict | None:
+        """Место пользователя в рейтинге: 1 + число активных с большим счётом.
 
-            leaderboard_data.sort(key=lambda x: x["total_score"], reverse=True)
+        У пользователя без очков места нет (``rank`` равен None).
+        """
+        try:
+            result = await self.session.execute(
+                self._leaderboard_entries_query().where(
+                    col(UserScore.user_id) == user_id
+                )
+            )
+            row = result.one_or_none()
+            if row is None:
+                return None
 
-            return {
-                "data": leaderboard_data[:limit],
-                "count": len(leaderboard_data),
-            }
+            higher_result = await self.session.execute(
+                self._ranked_users_query(func.count()).where(
+                    col(UserScore.total_score) > row.total_score
+                )
+            )
+            higher = higher_result.scalar_one()
 
         except Exception as e:
             log(e)
             raise InternalException from e
+        else:
+            return {**row._mapping, "rank": higher + 1}
@@ -16,6 +16,7 @@ from app.core.email_sender import (
     generate_new_account_email,
     send_email,
 )
+from app.core.pagination import with_count_default
 from app.core.security import (
     create_email_change_token,
     verify_email_change_token,
@@ -23,6 +24,7 @@ from app.core.security import (
 from app.store import StoreDep
 
 from .avatar_file_manager import avatar_file_manager
+from .cache import UserStatsCacheDep
 from .exceptions import (
     UserAlreadyExistsException,
     UserEmailMismatchException,
@@ -32,6 +34,7 @@ from .exceptions import (
 )
 from .models import (
     Leaderboard,
+    LeaderboardRank,
     UserCreate,
     UserPublic,
     UsersPublic,
@@ -179,9 +182,14 @@ async def delete_avatar(
 
 @me_router.get("/stats", response_model=UserStats)
 async def get_user_stats(
-    store: StoreDep, current_user: CurrentUser, year: int | None = None
+    store: StoreDep,
+    current_user: CurrentUser,
+    stats_cache: UserStatsCacheDep,
+    year: int | None = None,
 ) -> Any:
-    return await store.user.get_user_stats(user_id=current_user.id, year=year)
+    return await stats_cache.get_stats(
+        store, user_id=current_user.id, year=year
+    )
 
 
 # === ОПЕРАЦИИ С ПОЛЬЗОВАТЕЛЯМИ (тег "users") ===
@@ -192,10 +200,25 @@ async def get_user_stats(
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-async def get_users(store: StoreDep, skip: int = 0, limit: int = 100) -> Any:
-    users_data = await store.user.get_users_with_count(skip=skip, limit=limit)
+async def get_users(
+    store: StoreDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    with_count: bool | None = None,
+) -> Any:
+    users_data = await store.user.get_users_with_count(
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        with_count=with_count_default(with_count, cursor),
+    )
 
-    return UsersPublic(data=users_data["users"], count=users_data["count"])  # pyright: ignore[reportArgumentType]
+    return UsersPublic(
+        data=users_data["users"],  # pyright: ignore[reportArgumentType]
+        count=users_data["count"],
+        next_cursor=users_data["next_cursor"],
+    )
 
 
 @users_router.get("/avatar/{filename}")
@@ -217,6 +240,25 @@ async def get_leaderboard(store: StoreDep, limit: int = 100) -> Any:
     return await store.user.get_leaderboard(limit=limit)
 
 
+@users_router.get("/leaderboard/{user_id}", response_model=LeaderboardRank)
+async def get_leaderboard_rank(store: StoreDep, user_id: UUID) -> Any:
+    rank = await store.user.get_user_rank(user_id=user_id)
+    if rank is not None:
+        return rank
+
+    user = await store.user.get_user_by_id(user_id=user_id)
+    if not user or not user.is_active:
+        raise UserNotFoundException
+    return LeaderboardRank(
+        user_id=user.id,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        avatar_filename=user.avatar_filename,
+        total_score=0,
+        solved_tasks_count=0,
+    )
+
+
 @users_router.get(
     "/{user_id}",
     dependencies=[Depends(get_current_active_superuser)],
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends
+
+from app.attempt.models import AttemptStatusEnum
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.store import Store
+
+
+class UserStatsCache:
+    """Кэш годовой статистики профиля по ключу (пользователь, год).
+
+    Статистика меняется только с новым вердиктом OK, поэтому записи
+    пользователя сбрасываются по уведомлению о результате его попытки:
+    уведомления рассылаются через fanout-exchange всем процессам.
+    Удаление попыток кэш не отслеживает — оно видно по истечении TTL.
+    """
+
+    def __init__(self) -> None:
+        self.stats: TTLCache[tuple[UUID, int]] = TTLCache(
+            ttl_seconds=settings.USER_STATS_CACHE_TTL_SECONDS,
+            max_entries=settings.USER_STATS_CACHE_MAX_ENTRIES,
+        )
+
+    async def get_stats(
+        self, store: Store, *, user_id: UUID, year: int | None = None
+    ) -> dict:
+        if year is None:
+            year = datetime.now(timezone.utc).year  # noqa: UP017
+
+        return await self.stats.get_or_load(
+            (user_id, year),
+            lambda: store.user.get_user_stats(user_id=user_id, year=year),
+        )
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        self.stats.discard(
+            [key for key in self.stats.entries if key[0] == user_id]
+        )
+
+    def handle_notification(self, payload: dict[str, Any]) -> None:
+        if payload.get("status") != AttemptStatusEnum.OK:
+            return
+        if payload.get("user_id") in (None, "None"):
+            return
+        self.invalidate_user(UUID(payload["user_id"]))
+
+    def clear(self) -> None:
+        self.stats.clear()
+
+
+user_stats_cache = UserStatsCache()
+
+
+def get_user_stats_cache() -> UserStatsCache:
+    return user_stats_cache
+
+
+UserStatsCacheDep = Annotated[UserStatsCache, Depends(get_user_stats_cache)]
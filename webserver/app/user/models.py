@@ -2,7 +2,8 @@ from datetime import date, datetime
 from uuid import UUID, uuid4
 
 from pydantic import EmailStr
-from sqlmodel import Column, DateTime, Field, SQLModel, text
+from sqlalchemy import Index
+from sqlmodel import Column, DateTime, Field, ForeignKey, SQLModel, text
 
 
 class UserBase(SQLModel):
@@ -57,6 +58,8 @@ class UserUpdateMePassword(SQLModel):
 
 
 class User(UserBase, table=True):
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     hashed_password: str
 
@@ -69,6 +72,31 @@ class User(UserBase, table=True):
     )
 
 
+class UserScore(SQLModel, table=True):
+    """Очки пользователя в рейтинге, ведутся вместе с user_task_status.
+
+    Строка появляется при первом решении задачи; индекс по
+    (total_score DESC, user_id) отдаёт верх рейтинга без сортировки.
+    """
+
+    __tablename__ = "user_score"
+
+    user_id: UUID = Field(
+        sa_column=Column(
+            ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+        )
+    )
+    total_score: int = Field(default=0)
+    solved_tasks_count: int = Field(default=0)
+
+
+Index(
+    "ix_user_score_total_score_user_id",
+    UserScore.__table__.c.total_score.desc(),  # type: ignore[attr-defined]
+    UserScore.__table__.c.user_id,  # type: ignore[attr-defined]
+)
+
+
 class UserPublic(UserBase):
     id: UUID
     created_at: datetime
@@ -76,7 +104,8 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 class UserStatsByDifficulty(SQLModel):
@@ -114,6 +143,10 @@ class LeaderboardEntry(SQLModel):
     solved_tasks_count: int
 
 
+class LeaderboardRank(LeaderboardEntry):
+    rank: int | None = None
+
+
 class Leaderboard(SQLModel):
     data: list[LeaderboardEntry]
     count: int